@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+"""
+Memory used by expression tree nodes
+Run with `python -m benchmarks.memory`
+"""
+
+from __future__ import absolute_import, print_function
+import sys
+from sqlbuilder.query import SELECT, CASE, AND, IN, ASC, A, C, F, T
+from sqlbuilder.sql.base import SQL
+
+
+def attribute(node, name):
+    """
+    Return an attribute without triggering the attribute proxies of names and aliases
+    """
+    try:
+        return object.__getattribute__(node, name)
+    except AttributeError:
+        return None
+
+
+def node_size(node):
+    """
+    Return the bytes used by a node itself, including its attribute dict if it has one
+    """
+    size = sys.getsizeof(node)
+    attrs = attribute(node, '__dict__')
+    if attrs is not None:
+        size += sys.getsizeof(attrs)
+    return size
+
+
+def tree_size(root):
+    """
+    Return the number of nodes and total bytes used by the nodes of a tree
+    Containers and plain values are not counted, only the SQL nodes themselves
+    """
+    seen = set()
+    pending = [root]
+    count = size = 0
+    while pending:
+        value = pending.pop()
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+        if isinstance(value, (list, tuple)):
+            pending.extend(value)
+            continue
+        if not isinstance(value, SQL):
+            continue
+        count += 1
+        size += node_size(value)
+        for cls in type(value).__mro__:
+            for name in cls.__dict__.get('__slots__', ()):
+                pending.append(attribute(value, name))
+        pending.extend((attribute(value, '__dict__') or {}).values())
+    return count, size
+
+
+def samples():
+    return (
+        ('Value', SQL.wrap(1)),
+        ('Identifier', C.foo),
+        ('Table', T.foo),
+        ('BinaryOperator', C.foo == 1),
+        ('FunctionCall', F.count(C.foo)),
+        ('Sorting', ASC(C.foo)),
+        ('Alias', A.foo(C.bar)),
+        ('TableAlias', A.foo(T.bar)),
+        ('ConditionalJoin', T.foo.LEFT_JOIN(T.bar, ON=C.baz)),
+    )
+
+
+def main(size=10000):
+    print('Bytes per node')
+    for name, node in samples():
+        print('  {name:<16} {size:>5}'.format(name=name, size=node_size(node)))
+    filters = AND(*[C('column_{i}'.format(i=i % 10)) == i for i in range(size)])
+    mapping = CASE()
+    for i in range(size):
+        mapping.WHEN(C.code == i, 'label {i}'.format(i=i))
+    for name, tree in (('{size} predicates'.format(size=size), SELECT(C).FROM(T.table).WHERE(filters)),
+                       ('{size} CASE branches'.format(size=size), SELECT(mapping).FROM(T.table))):
+        count, total = tree_size(tree)
+        print('{name}: {count} nodes, {total} bytes, {per:.1f} bytes/node'.format(
+            name=name,
+            count=count,
+            total=total,
+            per=float(total) / count,
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+
+"""
+Rendering cost of representative query shapes, compared against a stored baseline
+Run with `python -m benchmarks.render`; pass `--save` to store the current timings as the new baseline
+Timings are compared relative to a plain Python reference workload measured alongside each case,
+so the baseline carries over between machines of different speeds; baselines are kept per Python version
+"""
+
+from __future__ import absolute_import, print_function
+import gc
+import json
+import os
+import sys
+import timeit
+from sqlbuilder.query import SELECT, VALUES, AND, OR, IN, ASC, DESC, A, C, F, T
+from sqlbuilder.dummy import dummy_connection
+from sqlbuilder.sql.buffer import Buffer
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# relative slowdown against the baseline that is reported as a regression
+TOLERANCE = 0.25
+
+# baselines are only comparable on the same Python version
+VERSION = '{0}.{1}'.format(*sys.version_info)
+
+
+def reference_workload(size=2000):
+    """
+    Plain Python work of roughly the kind rendering does, used to scale timings to the speed of the machine
+    """
+    parts = []
+    for i in range(size):
+        parts.append(u'column_{i}'.format(i=i))
+        parts.append(u', ')
+    return u''.join(parts)
+
+
+def wide_select(size=200):
+    return SELECT(*[C('column_{i}'.format(i=i)) for i in range(size)]).FROM(T.table)
+
+
+def deep_chain(size=200):
+    return SELECT(C).FROM(T.table).WHERE(OR(*[
+        AND(C.a == i, C.b != i, C.c > i)
+        for i in range(size // 3)
+    ]))
+
+
+def large_in(size=2000):
+    return SELECT(C.name).FROM(T.users).WHERE(IN(C.id, range(size)))
+
+
+def many_values(size=500):
+    rows = VALUES(0, u'row 0')
+    for i in range(1, size):
+        rows(i, u'row {i}'.format(i=i))
+    return SELECT(C).FROM(A.data(rows, columns=(C.id, C.label)))
+
+
+def nested_unions(size=50):
+    query = SELECT(C.id).FROM(T.table_0).WHERE(C.flag == 0)
+    for i in range(1, size):
+        query = query | SELECT(C.id).FROM(T('table_{i}'.format(i=i))).WHERE(C.flag == i)
+    return query
+
+
+def cte_stack(size=30):
+    query = SELECT(C).FROM(T.cte_0)
+    for i in range(size):
+        query = query.WITH(C('cte_{i}'.format(i=i)), SELECT(C.id, C.value).FROM(T.source).WHERE(C.value > i))
+    return query
+
+
+def windowed(size=50):
+    return SELECT(*[
+        F.sum(C('value_{i}'.format(i=i))).OVER(PARTITION_BY=C.group_id, ORDER_BY=(ASC(C.created), DESC(C.id)))
+        for i in range(size)
+    ]).FROM(T.events)
+
+
+CASES = (
+    ('wide SELECT', wide_select),
+    ('deep AND/OR chain', deep_chain),
+    ('large IN', large_in),
+    ('many-row VALUES', many_values),
+    ('nested UNIONs', nested_unions),
+    ('CTE stack', cte_stack),
+    ('windowed', windowed),
+)
+
+
+class CountingBuffer(Buffer):
+    """
+    Output buffer that counts the nodes rendered into it
+    """
+
+    __slots__ = ('nodes',)
+
+    def __init__(self, connection, context):
+        super(CountingBuffer, self).__init__(connection, context)
+        self.nodes = 0
+
+    def render(self, expr):
+        self.nodes += 1
+        expr._render(self)
+
+
+def render(query):
+    return query._as_sql(dummy_connection, {})
+
+
+def node_count(query):
+    """
+    Return the number of nodes rendered for `query`
+    """
+    output = CountingBuffer(dummy_connection, {})
+    output.render(query)
+    return output.nodes
+
+
+def timing(function, number=20, repeat=10):
+    """
+    Return the best times in seconds to call `function` and the reference workload once, measured alternately
+    """
+    elapsed = reference = float('inf')
+    for _ in range(repeat):
+        elapsed = min(elapsed, timeit.timeit(function, number=number) / number)
+        reference = min(reference, timeit.timeit(reference_workload, number=number) / number)
+    return elapsed, reference
+
+
+def peak_memory(query):
+    """
+    Return the peak number of bytes allocated while rendering `query`, or None if it cannot be traced
+    Includes temporaries freed before rendering completes, unlike a comparison of snapshots
+    """
+    if tracemalloc is None:
+        return None
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        render(query)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - start
+
+
+def measure():
+    """
+    Return a mapping of case names to `elapsed, reference, nodes, peak`
+    """
+    results = {}
+    for name, build in CASES:
+        query = build()
+        results[name] = timing(lambda: render(query)) + (node_count(query), peak_memory(query))
+    return results
+
+
+def load_baselines(path=BASELINE):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except IOError:
+        return {}
+
+
+def save_baseline(results, path=BASELINE):
+    """
+    Store the timings of the cases for the running Python version, in multiples of the reference workload
+    """
+    baseline = load_baselines(path)
+    baseline[VERSION] = dict((name, elapsed / reference) for name, (elapsed, reference, _, _) in results.items())
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=4, separators=(',', ': '), sort_keys=True)
+        f.write('\n')
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    results = measure()
+    baseline = load_baselines().get(VERSION, {})
+    regressions = []
+    print('{case:<20} {ops:>10} {per_render:>12} {per_node:>10} {peak:>10} {change:>9}'.format(
+        case='case', ops='ops/sec', per_render='us/render', per_node='us/node', peak='peak KiB', change='baseline',
+    ))
+    for name, _ in CASES:
+        elapsed, reference, nodes, peak = results[name]
+        change = '-'
+        if name in baseline:
+            ratio = elapsed / reference / baseline[name] - 1
+            change = '{ratio:+.0%}'.format(ratio=ratio)
+            if ratio > TOLERANCE:
+                regressions.append(name)
+        print('{case:<20} {ops:>10.0f} {per_render:>12.1f} {per_node:>10.3f} {peak:>10} {change:>9}'.format(
+            case=name,
+            ops=1 / elapsed,
+            per_render=elapsed * 1e6,
+            per_node=elapsed * 1e6 / nodes,
+            peak='-' if peak is None else '{kib:.1f}'.format(kib=peak / 1024.0),
+            change=change,
+        ))
+    if '--save' in argv:
+        save_baseline(results)
+        print('Baseline for Python {version} saved to {path}'.format(version=VERSION, path=BASELINE))
+    elif regressions:
+        print('Slower than baseline by more than {tolerance:.0%}: {names}'.format(
+            tolerance=TOLERANCE,
+            names=', '.join(regressions),
+        ))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+"""
+Rendering cost as a function of the number of query parameters
+Run with `python -m benchmarks.scaling`; time per parameter should stay flat as the size grows
+"""
+
+from __future__ import absolute_import, print_function
+import timeit
+from sqlbuilder.query import SELECT, VALUES, IN, A, C, T
+from sqlbuilder.dummy import dummy_connection
+
+
+SIZES = (1000, 2000, 4000, 8000, 16000)
+
+
+def in_list(size):
+    return SELECT(C.name).FROM(T.users).WHERE(IN(C.id, range(size)))
+
+
+def values(size):
+    rows = VALUES(0, 0)
+    for i in range(1, size // 2):
+        rows(i, i)
+    return SELECT(C).FROM(A.data(rows, columns=(C.a, C.b)))
+
+
+def measure(query, repeat=3):
+    """
+    Return the best time in seconds to render `query`
+    """
+    return min(timeit.repeat(lambda: query._as_sql(dummy_connection, {}), number=1, repeat=repeat))
+
+
+def main():
+    for name, build in (('IN list', in_list), ('VALUES rows', values)):
+        print(name)
+        for size in SIZES:
+            elapsed = measure(build(size))
+            print('  {size:>6} params: {total:8.2f} ms, {per:6.3f} us/param'.format(
+                size=size,
+                total=elapsed * 1e3,
+                per=elapsed * 1e6 / size,
+            ))
+
+
+if __name__ == '__main__':
+    main()
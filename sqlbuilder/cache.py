@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+
+"""
+Query result caching
+"""
+
+from __future__ import absolute_import
+from collections import OrderedDict
+from hashlib import sha1
+from threading import Lock
+import pickle
+import time
+
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None
+
+
+class MemoryBackend(object):
+    """
+    In-process cache store, evicting the least recently used entries to stay within `max_bytes`
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.evictions = 0
+        self.entries = OrderedDict()
+        self.tags = {}
+        self.lock = Lock()
+
+    def get(self, key):
+        """
+        Return the data stored under `key`, or None if there is none or it has expired
+        """
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is None:
+                return None
+            data, expires = entry
+            if expires is not None and expires <= time.time():
+                self.size -= len(data)
+                return None
+            self.entries[key] = entry
+            return data
+
+    def set(self, key, data, expires):
+        """
+        Store `data` under `key` until the `expires` timestamp (forever if None)
+        """
+        with self.lock:
+            self.remove(key)
+            if len(data) > self.max_bytes:
+                return
+            self.entries[key] = data, expires
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, (evicted, _) = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self.lock:
+            self.remove(key)
+
+    def remove(self, key):
+        # must be called with the lock held
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[0])
+
+    def versions(self, tags):
+        """
+        Return the current versions of `tags`
+        """
+        with self.lock:
+            return tuple(self.tags.get(tag, 0) for tag in tags)
+
+    def bump(self, tags):
+        """
+        Increase the versions of `tags`, making entries stored with older versions stale
+        """
+        with self.lock:
+            for tag in tags:
+                self.tags[tag] = self.tags.get(tag, 0) + 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+class SQLiteBackend(object):
+    """
+    On-disk cache store in a local SQLite database file, which can be shared between processes
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute(u'CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, data BLOB, expires REAL)')
+        self.connection.execute(u'CREATE TABLE IF NOT EXISTS tags (tag TEXT PRIMARY KEY, version INTEGER)')
+
+    def get(self, key):
+        with self.lock:
+            row = self.connection.execute(u'SELECT data, expires FROM entries WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        data, expires = row
+        if expires is not None and expires <= time.time():
+            self.delete(key)
+            return None
+        return bytes(data)
+
+    def set(self, key, data, expires):
+        with self.lock:
+            self.connection.execute(
+                u'INSERT OR REPLACE INTO entries (key, data, expires) VALUES (?, ?, ?)',
+                (key, sqlite3.Binary(data), expires),
+            )
+
+    def delete(self, key):
+        with self.lock:
+            self.connection.execute(u'DELETE FROM entries WHERE key = ?', (key,))
+
+    def versions(self, tags):
+        if not tags:
+            return ()
+        with self.lock:
+            rows = self.connection.execute(
+                u'SELECT tag, version FROM tags WHERE tag IN ({params})'.format(params=u', '.join(u'?' * len(tags))),
+                tuple(tags),
+            ).fetchall()
+        versions = dict(rows)
+        return tuple(versions.get(tag, 0) for tag in tags)
+
+    def bump(self, tags):
+        with self.lock:
+            for tag in tags:
+                self.connection.execute(u'INSERT OR IGNORE INTO tags (tag, version) VALUES (?, 0)', (tag,))
+                self.connection.execute(u'UPDATE tags SET version = version + 1 WHERE tag = ?', (tag,))
+
+    def purge(self):
+        """
+        Delete the expired entries
+        """
+        with self.lock:
+            self.connection.execute(u'DELETE FROM entries WHERE expires <= ?', (time.time(),))
+
+    def clear(self):
+        with self.lock:
+            self.connection.execute(u'DELETE FROM entries')
+
+    def close(self):
+        self.connection.close()
+
+
+class ResultCache(object):
+    """
+    Cache of SELECT results, used by queries set up with `SELECT.cached()`
+    Results are keyed by their namespace, rendered SQL and the types and values of their parameters,
+    and tagged with the tables the query reads;
+    `invalidate()` makes all cached results that read the given tables stale
+    """
+
+    def __init__(self, backend=None, ttl=None, namespace=None):
+        """
+        `backend` stores the pickled results (a `MemoryBackend` by default), `ttl` is the default time to live in seconds;
+        `namespace` separates the results of different databases, see `connection_namespace()`
+        """
+        self.backend = MemoryBackend() if backend is None else backend
+        self.ttl = ttl
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def fetch(self, query, connection, context, ttl=None, key=None, namespace=None):
+        """
+        Return the cached `description, rows` of `query`, fetching and caching them on a miss
+        Results cached under an explicit `key` are looked up without rendering the query
+        """
+        namespace = self.connection_namespace(connection) if namespace is None else namespace
+        if key is None:
+            key = self.key(namespace, *query._as_sql(connection, context))
+        else:
+            key = self.key(namespace, key, ())
+        tags = tuple(sorted(query.tables()))
+        versions = self.backend.versions(tags)
+        data = self.backend.get(key)
+        if data is not None:
+            stored_versions, result = pickle.loads(data)
+            if stored_versions == versions:
+                self.hits += 1
+                return result
+            self.stale += 1
+            self.backend.delete(key)
+        self.misses += 1
+        description, rows = query._fetch(connection, context)
+        # driver row types (e.g. sqlite3.Row) are often not picklable
+        result = description, [tuple(row) for row in rows]
+        try:
+            data = pickle.dumps((versions, result), pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            # values of types that cannot be pickled are returned without caching them
+            return result
+        ttl = self.ttl if ttl is None else ttl
+        expires = None if ttl is None else time.time() + ttl
+        self.backend.set(key, data, expires)
+        return result
+
+    def connection_namespace(self, connection):
+        """
+        Return the namespace of results fetched over `connection`: the cache's `namespace` if set,
+        otherwise the connection's DSN where the driver exposes one (as psycopg2 does)
+        Connections without a DSN need a cache or `cached()` namespace, results of different databases
+        could otherwise be mixed up
+        """
+        if self.namespace is not None:
+            return self.namespace
+        namespace = getattr(connection, 'dsn', None)
+        if namespace is None:
+            raise ValueError('Connection has no DSN, cached queries need a namespace')
+        return namespace
+
+    @classmethod
+    def key(cls, namespace, sql, args):
+        return sha1(repr((namespace, sql, cls.tagged(args))).encode('utf-8')).hexdigest()
+
+    @classmethod
+    def tagged(cls, value):
+        """
+        Return `value` with the type of each item recorded next to its repr,
+        so values with equal reprs (or reprs that ignore the type) get different keys
+        """
+        if isinstance(value, (tuple, list)):
+            return tuple(cls.tagged(item) for item in value)
+        if isinstance(value, dict):
+            # named paramstyles pass their parameters as a dict
+            return tuple(sorted((name, cls.tagged(item)) for name, item in value.items()))
+        return type(value).__module__, type(value).__name__, repr(value)
+
+    def invalidate(self, *tables):
+        """
+        Make the cached results of all queries reading any of `tables` stale
+        """
+        self.backend.bump(tables)
+
+    def clear(self):
+        """
+        Drop all cached results and reset the counters
+        """
+        self.backend.clear()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    @property
+    def metrics(self):
+        """
+        Return a dict of cache counters
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale': self.stale,
+            'evictions': getattr(self.backend, 'evictions', 0),
+        }
+
+default_cache = ResultCache()
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+"""
+SQL dialects
+"""
+
+from __future__ import absolute_import
+
+
+class Dialect(object):
+    """
+    Parameter style, identifier quoting and operator overrides of a database
+    A dialect can be passed to rendering in place of a connection, and connections
+    can declare their dialect with a `dialect` attribute
+    """
+
+    # paramstyle of parameter placeholders: a DB-API style (`format`, `qmark`, `numeric`, `named` or `pyformat`)
+    # or `dollar` for `$1` placeholders; repeated values are bound once in the numbered and named styles
+    PARAMSTYLE = u'format'
+
+    # character used to quote identifiers, None to leave identifiers unquoted
+    QUOTE = None
+
+    # whether lists can be bound as array parameters (e.g. for `= ANY(%s)`), None if it depends on the driver
+    ARRAYS = None
+
+    # operators rendered under another name, e.g. { u'ILIKE': u'LIKE' }
+    RENAMED_OPERATORS = {}
+
+    # operators rendered by a method of the dialect, as { op: method name }
+    # methods are called as `method(op, *operands, context=context)` and return what `operator_to_sql` does
+    OPERATORS = {}
+
+    def __init__(self, in_strategy=None):
+        """
+        `in_strategy` is an optional `InStrategy` for rendering large `IN` lists
+        """
+        assert not (self.ARRAYS is False and in_strategy is not None and in_strategy.strategy == in_strategy.STRATEGY.ARRAY), \
+            '{dialect} does not support array parameters'.format(dialect=type(self).__name__)
+        self.in_strategy = in_strategy
+
+    @property
+    def operators(self):
+        """
+        Return the dispatch table of the operators this dialect overrides,
+        or None if a subclass or the instance overrides `operator_to_sql` and any operator must be offered to it
+        """
+        if type(self).operator_to_sql != Dialect.operator_to_sql or 'operator_to_sql' in self.__dict__:
+            return None
+        try:
+            return self.__dict__['dispatch']
+        except KeyError:
+            dispatch = self.__dict__['dispatch'] = self.build_dispatch()
+            return dispatch
+
+    def build_dispatch(self):
+        """
+        Build the operator dispatch table from the operator declarations
+        """
+        dispatch = {}
+        for op, name in self.RENAMED_OPERATORS.items():
+            dispatch[op] = renamer(name)
+        for op, method in self.OPERATORS.items():
+            dispatch[op] = getattr(self, method)
+        in_strategy = getattr(self, 'in_strategy', None)
+        if in_strategy is not None:
+            for op in in_strategy.OPS:
+                dispatch[op] = in_strategy.operator_to_sql
+        return dispatch
+
+    def quote_identifier(self, identifier):
+        """
+        Quote each dot-separated part of an identifier
+        """
+        if self.QUOTE is None:
+            return identifier
+        quote = self.QUOTE
+        return u'.'.join(
+            part if part == u'*' else u'{quote}{part}{quote}'.format(quote=quote, part=part.replace(quote, quote * 2))
+            for part in identifier.split(u'.')
+        )
+
+    def quote_function_name(self, name):
+        """
+        Function names are not quoted
+        """
+        return name
+
+    def operator_to_sql(self, op, *operands, **kwargs):
+        """
+        Render an operator the dialect overrides
+        Returns a `sql, args` tuple or an SQL instance to render instead of the operator, or NotImplemented
+        """
+        render = self.operators.get(op)
+        if render is None:
+            return NotImplemented
+        return render(op, *operands, **kwargs)
+
+
+def renamer(name):
+    """
+    Return an operator override that renders a binary operator under another name
+    """
+    def rename(op, left, right=None, context=None):
+        from .sql.expression import BinaryOperator
+        return BinaryOperator(left, name, right)
+    return rename
+
+
+class PostgreSQLDialect(Dialect):
+    """
+    PostgreSQL, as used through psycopg2
+    """
+
+    PARAMSTYLE = u'format'
+    QUOTE = u'"'
+    ARRAYS = True
+    RENAMED_OPERATORS = {
+        u'RLIKE': u'~',
+        u'NOT RLIKE': u'!~',
+        u'^': u'#',
+    }
+
+    def __init__(self, in_strategy=None):
+        """
+        Large `IN` lists are bound as a single array parameter unless another `in_strategy` is given
+        """
+        if in_strategy is None:
+            from .sql.strategy import InStrategy
+            in_strategy = InStrategy(InStrategy.STRATEGY.ARRAY)
+        super(PostgreSQLDialect, self).__init__(in_strategy)
+
+
+class SQLiteDialect(Dialect):
+    """
+    SQLite, as used through the sqlite3 module
+    """
+
+    PARAMSTYLE = u'qmark'
+    QUOTE = u'"'
+    ARRAYS = False
+    RENAMED_OPERATORS = {
+        # LIKE is case-insensitive for ASCII characters in SQLite
+        u'ILIKE': u'LIKE',
+        u'NOT ILIKE': u'NOT LIKE',
+        u'RLIKE': u'REGEXP',
+        u'NOT RLIKE': u'NOT REGEXP',
+    }
+    OPERATORS = {
+        u'^': 'bitwise_xor',
+    }
+
+    def bitwise_xor(self, op, left, right=None, context=None):
+        """
+        SQLite has no bitwise XOR operator: render `a ^ b` as `(a | b) - (a & b)`
+        """
+        from .sql.expression import BinaryOperator
+        return BinaryOperator(BinaryOperator(left, u'|', right), u'-', BinaryOperator(left, u'&', right))
+
+
+class MySQLDialect(Dialect):
+    """
+    MySQL, as used through MySQLdb
+    """
+
+    PARAMSTYLE = u'format'
+    QUOTE = u'`'
+    ARRAYS = False
+    RENAMED_OPERATORS = {
+        # comparisons are case-insensitive with the default collations
+        u'ILIKE': u'LIKE',
+        u'NOT ILIKE': u'NOT LIKE',
+    }
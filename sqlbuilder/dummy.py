@@ -4,28 +4,15 @@ Dummy connection placeholders
 """
 
 from __future__ import absolute_import
+from .dialect import Dialect
 
 
-class DummyConnection(object):
+class DummyConnection(Dialect):
     """
     Dummy connection, used in representation and stringification of instances
+    Does not quote identifiers and overrides no operators
     """
 
-    def quote_identifier(self, identifier):
-        """
-        Dummy connection does not quote identifiers
-        """
-        return identifier
-
-    # Function names quoted as generic identifiers
-    quote_function_name = quote_identifier
-
-    def operator_to_sql(self, op, left, right=None, context=None):
-        """
-        Dummy connection overrides no operators
-        """
-        return NotImplemented
-
 dummy_connection = DummyConnection()
 
 
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+
+"""
+Query instrumentation
+"""
+
+from __future__ import absolute_import
+from bisect import bisect_left
+from threading import Lock
+import time
+from .utils import Const
+
+try:
+    clock = time.perf_counter
+except AttributeError:
+    # Python 2
+    clock = time.time
+
+
+EVENT = Const('EVENT', """Instrumentation events""",
+    BEFORE_RENDER=u'before_render',
+    AFTER_RENDER=u'after_render',
+    BEFORE_EXECUTE=u'before_execute',
+    AFTER_EXECUTE=u'after_execute',
+    AFTER_FETCH=u'after_fetch',
+    ERROR=u'error',
+)
+
+
+class Instrumentation(object):
+    """
+    Registry of listeners notified as queries are rendered and executed
+    Listeners are called as `listener(event, trace)` with one of the `EVENT` constants and the `Trace` of the execution
+    """
+
+    def __init__(self):
+        self.listeners = ()
+
+    def add(self, listener):
+        """
+        Register a listener, returns the listener
+        """
+        self.listeners += (listener,)
+        return listener
+
+    def remove(self, listener):
+        """
+        Unregister a listener
+        """
+        self.listeners = tuple(item for item in self.listeners if item != listener)
+
+    def trace(self, query):
+        """
+        Return the trace for an execution of `query`, a no-op trace if there are no listeners
+        """
+        if not self.listeners:
+            return null_trace
+        return Trace(self.listeners, query)
+
+instrumentation = Instrumentation()
+
+
+class Trace(object):
+    """
+    Render and execution measurements of a single query execution
+    Queries of several statements are executed as they are rendered: `after_render` and `before_execute` events
+    are emitted for every statement, with the counts and times so far, the other events once per execution
+    `query` is the executed query, `sql` is the first rendered statement, `params` the number of parameters over all statements;
+    `rowcount` is the cursor's rowcount after execution and `rows` the number of rows fetched by the fetch helpers
+    """
+
+    __slots__ = (
+        'listeners', 'query', 'query_class', 'sql', 'statements', 'params',
+        'render_time', 'execute_time', 'rowcount', 'rows', 'error', 'started',
+    )
+
+    def __init__(self, listeners, query):
+        self.listeners = listeners
+        self.query = query
+        self.query_class = type(query)
+        self.sql = None
+        self.statements = 0
+        self.params = 0
+        self.render_time = None
+        self.execute_time = None
+        self.rowcount = None
+        self.rows = None
+        self.error = None
+        self.started = None
+
+    def emit(self, event):
+        for listener in self.listeners:
+            listener(event, self)
+
+    def before_render(self):
+        self.emit(EVENT.BEFORE_RENDER)
+        self.render_time = 0.0
+        self.execute_time = 0.0
+        self.started = clock()
+
+    def after_render(self, sql, params, statements=1):
+        """
+        Record rendered statements: `statements` executions of `sql` with `params` parameters in total
+        """
+        self.render_time += clock() - self.started
+        if self.sql is None:
+            self.sql = sql
+        self.statements += statements
+        self.params += params
+        self.emit(EVENT.AFTER_RENDER)
+
+    def before_execute(self):
+        self.emit(EVENT.BEFORE_EXECUTE)
+        self.started = clock()
+
+    def after_statement(self):
+        """
+        Record the execution time of a statement; rendering of the next statement is timed from here
+        """
+        now = clock()
+        self.execute_time += now - self.started
+        self.started = now
+
+    def after_execute(self, cursor):
+        self.rowcount = getattr(cursor, 'rowcount', None)
+        self.emit(EVENT.AFTER_EXECUTE)
+
+    def after_fetch(self, rows):
+        self.rows = rows
+        self.emit(EVENT.AFTER_FETCH)
+
+    def failed(self, error):
+        self.error = error
+        self.emit(EVENT.ERROR)
+
+
+class NullTrace(object):
+    """
+    Trace that records nothing, used while no listeners are registered
+    """
+
+    __slots__ = ()
+
+    def before_render(self):
+        pass
+
+    def after_render(self, sql, params, statements=1):
+        pass
+
+    def before_execute(self):
+        pass
+
+    def after_statement(self):
+        pass
+
+    def after_execute(self, cursor):
+        pass
+
+    def after_fetch(self, rows):
+        pass
+
+    def failed(self, error):
+        pass
+
+null_trace = NullTrace()
+
+
+class Histogram(object):
+    """
+    Counts of durations per bucket, with the total and maximum
+    """
+
+    __slots__ = ('bounds', 'counts', 'count', 'total', 'max')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent):
+        """
+        Return the upper bound of the bucket holding the given percentile, or the maximum for the last bucket
+        """
+        rank = self.count * percent / 100.0
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if count and seen >= rank:
+                return bound
+        return self.max
+
+
+class QueryStats(object):
+    """
+    Aggregated measurements of one query shape
+    """
+
+    __slots__ = ('query_class', 'sql', 'render', 'execute', 'errors', 'rowcount', 'rows')
+
+    def __init__(self, query_class, sql, bounds):
+        self.query_class = query_class
+        self.sql = sql
+        self.render = Histogram(bounds)
+        self.execute = Histogram(bounds)
+        self.errors = 0
+        self.rowcount = 0
+        self.rows = 0
+
+
+class HistogramCollector(object):
+    """
+    Listener that keeps render and execution time histograms per query class and rendered SQL
+    Register with `instrumentation.add(collector)`; at most `maxsize` distinct statements are tracked
+    """
+
+    # upper bounds of the histogram buckets in seconds
+    BOUNDS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+    def __init__(self, maxsize=1000, bounds=None):
+        self.maxsize = maxsize
+        self.bounds = tuple(bounds or self.BOUNDS)
+        self.stats = {}
+        self.dropped = 0
+        self.lock = Lock()
+
+    def __call__(self, event, trace):
+        if event not in (EVENT.AFTER_EXECUTE, EVENT.AFTER_FETCH, EVENT.ERROR):
+            return
+        with self.lock:
+            key = trace.query_class, trace.sql
+            stats = self.stats.get(key)
+            if stats is None:
+                if len(self.stats) >= self.maxsize:
+                    self.dropped += 1
+                    return
+                stats = self.stats[key] = QueryStats(trace.query_class, trace.sql, self.bounds)
+            if event == EVENT.AFTER_EXECUTE:
+                stats.render.add(trace.render_time)
+                stats.execute.add(trace.execute_time)
+                if trace.rowcount is not None and trace.rowcount >= 0:
+                    stats.rowcount += trace.rowcount
+            elif event == EVENT.AFTER_FETCH:
+                stats.rows += trace.rows
+            else:
+                stats.errors += 1
+
+    def slowest(self, count=10, by='execute'):
+        """
+        Return the stats of the `count` statements with the highest total `execute` or `render` time
+        """
+        with self.lock:
+            stats = list(self.stats.values())
+        return sorted(stats, key=lambda item: getattr(item, by).total, reverse=True)[:count]
+
+    def clear(self):
+        with self.lock:
+            self.stats.clear()
+            self.dropped = 0
@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+
+"""
+Connection pooling
+"""
+
+from __future__ import absolute_import
+from contextlib import contextmanager
+from threading import Condition
+import time
+
+
+class PoolTimeout(RuntimeError):
+    """
+    Raised when no pooled connection becomes available in time
+    """
+
+
+class ConnectionPool(object):
+    """
+    Bounded pool of connections
+    Can be passed to `Query.execute` in place of a connection: every query checks out a connection
+    that is returned to the pool when its cursor is closed
+    Returned connections are rolled back by default, so changes made by queries executed on the pool itself
+    are discarded; write within `with pool.connection(commit=True)` or commit explicitly
+    """
+
+    def __init__(self, connect, max_size=10, timeout=None, max_idle=None, health_check=None, reset=None, dialect=None):
+        """
+        `connect` is called to open new connections, at most `max_size` connections are open at a time;
+        checkouts wait up to `timeout` seconds for a connection to be returned (forever if None);
+        connections idle for more than `max_idle` seconds are closed;
+        `health_check` is called with each idle connection before it is checked out, and
+        connections it rejects (by returning a false value or raising) are closed and replaced;
+        `reset` is called with each returned connection to discard its session state, by default
+        the open transaction is rolled back; connections that fail to reset are closed;
+        `dialect` renders queries without opening a connection first
+        """
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.health_check = health_check
+        self.reset = rollback if reset is None else reset
+        self.pool_dialect = dialect
+        self.lock = Condition()
+        self.idle = []
+        self.size = 0
+        self.closed = False
+        self.prototype = None
+        self.created = 0
+        self.discarded = 0
+        self.checkouts = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def acquire(self, timeout=None):
+        """
+        Check out a connection, opening a new one if no idle connection is available
+        """
+        timeout = self.timeout if timeout is None else timeout
+        started = time.time()
+        while True:
+            connection = self.reserve(started, timeout)
+            if connection is None:
+                connection = self.open()
+            elif not self.healthy(connection):
+                self.discard(connection)
+                continue
+            break
+        waited = time.time() - started
+        with self.lock:
+            self.checkouts += 1
+            self.wait_time += waited
+            self.max_wait_time = max(self.max_wait_time, waited)
+        return connection
+
+    def release(self, connection):
+        """
+        Return a checked out connection to the pool
+        """
+        try:
+            self.reset(connection)
+        except Exception:
+            self.discard(connection)
+            return
+        with self.lock:
+            if not self.closed:
+                self.idle.append((connection, time.time()))
+                self.lock.notify()
+                return
+        self.discard(connection)
+
+    @contextmanager
+    def connection(self, timeout=None, commit=False):
+        """
+        Check out a connection for the duration of a `with` block
+        With `commit`, the transaction is committed if the block completes without an exception;
+        otherwise it is rolled back when the connection is returned
+        """
+        connection = self.acquire(timeout)
+        try:
+            yield connection
+            if commit:
+                connection.commit()
+        finally:
+            self.release(connection)
+
+    def cursor(self):
+        """
+        Check out a connection and allocate a cursor from it
+        The connection is returned to the pool when the cursor is closed
+        """
+        connection = self.acquire()
+        try:
+            cursor = connection.cursor()
+        except Exception:
+            self.release(connection)
+            raise
+        return PooledCursor(self, connection, cursor)
+
+    def reserve(self, started, timeout):
+        """
+        Pop the most recently returned idle connection, or return None after reserving room for a new connection
+        """
+        expired = []
+        try:
+            with self.lock:
+                while True:
+                    if self.closed:
+                        raise PoolTimeout('Connection pool is closed')
+                    expired.extend(self.expire())
+                    if self.idle:
+                        return self.idle.pop()[0]
+                    if self.size < self.max_size:
+                        self.size += 1
+                        return None
+                    remaining = None if timeout is None else started + timeout - time.time()
+                    if remaining is not None and remaining <= 0:
+                        raise PoolTimeout('No connection available within {timeout} seconds'.format(timeout=timeout))
+                    self.lock.wait(remaining)
+        finally:
+            for connection in expired:
+                self.close_connection(connection)
+
+    def open(self):
+        """
+        Open a new connection in room reserved by `reserve`
+        """
+        try:
+            connection = self.connect()
+        except Exception:
+            with self.lock:
+                self.size -= 1
+                self.lock.notify()
+            raise
+        with self.lock:
+            self.created += 1
+            if self.prototype is None:
+                self.prototype = connection
+        return connection
+
+    def healthy(self, connection):
+        if self.health_check is None:
+            return True
+        try:
+            return self.health_check(connection)
+        except Exception:
+            return False
+
+    def discard(self, connection):
+        """
+        Close a connection and make room for a new one
+        """
+        with self.lock:
+            self.size -= 1
+            self.discarded += 1
+            self.lock.notify()
+        self.close_connection(connection)
+
+    def expire(self):
+        """
+        Remove and return the idle connections that have been idle for too long, must be called with the lock held
+        """
+        if self.max_idle is None or not self.idle:
+            return []
+        deadline = time.time() - self.max_idle
+        expired = [connection for connection, released in self.idle if released < deadline]
+        if expired:
+            self.idle = [(connection, released) for connection, released in self.idle if released >= deadline]
+            self.size -= len(expired)
+            self.discarded += len(expired)
+            self.lock.notify(len(expired))
+        return expired
+
+    def evict_idle(self):
+        """
+        Close the connections that have been idle for more than `max_idle` seconds
+        """
+        with self.lock:
+            expired = self.expire()
+        for connection in expired:
+            self.close_connection(connection)
+        return len(expired)
+
+    def close(self):
+        """
+        Close all idle connections; connections in use are closed when they are returned
+        """
+        with self.lock:
+            self.closed = True
+            idle, self.idle = self.idle, []
+            self.size -= len(idle)
+            self.discarded += len(idle)
+            self.lock.notify_all()
+        for connection, _ in idle:
+            self.close_connection(connection)
+
+    @staticmethod
+    def close_connection(connection):
+        close = getattr(connection, 'close', None)
+        if close is not None:
+            try:
+                close()
+            except Exception:
+                pass
+
+    @property
+    def metrics(self):
+        """
+        Return a dict of pool usage counters
+        """
+        with self.lock:
+            return {
+                'size': self.size,
+                'in_use': self.size - len(self.idle),
+                'idle': len(self.idle),
+                'created': self.created,
+                'discarded': self.discarded,
+                'checkouts': self.checkouts,
+                'wait_time': self.wait_time,
+                'max_wait_time': self.max_wait_time,
+            }
+
+    @property
+    def dialect(self):
+        """
+        Return the dialect queries are rendered with: the dialect given to the pool,
+        or else the dialect of the first connection the pool opened
+        """
+        if self.pool_dialect is not None:
+            return self.pool_dialect
+        if self.prototype is None:
+            self.release(self.acquire())
+        return getattr(self.prototype, 'dialect', None) or self.prototype
+
+
+def rollback(connection):
+    """
+    Default connection reset, rolls back the transaction left open by the last user of the connection
+    """
+    rollback = getattr(connection, 'rollback', None)
+    if rollback is not None:
+        rollback()
+
+
+class PooledCursor(object):
+    """
+    Cursor of a pooled connection, returns the connection to the pool when closed
+    """
+
+    def __init__(self, pool, connection, cursor):
+        self.pool = pool
+        self.connection = connection
+        self.cursor = cursor
+
+    def execute(self, sql, args=()):
+        self.cursor.execute(sql, args)
+        return self
+
+    def executemany(self, sql, args):
+        self.cursor.executemany(sql, args)
+        return self
+
+    def close(self):
+        """
+        Close the cursor and return its connection to the pool
+        """
+        connection, self.connection = self.connection, None
+        if connection is None:
+            return
+        try:
+            self.cursor.close()
+        finally:
+            self.pool.release(connection)
+
+    def __iter__(self):
+        return iter(self.cursor)
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+    def __del__(self):
+        # return the connection of cursors that were never closed
+        if self.__dict__.get('connection') is not None:
+            self.close()
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+"""
+Server-side prepared statements
+"""
+
+from __future__ import absolute_import
+from collections import OrderedDict
+from hashlib import sha1
+from threading import Lock
+from weakref import WeakKeyDictionary, ref
+from .sql.buffer import Buffer
+from .sql.shape import ShapeBuffer
+
+
+class PreparedStatements(object):
+    """
+    Registry of server-side prepared statements, as supported by PostgreSQL
+    Each distinct query shape is rendered once with `$1` placeholders and given a stable name derived from its SQL;
+    parameters are numbered by position, so queries share a statement whichever of their values happen to be equal;
+    the statement is prepared with `PREPARE` the first time it is executed on a connection, and later executions
+    only send `EXECUTE name(...)` with the parameter values. Each connection keeps at most `maxsize` prepared
+    statements, the least recently used statement is released with `DEALLOCATE` when the limit is reached
+    Statements are tracked per connection, so queries must be executed on connections rather than on a pool
+    """
+
+    # paramstyle of the placeholders in prepared statements
+    PARAMSTYLE = u'dollar'
+
+    def __init__(self, maxsize=100, cache_size=1024, prefix=u'sqlbuilder_'):
+        """
+        `maxsize` is the number of statements prepared per connection, `cache_size` the number of query shapes
+        whose rendered statement is kept, and `prefix` the prefix of statement names
+        """
+        self.maxsize = maxsize
+        self.cache_size = cache_size
+        self.prefix = prefix
+        self.statements = OrderedDict()
+        self.prepared = WeakKeyDictionary()
+        self.lock = Lock()
+
+    def execute(self, query, connection, **context):
+        """
+        Allocate a cursor from the connection and execute `query` as a prepared statement
+        """
+        name, sql, args = self.statement(query, connection, context)
+        cursor = connection.cursor()
+        try:
+            self.prepare(cursor, connection, name, sql)
+            cursor.execute(*self.execute_sql(connection, name, args))
+        except Exception:
+            cursor.close()
+            raise
+        return cursor
+
+    def statement(self, query, connection, context):
+        """
+        Return the `name, sql, args` of the prepared statement for `query`, rendering its SQL only for new shapes
+        """
+        output = ShapeBuffer(connection, context)
+        output.use_paramstyle(self.PARAMSTYLE, dedupe=False)
+        output.render(query)
+        query_shape, args = output.result()
+        # the dialect may be the connection itself, cached statements must not keep it alive
+        key = ref(output.dialect), query_shape
+        with self.lock:
+            statement = self.statements.pop(key, None)
+            if statement is not None:
+                self.statements[key] = statement
+                return statement + (args,)
+        output = Buffer(connection, context)
+        output.use_paramstyle(self.PARAMSTYLE, dedupe=False)
+        output.render(query)
+        sql = u''.join(output.sql)
+        statement = self.name(sql), sql
+        with self.lock:
+            self.statements[key] = statement
+            while len(self.statements) > self.cache_size:
+                self.statements.popitem(last=False)
+        return statement + (args,)
+
+    def name(self, sql):
+        """
+        Return the stable name of the statement `sql`
+        """
+        return self.prefix + sha1(sql.encode('utf-8')).hexdigest()[:20]
+
+    def prepare(self, cursor, connection, name, sql):
+        """
+        Prepare the statement on the connection unless it already is, deallocating the least recently used statement
+        """
+        with self.lock:
+            prepared = self.connection_statements(connection)
+            if name in prepared:
+                del prepared[name]
+                prepared[name] = True
+                return
+        cursor.execute(u'PREPARE {name} AS {sql}'.format(name=name, sql=sql))
+        with self.lock:
+            prepared[name] = True
+            evicted = []
+            while len(prepared) > self.maxsize:
+                evicted.append(prepared.popitem(last=False)[0])
+        for name in evicted:
+            cursor.execute(u'DEALLOCATE {name}'.format(name=name))
+
+    def connection_statements(self, connection):
+        """
+        Return the ordered names of the statements prepared on the connection, must be called with the lock held
+        """
+        try:
+            return self.prepared[connection]
+        except KeyError:
+            prepared = self.prepared[connection] = OrderedDict()
+            return prepared
+
+    def execute_sql(self, connection, name, args):
+        """
+        Return the `sql, args` tuple of the `EXECUTE` statement, in the paramstyle of the connection
+        """
+        output = Buffer(connection, {})
+        output.write(u'EXECUTE ')
+        output.write(name)
+        if args:
+            output.write(u'(')
+            for index, value in enumerate(args):
+                if index:
+                    output.write(u', ')
+                output.param(value)
+            output.write(u')')
+        return output.result()
+
+    def forget(self, connection):
+        """
+        Forget the statements prepared on the connection, e.g. after it was reset
+        """
+        with self.lock:
+            self.prepared.pop(connection, None)
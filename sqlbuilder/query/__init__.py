@@ -7,3 +7,4 @@ SQL queries
 from __future__ import absolute_import
 from ..sql import *
 from .select import SELECT
+from .insert import INSERT
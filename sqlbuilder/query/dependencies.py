@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+"""
+Table dependencies of queries
+"""
+
+from __future__ import absolute_import
+from ..sql.alias import SubqueryAlias, TableAlias
+from ..sql.base import SQL
+from ..sql.table import Join, Table
+from ..sql.walk import children
+
+
+def tables(query):
+    """
+    Return the names of the base tables `query` reads, as a frozenset
+    Tables are collected from the FROM clauses and joins of the query and of every subquery in it
+    (in set operations, CTEs, subquery aliases and expressions); references to CTE names are excluded
+    where the CTE is in scope: in the SELECT that defines it and its subqueries, in the bodies of the CTEs
+    that follow it, and in its own body if it is recursive
+    """
+    names = set()
+    seen = set()
+    pending = [(query, frozenset())]
+    while pending:
+        value, scope = pending.pop()
+        if isinstance(value, (list, tuple)):
+            pending.extend((item, scope) for item in value)
+            continue
+        if isinstance(value, dict):
+            pending.extend((item, scope) for item in value.values())
+            continue
+        if not isinstance(value, SQL) or (id(value), scope) in seen:
+            continue
+        seen.add((id(value), scope))
+        if isinstance(value, SELECT):
+            for cte in value.cte:
+                name = getattr(cte.name, '_name', cte.name)
+                if cte.recursive:
+                    scope = scope | frozenset([name])
+                pending.append((cte.query, scope))
+                scope = scope | frozenset([name])
+            if value.source is not None:
+                source_tables(value.source.source, names, scope)
+            pending.extend((child, scope) for child in children(value) if child is not value.cte)
+        else:
+            pending.extend((child, scope) for child in children(value))
+    return frozenset(names)
+
+
+def source_tables(source, names, ctes=frozenset()):
+    """
+    Add the names of the tables joined in a FROM clause source to `names`, except the CTE names in `ctes`
+    Subqueries are skipped, `tables` finds them on its own
+    """
+    pending = [source]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, Table):
+            if node._name not in ctes:
+                names.add(node._name)
+        elif isinstance(node, Join):
+            pending.append(node.right)
+            pending.append(node.left)
+        elif isinstance(node, TableAlias) and not isinstance(node, SubqueryAlias):
+            pending.append(node._origin)
+
+
+from .select import SELECT
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+"""
+SQL insert query
+"""
+
+from __future__ import absolute_import
+from itertools import chain, islice
+from ..sql.query import DataManipulationQuery
+from ..sql.base import SQL, SQLIterator
+from ..sql.buffer import Buffer
+
+
+class INSERT(DataManipulationQuery):
+    """
+    INSERT query with multi-row VALUES
+    Rows can be tuples in column order, or dicts keyed by column name;
+    when executed, rows are split into statements of at most `max_params` parameters each;
+    rows added from iterators can only be rendered once, as rendering (including `repr`) consumes them
+    """
+
+    __slots__ = ('table', 'columns', 'max_params', 'rows')
+
+    def __init__(self, table, columns=None, max_params=None):
+        self.table = table
+        self.columns = None if columns is None else tuple(columns)
+        self.max_params = max_params
+        self.rows = []
+
+    def VALUES(self, *values):
+        """
+        Add a single row of values
+        """
+        self.rows.append((values,))
+        return self
+
+    def ROWS(self, rows):
+        """
+        Add an iterable of rows; iterators are consumed when the query is rendered,
+        so pass a list to render or execute the query more than once
+        """
+        self.rows.append(rows)
+        return self
+
+    def _columns_and_rows(self):
+        """
+        Return the column list and an iterator of row tuples in column order
+        """
+        rows = chain.from_iterable(self.rows)
+        try:
+            first = next(rows)
+        except StopIteration:
+            raise AssertionError('No rows in INSERT query')
+        rows = chain((first,), rows)
+        columns = self.columns
+        if columns is None and isinstance(first, dict):
+            columns = tuple(sorted(first))
+        if columns is not None:
+            names = tuple(getattr(column, '_name', column) for column in columns)
+            rows = (
+                tuple(row[name] for name in names) if isinstance(row, dict) else row
+                for row in rows
+            )
+        return columns, rows
+
+    def batches(self):
+        """
+        Return the column list and an iterator of row batches that respect `max_params`
+        Raises ValueError if a single row has more values than `max_params`
+        """
+        columns, rows = self._columns_and_rows()
+        if self.max_params is None:
+            return columns, iter((list(rows),))
+        first = next(rows)
+        width = len(columns) if columns is not None else len(first)
+        if width > self.max_params:
+            raise ValueError('INSERT rows of {width} values exceed max_params={max_params}'.format(
+                width=width, max_params=self.max_params,
+            ))
+        size = self.max_params // max(1, width)
+        rows = chain((first,), rows)
+        return columns, iter(lambda: list(islice(rows, size)), [])
+
+    def statements(self, connection, context):
+        """
+        Render one `sql, args` tuple per batch of rows
+        """
+        columns, batches = self.batches()
+        for batch in batches:
+            output = Buffer(connection, context)
+            self.batch_to_sql(columns, batch, output)
+            yield output.result()
+
+    def batch_to_sql(self, columns, rows, output):
+        """
+        Render a single INSERT statement for a batch of rows
+        """
+        output.write(u'INSERT INTO ')
+        output.render(SQL.wrap(self.table, id=True))
+        if columns:
+            output.write(u' (')
+            output.render(SQLIterator(columns, id=True))
+            output.write(u')')
+        sep = u' VALUES ('
+        for row in rows:
+            output.write(sep)
+            output.render(SQLIterator(row))
+            sep = u'), ('
+        output.write(u')')
+
+    def _render(self, output):
+        columns, rows = self._columns_and_rows()
+        self.batch_to_sql(columns, rows, output)
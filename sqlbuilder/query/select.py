@@ -5,10 +5,14 @@ SQL select query
 """
 
 from __future__ import absolute_import
+from collections import namedtuple
+import copy
 from ..sql.query import DataManipulationQuery
 from ..sql.base import SQL, SQLIterator
-from ..sql.name import F
+from ..sql.name import C, F
 from ..sql.window import Window
+from ..sql.expression import AND
+from ..sql.sort import Sorting, seek_condition
 from ..utils import Const
 
 
@@ -17,68 +21,215 @@ class BaseSelect(DataManipulationQuery):
     Base class for SELECT-like queries (actual SELECT statements and set operations)
     """
 
+    __slots__ = ('order', 'limit', 'offset', 'frozen', 'caching', 'dependencies')
+
+    ROW = Const('ROW', """Result row types""",
+        TUPLE=u'tuple',
+        DICT=u'dict',
+        NAMEDTUPLE=u'namedtuple',
+    )
+
     def __init__(self):
         self.order = None
         self.limit = None
         self.offset = None
+        self.frozen = False
+        self.caching = None
+        self.dependencies = None
 
     # set operations
     def __or__(self, other): return SelectSet(self, other, SelectSet.OP.UNION)
     def __and__(self, other): return SelectSet(self, other, SelectSet.OP.INTERSECT)
     def __sub__(self, other): return SelectSet(self, other, SelectSet.OP.EXCEPT)
 
-    def ORDER_BY(self, *exprs):
-        self.order = exprs or None
+    def freeze(self):
+        """
+        Make the query immutable
+        Clause methods of a frozen query return a new frozen query that shares all unchanged parts with it
+        """
+        self.frozen = True
         return self
 
+    def copy(self):
+        """
+        Return a mutable copy of the query
+        """
+        query = copy.copy(self)
+        query.frozen = False
+        query.dependencies = None
+        return query
+
+    def _derive(self):
+        """
+        Return the query a clause method should modify: a copy if the query is frozen, otherwise the query itself
+        """
+        query = copy.copy(self) if self.frozen else self
+        query.dependencies = None
+        return query
+
+    def tables(self):
+        """
+        Return the names of the base tables the query reads, see `dependencies.tables`
+        Computed once and kept until a clause method modifies the query; subqueries modified in place
+        after that are not noticed
+        """
+        if self.dependencies is None:
+            self.dependencies = tables(self)
+        return self.dependencies
+
+    def ORDER_BY(self, *exprs):
+        query = self._derive()
+        query.order = exprs or None
+        return query
+
     def LIMIT(self, limit, offset=None):
-        self.limit = limit
-        self.offset = offset
-        return self
+        query = self._derive()
+        query.limit = limit
+        query.offset = offset
+        return query
 
     def OFFSET(self, offset):
-        self.offset = offset
-        return self
+        query = self._derive()
+        query.offset = offset
+        return query
 
     def count(self, connection, **context):
         """
         Return count of rows in result
         """
-        cursor = SELECT(F.count()).source(self.set).execute(connection, **context)
-        return cursor.fetchone()[0]
+        return self._unordered(connection)._count(connection, context)
 
     def total_count(self, connection, **context):
         """
         Return total count of rows in result with no limits applied
         """
-        cursor = SELECT(F.count()).source(self.copy().limit(None, None)).execute(connection, **context)
-        return cursor.fetchone()[0]
+        query = self._unordered(connection)
+        query.limit = None
+        query.offset = None
+        return query._count(connection, context)
+
+    def _unordered(self, connection):
+        """
+        Return a copy of the query with no ORDER BY clause
+        """
+        query = self.copy()
+        query.order = None
+        return query
+
+    def _count(self, connection, context):
+        """
+        Return count of rows in result, counting over the query as a subquery
+        """
+        cursor = SELECT(F.count(C)).FROM(SubqueryAlias(self, u'counted')).execute(connection, **context)
+        try:
+            return cursor.fetchone()[0]
+        finally:
+            cursor.close()
+
+    def iter_rows(self, connection, batch_size=1000, row_type=None, **context):
+        """
+        Execute the query and lazily yield its result rows, fetching `batch_size` rows at a time
+        Rows are yielded as returned by the driver, or converted to dicts or namedtuples
+        according to `row_type`; the row type is built once from the cursor description
+        """
+        assert row_type is None or row_type in self.ROW, 'Invalid row type: {type}'.format(type=row_type)
+        cursor, trace = self._execute(connection, context)
+        fetched = 0
+        try:
+            make_row = self.row_factory(cursor.description, row_type)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                fetched += len(rows)
+                if make_row is None:
+                    for row in rows:
+                        yield row
+                else:
+                    for row in rows:
+                        yield make_row(row)
+        finally:
+            cursor.close()
+            trace.after_fetch(fetched)
+
+    def iter_rows_async(self, connection, batch_size=1000, row_type=None, **context):
+        """
+        Asynchronous iterator over the result rows of the query on an asyncio connection, see `iter_rows`
+        """
+        from ..sql.aio import iter_rows_async
+        assert row_type is None or row_type in self.ROW, 'Invalid row type: {type}'.format(type=row_type)
+        return iter_rows_async(self, connection, batch_size, row_type, context)
+
+    def cached(self, ttl=None, key=None, cache=None, namespace=None):
+        """
+        Make `fetch` return cached results for up to `ttl` seconds (the cache's default if None)
+        Results are keyed by the rendered SQL and parameters, or by `key` if given, which saves rendering
+        the query on cache hits; `cache` is a `ResultCache`, the shared default cache if None;
+        `namespace` keeps the results of different databases apart (the cache's namespace if None)
+        """
+        query = self._derive()
+        query.caching = default_cache if cache is None else cache, ttl, key, namespace
+        return query
+
+    def fetch(self, connection, row_type=None, **context):
+        """
+        Execute the query and return all result rows, converted according to `row_type`
+        """
+        assert row_type is None or row_type in self.ROW, 'Invalid row type: {type}'.format(type=row_type)
+        if self.caching is not None:
+            cache, ttl, key, namespace = self.caching
+            description, rows = cache.fetch(self, connection, context, ttl=ttl, key=key, namespace=namespace)
+        else:
+            description, rows = self._fetch(connection, context)
+        make_row = self.row_factory(description, row_type)
+        return rows if make_row is None else [make_row(row) for row in rows]
 
-    def _order_limit_as_sql(self, connection, context):
+    def _fetch(self, connection, context):
+        """
+        Execute the query and return the column names (as a cursor description) and all result rows
+        """
+        cursor, trace = self._execute(connection, context)
+        try:
+            rows = cursor.fetchall()
+            description = tuple((column[0],) for column in cursor.description)
+        finally:
+            cursor.close()
+        trace.after_fetch(len(rows))
+        return description, rows
+
+    @classmethod
+    def row_factory(cls, description, row_type):
+        """
+        Return a callable that converts a driver row to `row_type`, or None to keep driver rows
+        """
+        if row_type is None or row_type == cls.ROW.TUPLE:
+            return None
+        names = tuple(column[0] for column in description)
+        if row_type == cls.ROW.DICT:
+            return lambda row: dict(zip(names, row))
+        return namedtuple('Row', names, rename=True)._make
+
+    def _order_limit_as_sql(self, output):
         """
         Render ORDER BY and LIMIT clauses
         """
-        sql = ''
-        args = ()
         if self.order is not None:
-            order_sql, order_args = SQLIterator(self.order)._as_sql(connection, context)
-            sql += u' ORDER BY {order}'.format(order=order_sql)
-            args += order_args
+            output.write(u' ORDER BY ')
+            output.render(SQLIterator(self.order))
         if self.limit is not None:
-            limit_sql, limit_args = SQL.wrap(self.limit)._as_sql(connection, context)
-            sql += u' LIMIT {limit}'.format(limit=limit_sql)
-            args += limit_args
+            output.write(u' LIMIT ')
+            output.render(SQL.wrap(self.limit))
             if self.offset is not None:
-                offset_sql, offset_args = SQL.wrap(self.offset)._as_sql(connection, context)
-                sql += u' OFFSET {offset}'.format(offset=offset_sql)
-                args += offset_args
+                output.write(u' OFFSET ')
+                output.render(SQL.wrap(self.offset))
         else:
             assert self.offset is None, 'Cannot specify OFFSET without LIMIT clause'
-        return sql, args
 
 
 class SELECT(BaseSelect):
 
+    __slots__ = ('dup', 'dup_columns', 'columns', 'source', 'windows', 'cte', 'after')
+
     DUP = Const('DUP', """Duplicate strategies""",
         ALL=u'ALL ',
         DISTINCT=u'DISTINCT ',
@@ -92,150 +243,259 @@ class SELECT(BaseSelect):
         self.source = None
         self.windows = []
         self.cte = []
+        self.after = None
 
     def ALL(self, *columns):
-        self.dup = self.DUP.ALL
-        self.dup_columns = columns
-        return self
+        query = self._derive()
+        query.dup = self.DUP.ALL
+        query.dup_columns = columns
+        return query
 
     def DISTINCT(self, *columns):
-        self.dup = self.DUP.DISTINCT
-        self.dup_columns = columns
-        return self
+        query = self._derive()
+        query.dup = self.DUP.DISTINCT
+        query.dup_columns = columns
+        return query
 
-    def _as_sql(self, connection, context):
+    def _render(self, output):
+        if self.cte:
+            output.write(u'WITH ')
+            output.render(SQLIterator(self.cte))
+            output.write(u' ')
+
+        output.write(u'SELECT ')
         if self.dup is not None:
-            dup_sql, dup_args = SQLIterator(self.dup_columns)._as_sql(connection, context)
-            dup_sql = u'{dup}{on}'.format(
-                dup=self.dup,
-                on=u'ON ({expr}) '.format(expr=dup_sql) if dup_sql else u'',
-            )
-        else:
-            dup_sql = u''
-            dup_args = ()
+            output.write(self.dup)
+            if self.dup_columns:
+                output.write(u'ON (')
+                output.render(SQLIterator(self.dup_columns))
+                output.write(u') ')
 
         if self.columns:
-            columns_sql, columns_args = SQLIterator(self.columns)._as_sql(connection, context)
+            output.render(SQLIterator(self.columns))
         else:
-            columns_sql = u'*'
-            columns_args = ()
-
-        sql = u'SELECT {dup}{columns}'.format(
-            dup=dup_sql,
-            columns=columns_sql,
-        )
-        args = dup_args + columns_args
+            output.write(u'*')
 
         if self.source is not None:
-            source_sql, source_args = self.source._as_sql(connection, context)
-            sql += source_sql
-            args += source_args
+            if self.after is not None:
+                output.render(self.source.filtered(seek_condition(self.seek_keys(output.connection), self.after)))
+            else:
+                output.render(self.source)
         if self.windows:
-            windows = []
+            sep = u' WINDOW '
             for name, window in sorted(self.windows):
-                alias_sql, alias_args = SQL.wrap(name, id=True)._as_sql(connection, context)
-                window_sql, window_args = window._as_sql(connection, context)
-                windows.append(u'{name} AS {window}'.format(
-                    name=alias_sql,
-                    window=window_sql,
-                ))
-                args += alias_args + window_args
-            sql += u' WINDOW {windows}'.format(
-                windows=', '.join(windows),
-            )
-        order_limit_sql, order_limit_args = self._order_limit_as_sql(connection, context)
-        sql += order_limit_sql
-        args += order_limit_args
-
-        if self.cte:
-            cte_sql, cte_args = SQLIterator(self.cte)._as_sql(connection, context)
-            sql = u'WITH {cte} {query}'.format(
-                cte=cte_sql,
-                query=sql,
-            )
-            args = cte_args + args
-
-        return sql, args
+                output.write(sep)
+                output.render(SQL.wrap(name, id=True))
+                output.write(u' AS ')
+                output.render(window)
+                sep = u', '
+        self._order_limit_as_sql(output)
 
     def copy(self):
-        copy = self.set_copy()
-        copy.order = self.order
-        copy.limit = self.limit
-        copy.offset = self.offset
-        copy.set = [query.copy() for query in self.set]
-        return copy
+        query = super(SELECT, self).copy()
+        query.columns = list(self.columns)
+        query.windows = list(self.windows)
+        query.cte = list(self.cte)
+        if self.source is not None:
+            query.source = self.source.copy()
+        return query
+
+    def _derive_source(self):
+        """
+        Return the query a FROM clause method should modify, with its own FROM clause if the query is frozen
+        """
+        if self.source is None:
+            raise TypeError('Cannot filter query with no FROM clause')
+        query = self._derive()
+        if query is not self:
+            query.source = self.source.copy()
+        return query
 
     def FROM(self, *args, **kwargs):
-        self.source = From(*args, **kwargs)
-        return self
+        query = self._derive()
+        query.source = From(*args, **kwargs)
+        return query
 
     def CROSS_JOIN(self, *args, **kwargs):
-        if self.source is None:
-            raise TypeError('Cannot filter query with no FROM clause')
-        self.source.CROSS_JOIN(*args, **kwargs)
-        return self
+        query = self._derive_source()
+        query.source.CROSS_JOIN(*args, **kwargs)
+        return query
 
     def LEFT_JOIN(self, *args, **kwargs):
-        if self.source is None:
-            raise TypeError('Cannot filter query with no FROM clause')
-        self.source.LEFT_JOIN(*args, **kwargs)
-        return self
+        query = self._derive_source()
+        query.source.LEFT_JOIN(*args, **kwargs)
+        return query
 
     def RIGHT_JOIN(self, *args, **kwargs):
-        if self.source is None:
-            raise TypeError('Cannot filter query with no FROM clause')
-        self.source.RIGHT_JOIN(*args, **kwargs)
-        return self
+        query = self._derive_source()
+        query.source.RIGHT_JOIN(*args, **kwargs)
+        return query
 
     def FULL_JOIN(self, *args, **kwargs):
-        if self.source is None:
-            raise TypeError('Cannot filter query with no FROM clause')
-        self.source.FULL_JOIN(*args, **kwargs)
-        return self
+        query = self._derive_source()
+        query.source.FULL_JOIN(*args, **kwargs)
+        return query
 
     def INNER_JOIN(self, *args, **kwargs):
-        if self.source is None:
-            raise TypeError('Cannot filter query with no FROM clause')
-        self.source.INNER_JOIN(*args, **kwargs)
-        return self
+        query = self._derive_source()
+        query.source.INNER_JOIN(*args, **kwargs)
+        return query
 
     def WHERE(self, *args, **kwargs):
         """
         Set up a WHERE clause on the data source
         """
+        query = self._derive_source()
+        query.source.WHERE(*args, **kwargs)
+        return query
+
+    def _unordered(self, connection):
+        """
+        Return a copy of the query with no ORDER BY clause, with the seek condition of `PAGINATE_AFTER`
+        moved into the WHERE clause as it depends on the sort keys
+        """
+        query = super(SELECT, self)._unordered(connection)
+        if self.after is not None:
+            query.source = query.source.filtered(seek_condition(self.seek_keys(connection), self.after))
+            query.after = None
+        return query
+
+    def PAGINATE_AFTER(self, last_row):
+        """
+        Limit the query to rows that sort after `last_row` (the values of the ORDER BY keys of the last row seen)
+        """
         if self.source is None:
             raise TypeError('Cannot filter query with no FROM clause')
-        self.source.WHERE(*args, **kwargs)
-        return self
+        query = self._derive()
+        query.after = None if last_row is None else tuple(last_row)
+        return query
+
+    def paginate(self, connection, page_size, row_type=None, **context):
+        """
+        Walk all pages of the query, seeking past the last row of each page instead of using OFFSET
+        Yields lists of at most `page_size` rows; the ORDER BY keys must be present in the result columns
+        """
+        assert self.order, 'Cannot paginate query with no ORDER BY clause'
+        query = copy.copy(self)
+        query.limit = page_size
+        query.offset = None
+        key_indexes = None
+        while True:
+            cursor, trace = query._execute(connection, context)
+            try:
+                rows = cursor.fetchall()
+                if key_indexes is None:
+                    key_indexes = self.key_indexes(connection, cursor.description)
+                    make_row = self.row_factory(cursor.description, row_type)
+            finally:
+                cursor.close()
+            trace.after_fetch(len(rows))
+            if not rows:
+                return
+            yield rows if make_row is None else [make_row(row) for row in rows]
+            if len(rows) < page_size:
+                return
+            query = copy.copy(query)
+            query.after = tuple(rows[-1][index] for index in key_indexes)
+
+    def fetch_with_total(self, connection, row_type=None, **context):
+        """
+        Return the result rows together with the total count of rows with no limits applied
+        The total is computed by the same query using `count(*) OVER ()`; DISTINCT queries
+        and pages past the end of the result need a separate counting query
+        """
+        assert row_type is None or row_type in self.ROW, 'Invalid row type: {type}'.format(type=row_type)
+        if self.dup is not None:
+            return self.fetch(connection, row_type, **context), self.total_count(connection, **context)
+        query = self.copy()
+        query.columns = (query.columns or [C]) + [F.count(C).OVER()]
+        cursor, trace = query._execute(connection, context)
+        try:
+            rows = cursor.fetchall()
+            make_row = self.row_factory(cursor.description[:-1], row_type)
+        finally:
+            cursor.close()
+        trace.after_fetch(len(rows))
+        if not rows:
+            return [], (0 if not self.offset else self.total_count(connection, **context))
+        total = rows[0][-1]
+        if make_row is None:
+            return [row[:-1] for row in rows], total
+        return [make_row(row[:-1]) for row in rows], total
+
+    def key_indexes(self, connection, description):
+        """
+        Return the result column indexes of the ORDER BY keys
+        """
+        names = [column[0] for column in description]
+        columns = [self.column_name(column, connection) for column in self.columns]
+        indexes = []
+        for item in self.order:
+            key = SQL.wrap(item.expr if isinstance(item, Sorting) else item)
+            sql = key._as_sql(connection, {})[0]
+            if sql in columns:
+                indexes.append(columns.index(sql))
+            elif sql.split(u'.')[-1] in names:
+                indexes.append(names.index(sql.split(u'.')[-1]))
+            else:
+                raise ValueError('Sort key {key!r} is not in the result columns'.format(key=key))
+        return indexes
+
+    def seek_keys(self, connection):
+        """
+        Return the ORDER BY keys, with references to column aliases replaced by the aliased expressions
+        """
+        aliases = dict(
+            (self.column_name(column, connection), column._origin)
+            for column in self.columns
+            if isinstance(column, Alias)
+        )
+        keys = []
+        for item in self.order or ():
+            key = item if isinstance(item, Sorting) else Sorting(item)
+            origin = aliases.get(SQL.wrap(key.expr)._as_sql(connection, {})[0])
+            if origin is not None:
+                key = Sorting(origin, direction=key.direction, nulls=key.nulls)
+            keys.append(key)
+        return keys
+
+    @staticmethod
+    def column_name(column, connection):
+        """
+        Return the SQL a sort key would use to refer to a result column
+        """
+        if isinstance(column, Alias):
+            column = SQL.wrap(column._alias, id=True)
+        return SQL.wrap(column)._as_sql(connection, {})[0]
 
     def GROUP_BY(self, *args, **kwargs):
         """
         Set up a GROUP BY clause on the data source
         """
-        if self.source is None:
-            raise TypeError('Cannot filter query with no FROM clause')
-        self.source.GROUP_BY(*args, **kwargs)
-        return self
+        query = self._derive_source()
+        query.source.GROUP_BY(*args, **kwargs)
+        return query
 
     def HAVING(self, *args, **kwargs):
         """
         Set up a HAVING clause on the data source
         """
-        if self.source is None:
-            raise TypeError('Cannot filter query with no FROM clause')
-        self.source.HAVING(*args, **kwargs)
-        return self
+        query = self._derive_source()
+        query.source.HAVING(*args, **kwargs)
+        return query
 
     def WINDOW(self, name, *args, **kwargs):
         """
         Set up a named window definition
         """
-        self.windows.append((name, Window(*args, **kwargs)))
-        return self
+        query = self._derive()
+        query.windows = query.windows + [(name, Window(*args, **kwargs))]
+        return query
 
     def WITH(self, name, *args, **kwargs):
-        self.cte.append(CTE(name, *args, **kwargs))
-        return self
+        query = self._derive()
+        query.cte = query.cte + [CTE(name, *args, **kwargs)]
+        return query
 
 
 class SelectSet(BaseSelect):
@@ -243,6 +503,8 @@ class SelectSet(BaseSelect):
     Wrapper for a set operation on SELECT statements
     """
 
+    __slots__ = ('left', 'right', 'op', 'dup')
+
     OP = Const('OP', """Operators""",
         UNION=u'UNION',
         INTERSECT=u'INTERSECT',
@@ -262,35 +524,40 @@ class SelectSet(BaseSelect):
         self.order = None
         self.limit = None
         self.offset = None
+        self.frozen = False
+        self.caching = None
+        self.dependencies = None
 
-    def _as_sql(self, connection, context):
-        left_sql, left_args = self.left._as_sql(connection, context)
+    def _render(self, output):
         if isinstance(self.left, SelectSet):
-            left_sql = u'({sql})'.format(sql=left_sql)
-        right_sql, right_args = self.right._as_sql(connection, context)
-        if isinstance(self.right, SelectSet):
-            right_sql = u'({sql})'.format(sql=right_sql)
-        sql = u'{left} {op} {dup}{right}'.format(
-            left=left_sql,
+            output.write(u'(')
+            output.render(self.left)
+            output.write(u')')
+        else:
+            output.render(self.left)
+        output.write(u' {op} {dup}'.format(
             op=self.op,
             dup=self.dup or '',
-            right=right_sql,
-        )
-        args = left_args + right_args
-        order_limit_sql, order_limit_args = self._order_limit_as_sql(connection, context)
-        sql += order_limit_sql
-        args += order_limit_args
-        return sql, args
+        ))
+        if isinstance(self.right, SelectSet):
+            output.write(u'(')
+            output.render(self.right)
+            output.write(u')')
+        else:
+            output.render(self.right)
+        self._order_limit_as_sql(output)
 
     @property
     def ALL(self):
-        self.dup = self.DUP.ALL
-        return self
+        query = self._derive()
+        query.dup = self.DUP.ALL
+        return query
 
     @property
     def DISTINCT(self):
-        self.dup = self.DUP.DISTINCT
-        return self
+        query = self._derive()
+        query.dup = self.DUP.DISTINCT
+        return query
 
 
 class From(SQL):
@@ -298,43 +565,40 @@ class From(SQL):
     FROM clause wrapper
     """
 
+    __slots__ = ('source', 'where', 'group_by', 'having')
+
     def __init__(self, source):
         self.source = source
         self.where = None
         self.group_by = None
         self.having = None
 
-    def _as_sql(self, connection, context):
-        sql, args = SQL.wrap(self.source)._as_sql(connection, context)
-        sql = u' FROM {source}'.format(
-            source=sql,
-        )
+    def _render(self, output):
+        output.write(u' FROM ')
+        output.render(SQL.wrap(self.source))
         if self.where:
-            where_sql, where_args = SQL.wrap(self.where)._as_sql(connection, context)
-            sql += u' WHERE {condition}'.format(
-                condition=where_sql,
-            )
-            args += where_args
+            output.write(u' WHERE ')
+            output.render(SQL.wrap(self.where))
         if self.group_by:
-            group_sql, group_args = SQLIterator(self.group_by)._as_sql(connection, context)
-            sql += u' GROUP BY {columns}'.format(
-                columns=group_sql,
-            )
-            args += group_args
+            output.write(u' GROUP BY ')
+            output.render(SQLIterator(self.group_by))
         if self.having:
-            having_sql, having_args = SQL.wrap(self.having)._as_sql(connection, context)
-            sql += u' HAVING {condition}'.format(
-                condition=having_sql,
-            )
-            args += having_args
-        return sql, args
+            output.write(u' HAVING ')
+            output.render(SQL.wrap(self.having))
+
+    def filtered(self, condition):
+        """
+        Return a copy of this clause with `condition` added to its WHERE clause
+        """
+        filtered = copy.copy(self)
+        filtered.where = condition if self.where is None else AND(self.where, condition)
+        return filtered
 
     def copy(self):
-        copy = self.__class__(source=self.source.copy())
-        copy.where = None if self.where is None else self.where.copy()
-        copy.group_by = None if self.group_by is None else self.group_by.copy()
-        copy.having = None if self.having is None else self.having.copy()
-        return copy
+        """
+        Return a copy of this clause that shares its source and conditions
+        """
+        return copy.copy(self)
 
     def CROSS_JOIN(self, *args, **kwargs):
         kwargs.setdefault('parens', False)
@@ -388,21 +652,22 @@ class CTE(SQL):
     Wrapper for common table expressions
     """
 
+    __slots__ = ('name', 'query', 'recursive')
+
     def __init__(self, name, query, RECURSIVE=False):
         self.name = name
         self.query = query
         self.recursive = RECURSIVE
 
-    def _as_sql(self, connection, context):
-        name_sql, name_args = SQL.wrap(self.name, id=True)._as_sql(connection, context)
-        query_sql, query_args = self.query._as_sql(connection, context)
-        sql = u'{name} AS ({query})'.format(
-            name=name_sql,
-            query=query_sql,
-        )
+    def _render(self, output):
         if self.recursive:
-            sql = u'RECURSIVE {sql}'.format(sql=sql)
-        return sql, name_args + query_args
+            output.write(u'RECURSIVE ')
+        output.render(SQL.wrap(self.name, id=True))
+        output.write(u' AS (')
+        output.render(self.query)
+        output.write(u')')
 
 
-from ..sql.alias import SubqueryAlias
+from ..sql.alias import Alias, SubqueryAlias
+from ..cache import default_cache
+from .dependencies import tables
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+"""
+asyncio query execution (Python 3.6+)
+Drivers are expected to follow the DB-API; connection and cursor methods may be coroutines or plain methods
+"""
+
+import asyncio
+import inspect
+from .walk import count_nodes
+from ..instrument import instrumentation
+
+
+async def resolve(value):
+    """
+    Await `value` if it is awaitable; drivers differ in which cursor methods are coroutines
+    """
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+def render(query, connection, context):
+    return list(query.statements(connection, context))
+
+
+async def render_async(query, connection, context):
+    """
+    Render the statements of `query`, in a worker thread if its tree has more than `ASYNC_RENDER_NODES` nodes
+    """
+    limit = query.ASYNC_RENDER_NODES
+    if limit is None or count_nodes(query, limit=limit + 1) <= limit:
+        return render(query, connection, context)
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(query.ASYNC_RENDER_EXECUTOR, render, query, connection, context)
+
+
+async def execute_async(query, connection, context):
+    return (await traced_execute_async(query, connection, context))[0]
+
+
+async def traced_execute_async(query, connection, context):
+    """
+    Execute `query`, returning the cursor and the instrumentation trace of the execution
+    """
+    trace = instrumentation.trace(query)
+    try:
+        trace.before_render()
+        statements = await render_async(query, connection, context)
+        cursor = await resolve(connection.cursor())
+    except Exception as error:
+        trace.failed(error)
+        raise
+    try:
+        for sql, args in statements:
+            trace.after_render(sql, len(args))
+            trace.before_execute()
+            await resolve(cursor.execute(sql, args))
+            trace.after_statement()
+    except Exception as error:
+        await resolve(cursor.close())
+        trace.failed(error)
+        raise
+    trace.after_execute(cursor)
+    return cursor, trace
+
+
+async def iter_rows_async(query, connection, batch_size, row_type, context):
+    cursor, trace = await traced_execute_async(query, connection, context)
+    fetched = 0
+    try:
+        make_row = query.row_factory(cursor.description, row_type)
+        while True:
+            rows = await resolve(cursor.fetchmany(batch_size))
+            if not rows:
+                break
+            fetched += len(rows)
+            for row in rows:
+                yield row if make_row is None else make_row(row)
+    finally:
+        await resolve(cursor.close())
+        trace.after_fetch(fetched)
@@ -15,18 +15,16 @@ class Alias(SQL):
     Alias of an expression
     """
 
+    __slots__ = ('_origin', '_alias')
+
     def __init__(self, origin, alias):
         self._origin = origin
         self._alias = alias
 
-    def _as_sql(self, connection, context):
-        origin_sql, origin_args = SQL.wrap(self._origin)._as_sql(connection, context)
-        alias_sql, alias_args = SQL.wrap(self._alias, id=True)._as_sql(connection, context)
-        sql = u'{origin} AS {alias}'.format(
-            origin=origin_sql,
-            alias=alias_sql,
-        )
-        return sql, origin_args + alias_args
+    def _render(self, output):
+        output.render(SQL.wrap(self._origin))
+        output.write(u' AS ')
+        output.render(SQL.wrap(self._alias, id=True))
 
 
 class TableAlias(Alias, Joinable):
@@ -34,6 +32,8 @@ class TableAlias(Alias, Joinable):
     Alias of a table
     """
 
+    __slots__ = ('_columns',)
+
     def __init__(self, origin, alias, columns=None):
         super(TableAlias, self).__init__(origin, alias)
         self._columns = columns
@@ -44,19 +44,18 @@ class TableAlias(Alias, Joinable):
             subname=name,
         ))
 
-    def _as_sql(self, connection, context):
-        origin_sql, origin_args = SQL.wrap(self._origin)._as_sql(connection, context)
-        alias_sql, alias_args = SQL.wrap(self._alias, id=True)._as_sql(connection, context)
-        sql = u'{origin} AS {alias}'.format(
-            origin=origin_sql,
-            alias=alias_sql,
-        )
+    def _render(self, output):
+        super(TableAlias, self)._render(output)
+        self.columns_to_sql(output)
+
+    def columns_to_sql(self, output):
+        """
+        Render the column aliases list
+        """
         if self._columns:
-            columns_sql, columns_args = SQLIterator(self._columns, id=True)._as_sql(connection, context)
-            sql += '({columns})'.format(columns=columns_sql)
-        else:
-            columns_args = ()
-        return sql, origin_args + alias_args + columns_args
+            output.write(u'(')
+            output.render(SQLIterator(self._columns, id=True))
+            output.write(u')')
 
 
 class SubqueryAlias(TableAlias):
@@ -64,24 +63,18 @@ class SubqueryAlias(TableAlias):
     Alias of a subquery
     """
 
+    __slots__ = ('_lateral',)
+
     def __init__(self, origin, alias, columns=None, LATERAL=None):
         super(SubqueryAlias, self).__init__(origin, alias, columns=columns)
         self._lateral = LATERAL or False
 
-    def _as_sql(self, connection, context):
-        origin_sql, origin_args = SQL.wrap(self._origin)._as_sql(connection, context)
-        alias_sql, alias_args = SQL.wrap(self._alias, id=True)._as_sql(connection, context)
-        sql = u'{lateral}({origin}) AS {alias}'.format(
-            lateral=u'LATERAL ' if self._lateral else u'',
-            origin=origin_sql,
-            alias=alias_sql,
-        )
-        if self._columns:
-            columns_sql, columns_args = SQLIterator(self._columns, id=True)._as_sql(connection, context)
-            sql += '({columns})'.format(columns=columns_sql)
-        else:
-            columns_args = ()
-        return sql, origin_args + alias_args + columns_args
+    def _render(self, output):
+        output.write(u'LATERAL (' if self._lateral else u'(')
+        output.render(SQL.wrap(self._origin))
+        output.write(u') AS ')
+        output.render(SQL.wrap(self._alias, id=True))
+        self.columns_to_sql(output)
 
 
 class AliasFactory(object):
@@ -102,6 +95,8 @@ class AliasName(object):
     Wrapper for an alias name
     """
 
+    __slots__ = ('name',)
+
     def __init__(self, name):
         self.name = name
 
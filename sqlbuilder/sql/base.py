@@ -5,6 +5,7 @@ SQL base syntax
 """
 
 from __future__ import absolute_import
+from .buffer import Buffer
 
 
 class SQL(object):
@@ -13,6 +14,8 @@ class SQL(object):
     Used as a wrapper for primitive values (values and identifiers)
     """
 
+    __slots__ = ()
+
     @staticmethod
     def merge(iterable, sep=', '):
         """
@@ -22,13 +25,14 @@ class SQL(object):
 
         if iterable is None:
             return u'', ()
-        iterable = list(iterable)
-        if not len(iterable):
+        sql = []
+        args = []
+        for item_sql, item_args in iterable:
+            sql.append(item_sql)
+            args.extend(item_args)
+        if not sql:
             return u'', ()
-        sql, args = zip(*iterable)
-        sql = sep.join(sql)
-        args = sum(args, ())
-        return sql, args
+        return sep.join(sql), tuple(args)
 
     @classmethod
     def wrap(cls, value, id=False):
@@ -41,7 +45,41 @@ class SQL(object):
         return Identifier(value) if id else Value(value)
 
     def _as_sql(self, connection, context):
-        raise NotImplementedError()
+        """
+        Render this instance as a `sql, args` tuple
+        """
+        output = Buffer(connection, context)
+        output.render(self)
+        return output.result()
+
+    def _render(self, output):
+        """
+        Render this instance into a shared output buffer
+        Falls back to `_as_sql` for subclasses that only implement that, which must return `format` placeholders
+        """
+        if type(self)._as_sql == SQL._as_sql:
+            raise NotImplementedError()
+        output.extend(*self._as_sql(output.connection, output.context))
+
+    def normalize(self):
+        """
+        Return an equivalent, simplified expression
+        """
+        return self
+
+    def normalized_key(self):
+        """
+        Return a hashable key that is equal for expressions that render identically, or None
+        Parameter values are keyed with their types, so that e.g. `1`, `1.0` and `True` are told apart
+        """
+        sql, args = shape(self, dummy_connection, slot_context)
+        key = sql, tuple((type(value), value) for value in args)
+        try:
+            hash(key)
+        except TypeError:
+            # some parameter values are not hashable
+            return None
+        return key
 
     def __unicode__(self):
         sql, args = self._as_sql(dummy_connection, dummy_context)
@@ -62,6 +100,8 @@ class SQLIterator(SQL):
     Iterator of SQL objects
     """
 
+    __slots__ = ('iterable', 'sep', 'id')
+
     def __init__(self, iterable, sep=', ', id=False):
         self.iterable = iterable
         self.sep = sep
@@ -78,9 +118,16 @@ class SQLIterator(SQL):
     def iter(self):
         return self.__iter__()
 
-    def _as_sql(self, connection, context):
-        return SQL.merge((item._as_sql(connection, context) for item in self), sep=self.sep)
+    def _render(self, output):
+        first = True
+        for item in self:
+            if not first:
+                output.write(self.sep)
+            first = False
+            output.render(item)
 
 
 from .expression import Identifier, Value
+from .shape import shape
+from .template import slot_context
 from ..dummy import dummy_connection, dummy_context
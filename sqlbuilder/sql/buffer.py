@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+
+"""
+SQL output buffer
+"""
+
+from __future__ import absolute_import
+import re
+from weakref import WeakKeyDictionary
+
+
+# parameter placeholders of the supported paramstyles; numbered placeholders are formatted with the parameter number
+PLACEHOLDERS = {
+    u'format': u'%s',
+    u'qmark': u'?',
+    u'numeric': u':{number}',
+    u'dollar': u'${number}',
+    u'named': u':p{number}',
+    u'pyformat': u'%(p{number})s',
+}
+
+# paramstyles that bind parameters by name
+NAMED_PARAMSTYLES = (u'named', u'pyformat')
+
+# placeholders and escaped percent signs of `format` SQL fragments
+FORMAT_TOKENS = re.compile(u'(%s|%%)')
+
+try:
+    RecursionError = RecursionError
+except NameError:
+    # Python 2
+    RecursionError = RuntimeError
+
+
+def pack_args(paramstyle, values):
+    """
+    Return parameter values in the form the paramstyle binds them: a dict for named styles, a tuple otherwise
+    """
+    if paramstyle in NAMED_PARAMSTYLES:
+        return dict((u'p{number}'.format(number=number), value) for number, value in enumerate(values, 1))
+    return tuple(values)
+
+
+class QuoteCache(object):
+    """
+    Memoized identifier and function name quoting of a dialect
+    """
+
+    __slots__ = ('identifiers', 'function_names')
+
+    # entries kept per connection before the memo is reset
+    MAX_SIZE = 10000
+
+    def __init__(self):
+        self.identifiers = {}
+        self.function_names = {}
+
+    @classmethod
+    def get(cls, dialect):
+        """
+        Return the quote cache of `dialect`
+        """
+        try:
+            return quote_caches[dialect]
+        except KeyError:
+            cache = quote_caches[dialect] = cls()
+            return cache
+        except TypeError:
+            # dialect cannot be weakly referenced, memoize for a single rendering only
+            return cls()
+
+    def quote(self, memo, quote, name):
+        """
+        Quote `name`, memoizing the result in `memo`
+        """
+        if len(memo) >= self.MAX_SIZE:
+            memo.clear()
+        quoted = memo[name] = quote(name)
+        return quoted
+
+quote_caches = WeakKeyDictionary()
+
+
+class Deferred(object):
+    """
+    Subtree queued for rendering from the explicit stack of an iterative render
+    Holds the SQL fragments and parameters of the subtree once it is rendered
+    """
+
+    __slots__ = ('expr', 'sql', 'args')
+
+    def __init__(self, expr):
+        self.expr = expr
+        self.sql = []
+        self.args = []
+
+
+class Buffer(object):
+    """
+    Shared output buffer for rendering an expression tree
+    Nodes append SQL fragments and parameter values as they are rendered;
+    the final `sql, args` tuple is assembled once, when rendering is complete
+    """
+
+    __slots__ = (
+        'connection', 'context', 'dialect', 'operators', 'sql', 'args', 'quoted', 'recursive', 'deferred',
+        'paramstyle', 'placeholder', 'numbers', 'values',
+    )
+
+    def __init__(self, connection, context):
+        self.connection = connection
+        self.context = context
+        # connections without a declared dialect provide the dialect methods themselves
+        self.dialect = getattr(connection, 'dialect', None) or connection
+        self.operators = getattr(self.dialect, 'operators', None)
+        self.sql = []
+        self.args = []
+        self.quoted = QuoteCache.get(self.dialect)
+        self.recursive = False
+        self.deferred = None
+        self.use_paramstyle(getattr(self.dialect, 'PARAMSTYLE', u'format'))
+
+    def use_paramstyle(self, paramstyle, dedupe=True):
+        """
+        Render placeholders in `paramstyle` instead of the paramstyle of the dialect, must be called before rendering
+        Numbered styles bind repeated values once unless `dedupe` is false, then every parameter gets its own number
+        """
+        self.paramstyle = paramstyle
+        placeholder = PLACEHOLDERS[paramstyle]
+        if u'{number}' in placeholder:
+            # parameters are numbered in order of first appearance
+            self.placeholder = None
+            self.numbers = {} if dedupe else None
+            self.values = []
+        else:
+            self.placeholder = placeholder
+            self.numbers = self.values = None
+
+    def render(self, expr):
+        """
+        Render an SQL instance into the buffer
+        Trees are rendered recursively; a tree too deep for the interpreter stack is rendered again
+        from an explicit stack by `render_iterative`, so trees of any depth can be rendered
+        """
+        if self.recursive:
+            expr._render(self)
+        elif self.deferred is not None:
+            self.defer(expr)
+        else:
+            self.render_root(expr)
+
+    def render_node(self, expr):
+        """
+        Render a single node of the tree, its children are rendered through `render`
+        """
+        expr._render(self)
+
+    def render_root(self, expr):
+        mark = self.mark()
+        self.recursive = True
+        try:
+            self.render_node(expr)
+        except RecursionError:
+            self.recursive = False
+            self.rewind(mark)
+            self.render_iterative(expr)
+        finally:
+            self.recursive = False
+
+    def render_iterative(self, expr):
+        """
+        Render a tree without recursion: every node leaves a placeholder for each of its children,
+        and the children are rendered from a stack in the same order as a recursive render would
+        """
+        sql, args = self.sql, self.args
+        deferred = self.deferred = []
+        try:
+            self.defer(expr)
+            while deferred:
+                item = deferred.pop()
+                self.sql, self.args = item.sql, item.args
+                start = len(deferred)
+                self.render_node(item.expr)
+                # children were queued in order, reverse them so the first child is rendered first
+                deferred[start:] = deferred[start:][::-1]
+        finally:
+            self.deferred = None
+            self.sql, self.args = sql, args
+        self.sql[:] = splice(sql, 'sql')
+        self.args[:] = splice(args, 'args')
+
+    def defer(self, expr):
+        """
+        Leave a placeholder for `expr` in the output and queue it for rendering
+        """
+        deferred = Deferred(expr)
+        self.sql.append(deferred)
+        self.args.append(deferred)
+        self.deferred.append(deferred)
+
+    def mark(self):
+        """
+        Return the current output position, see `rewind`
+        """
+        return len(self.sql), len(self.args), 0 if self.values is None else len(self.values)
+
+    def rewind(self, mark):
+        """
+        Discard the output rendered since `mark` was taken
+        """
+        sql, args, values = mark
+        del self.sql[sql:]
+        del self.args[args:]
+        if self.values is not None:
+            del self.values[values:]
+        if self.numbers is not None:
+            self.numbers = {}
+            for number, value in enumerate(self.values, 1):
+                try:
+                    self.numbers.setdefault((type(value), value), number)
+                except TypeError:
+                    pass
+
+    def write(self, sql):
+        """
+        Append a literal SQL fragment
+        """
+        self.sql.append(sql)
+
+    def param(self, value):
+        """
+        Append a parameter placeholder and its value
+        """
+        if self.placeholder is not None:
+            self.sql.append(self.placeholder)
+            self.args.append(value)
+        else:
+            self.sql.append(PLACEHOLDERS[self.paramstyle].format(number=self.number(value)))
+
+    def number(self, value):
+        """
+        Return the parameter number of `value` in a numbered paramstyle, adding the value if it was not bound yet
+        """
+        if self.numbers is None:
+            self.values.append(value)
+            return len(self.values)
+        try:
+            key = type(value), value
+            return self.numbers[key]
+        except KeyError:
+            self.values.append(value)
+            number = self.numbers[key] = len(self.values)
+            return number
+        except TypeError:
+            # unhashable values are not deduplicated
+            self.values.append(value)
+            return len(self.values)
+
+    def extend(self, sql, args):
+        """
+        Append an already rendered `sql, args` pair, with placeholders in the `format` paramstyle
+        """
+        if self.paramstyle == u'format':
+            self.sql.append(sql)
+            self.args.extend(args)
+            return
+        args = iter(args)
+        for token in FORMAT_TOKENS.split(sql):
+            if token == u'%s':
+                self.param(next(args))
+            elif token == u'%%':
+                self.sql.append(u'%')
+            elif token:
+                self.sql.append(token)
+
+    def identifier(self, name):
+        """
+        Append a quoted identifier
+        """
+        try:
+            self.sql.append(self.quoted.identifiers[name])
+        except KeyError:
+            self.sql.append(self.quoted.quote(self.quoted.identifiers, self.dialect.quote_identifier, name))
+
+    def function_name(self, name):
+        """
+        Append a quoted function name
+        """
+        try:
+            self.sql.append(self.quoted.function_names[name])
+        except KeyError:
+            self.sql.append(self.quoted.quote(self.quoted.function_names, self.dialect.quote_function_name, name))
+
+    def override(self, op, *operands):
+        """
+        Give the dialect a chance to render an operator
+        The dialect can return a `sql, args` tuple, or an SQL instance to render in place of the operator
+        Returns True if the dialect has overridden the operator
+        """
+        if self.operators is None:
+            override = self.dialect.operator_to_sql(op, *operands, context=self.context)
+        else:
+            # dialect declares its overrides up front, skip the operators it does not override
+            render = self.operators.get(op)
+            if render is None:
+                return False
+            override = render(op, *operands, context=self.context)
+        if override is NotImplemented or override is None:
+            return False
+        if hasattr(override, '_render'):
+            self.render(override)
+        elif override:
+            self.extend(*override)
+        else:
+            return False
+        return True
+
+    def result(self):
+        """
+        Return the rendered `sql, args` tuple, with args packed for the paramstyle
+        """
+        return u''.join(self.sql), pack_args(self.paramstyle, self.parameters())
+
+    def parameters(self):
+        """
+        Return the parameter values in binding order
+        """
+        return self.args if self.values is None else self.values
+
+
+def splice(pieces, attr):
+    """
+    Flatten `pieces`, replacing each deferred placeholder with its own rendered pieces
+    """
+    result = []
+    stack = [iter(pieces)]
+    while stack:
+        for piece in stack[-1]:
+            if type(piece) is Deferred:
+                stack.append(iter(getattr(piece, attr)))
+                break
+            result.append(piece)
+        else:
+            stack.pop()
+    return result
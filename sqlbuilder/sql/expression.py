@@ -6,7 +6,7 @@ SQL expressions
 
 from __future__ import absolute_import
 from .base import SQL, SQLIterator
-from ..utils import Const
+from ..utils import Const, string_types
 
 
 class Expression(SQL):
@@ -14,6 +14,8 @@ class Expression(SQL):
     Wrapper for an expression
     """
 
+    __slots__ = ()
+
     def __lt__(self, other): return BinaryOperator(self, u'<', other)
     def __le__(self, other): return BinaryOperator(self, u'<=', other)
     def __eq__(self, other): return BinaryOperator(self, u'=', other)
@@ -80,14 +82,16 @@ class Value(Expression):
     Plain value
     """
 
+    __slots__ = ('value',)
+
     def __init__(self, value):
         self.value = value
 
-    def _as_sql(self, connection, context):
+    def _render(self, output):
         """
-        Return SQL for this instance
+        Render value as a parameter
         """
-        return u'%s', ( self.value, )
+        output.param(self.value)
 
     def __repr__(self):
         return u'<Value {value!r}>'.format(value=self.value)
@@ -98,12 +102,14 @@ class Variable(Expression):
     Variable placeholder
     """
 
+    __slots__ = ('name',)
+
     def __init__(self, name):
         self.name = name
-        assert isinstance(self.name, basestring), 'Variable name must be a string'
+        assert isinstance(self.name, string_types), 'Variable name must be a string'
 
-    def _as_sql(self, connection, context):
-        return SQL.wrap(context[self.name])._as_sql(connection, context)
+    def _render(self, output):
+        output.render(SQL.wrap(output.context[self.name]))
 
     def __repr__(self):
         return u'<Variable {name!r}>'.format(name=self.name)
@@ -114,21 +120,23 @@ class Identifier(Expression):
     Raw name — can be a column reference or a function call
     """
 
+    __slots__ = ('_name',)
+
     def __init__(self, name):
         object.__setattr__(self, '_name', name)
-        assert isinstance(self._name, basestring), 'Identifier name must be a string'
+        assert isinstance(self._name, string_types), 'Identifier name must be a string'
 
-    def _as_sql(self, connection, context):
+    def _render(self, output):
         """
         Render name as identifier
         """
-        return connection.quote_identifier(self._name), ()
+        output.identifier(self._name)
 
     def __repr__(self):
         return u'<Identifier {name!r}>'.format(name=self._name)
 
     def __getattr__(self, name):
-        return Identifier(u'{name}.{subname}'.format(
+        return intern_name(Identifier, u'{name}.{subname}'.format(
             name=self._name,
             subname=name,
         ))
@@ -148,6 +156,8 @@ class FunctionCall(Expression):
     Function call wrapper
     """
 
+    __slots__ = ('name', 'params', 'dup')
+
     DUP = Const('DUP', """Duplicate strategies""",
         ALL=u'ALL ',
         DISTINCT=u'DISTINCT ',
@@ -157,16 +167,15 @@ class FunctionCall(Expression):
         self.name = name
         self.params = params
         self.dup = None
-        assert isinstance(self.name, basestring), 'Function name must be a string'
+        assert isinstance(self.name, string_types), 'Function name must be a string'
 
-    def _as_sql(self, connection, context):
-        sql, args = SQLIterator(self.params)._as_sql(connection, context)
-        sql = u'{name}({dup}{params})'.format(
-            name=connection.quote_function_name(self.name),
-            dup=self.dup or u'',
-            params=sql,
-        )
-        return sql, args
+    def _render(self, output):
+        output.function_name(self.name)
+        output.write(u'(')
+        if self.dup:
+            output.write(self.dup)
+        output.render(SQLIterator(self.params))
+        output.write(u')')
 
     @property
     def ALL(self):
@@ -187,33 +196,84 @@ class WindowFunctionCall(FunctionCall):
     Window function call wrapper
     """
 
+    __slots__ = ('call', 'window')
+
     def __init__(self, call, *args, **kwargs):
         self.call = call
         self.window = Window(*args, **kwargs) if (len(args) != 1) or kwargs else SQL.wrap(args[0], id=True)
 
-    def _as_sql(self, connection, context):
-        call_sql, call_args = self.call._as_sql(connection, context)
-        window_sql, window_args = self.window._as_sql(connection, context)
-        sql = u'{call} OVER {window}'.format(
-            call=call_sql,
-            window=window_sql,
-        )
-        return sql, call_args + window_args
+    def _render(self, output):
+        output.render(self.call)
+        output.write(u' OVER ')
+        output.render(self.window)
 
 
 class ChainOperator(Expression):
     """
     Chain of similar operations (e.g. `a OP b OP c OP d ...`)
+    Nested chains of the same associative operator are flattened into a single chain
     """
 
+    __slots__ = ('op', 'expressions')
+
+    # operators that can be flattened: (a OP b) OP c == a OP b OP c
+    ASSOCIATIVE = (u'AND', u'OR', u'XOR')
+
+    # identity and absorbing values of idempotent operators
+    IDENTITY = { u'AND': True, u'OR': False }
+
     def __init__(self, expressions, op):
-        op = u' {op} '.format(op=op)
-        self.sqliter = SQLIterator(expressions, sep=op)
+        self.op = op
+        if op in self.ASSOCIATIVE:
+            self.expressions = tuple(self.flatten(expressions))
+        else:
+            self.expressions = tuple(expressions)
 
-    def _as_sql(self, connection, context):
-        sql, args = self.sqliter._as_sql(connection, context)
-        sql = u'({sql})'.format(sql=sql)
-        return sql, args
+    def flatten(self, expressions):
+        for expr in expressions:
+            if isinstance(expr, ChainOperator) and expr.op == self.op:
+                for item in expr.expressions:
+                    yield item
+            else:
+                yield expr
+
+    def normalize(self):
+        """
+        Return an equivalent chain with nested chains flattened, identity terms dropped and duplicate terms removed
+        A chain that contains its absorbing term (FALSE for AND, TRUE for OR) is replaced by that term
+        """
+        if self.op not in self.IDENTITY:
+            return ChainOperator([SQL.wrap(expr).normalize() for expr in self.expressions], self.op)
+        identity = self.IDENTITY[self.op]
+        seen = set()
+        terms = []
+        for expr in self.flatten(SQL.wrap(expr).normalize() for expr in self.expressions):
+            if isinstance(expr, Value) and expr.value is identity:
+                continue
+            if isinstance(expr, Value) and expr.value is (not identity):
+                return expr
+            key = expr.normalized_key()
+            if key is not None:
+                if key in seen:
+                    continue
+                seen.add(key)
+            terms.append(expr)
+        if not terms:
+            return Value(identity)
+        if len(terms) == 1:
+            return terms[0]
+        return ChainOperator(terms, self.op)
+
+    def _render(self, output):
+        output.write(u'(')
+        sep = u' {op} '.format(op=self.op)
+        first = True
+        for expr in self.expressions:
+            if not first:
+                output.write(sep)
+            first = False
+            output.render(SQL.wrap(expr))
+        output.write(u')')
 
 
 class BinaryOperator(Expression):
@@ -221,6 +281,8 @@ class BinaryOperator(Expression):
     Wrapper for a generic binary operator
     """
 
+    __slots__ = ('left', 'op', 'right')
+
     def __init__(self, left, op, right, invert=False):
         if invert:
             op = u'NOT ' + op
@@ -228,28 +290,21 @@ class BinaryOperator(Expression):
         self.op = op
         self.right = right
 
-    def _as_sql(self, connection, context):
-        override = connection.operator_to_sql(self.op, self.left, self.right, context=context)
-        if override and (override != NotImplemented):
+    def _render(self, output):
+        if output.override(self.op, self.left, self.right):
             # database driver overrides this operator
-            return override
-        left_sql, left_args = self.left_to_sql(connection, context)
-        right_sql, right_args = self.right_to_sql(connection, context)
-        try:
-            sql = u'({left} {op} {right})'.format(
-                left=left_sql,
-                op=self.op,
-                right=right_sql,
-            )
-        except Exception:
-            raise Exception(map(type, (left_sql, self.op, right_sql)))
-        return sql, left_args + right_args
-
-    def left_to_sql(self, connection, context):
-        return SQL.wrap(self.left)._as_sql(connection, context)
-
-    def right_to_sql(self, connection, context):
-        return SQL.wrap(self.right)._as_sql(connection, context)
+            return
+        output.write(u'(')
+        self.left_to_sql(output)
+        output.write(u' {op} '.format(op=self.op))
+        self.right_to_sql(output)
+        output.write(u')')
+
+    def left_to_sql(self, output):
+        output.render(SQL.wrap(self.left))
+
+    def right_to_sql(self, output):
+        output.render(SQL.wrap(self.right))
 
 
 class UnaryOperator(Expression):
@@ -257,21 +312,19 @@ class UnaryOperator(Expression):
     Wrapper for a generic unary operation
     """
 
+    __slots__ = ('op', 'operand')
+
     def __init__(self, op, operand):
         self.op = op
         self.operand = operand
 
-    def _as_sql(self, connection, context):
-        override = connection.operator_to_sql(self.op, self.operand, context=context)
-        if override and (override != NotImplemented):
+    def _render(self, output):
+        if output.override(self.op, self.operand):
             # database driver overrides this operator
-            return override
-        sql, args = SQL.wrap(self.operand)._as_sql(connection, context)
-        sql = u'({op} {operand})'.format(
-            op=self.op,
-            operand=sql,
-        )
-        return sql, args
+            return
+        output.write(u'({op} '.format(op=self.op))
+        output.render(SQL.wrap(self.operand))
+        output.write(u')')
 
 
 class UnaryPostfixOperator(UnaryOperator):
@@ -279,22 +332,20 @@ class UnaryPostfixOperator(UnaryOperator):
     Wrapper for a generic unary postfix operation (e.g. `a IS NULL`)
     """
 
+    __slots__ = ()
+
     def __init__(self, operand, op, invert=False):
         if invert:
             op = u'NOT ' + op
         super(UnaryPostfixOperator, self).__init__(op, operand)
 
-    def _as_sql(self, connection, context):
-        override = connection.operator_to_sql(self.op, self.operand, context=context)
-        if override and (override != NotImplemented):
+    def _render(self, output):
+        if output.override(self.op, self.operand):
             # database driver overrides this operator
-            return override
-        sql, args = SQL.wrap(self.operand)._as_sql(connection, context)
-        sql = u'({operand} {op})'.format(
-            op=self.op,
-            operand=sql,
-        )
-        return sql, args
+            return
+        output.write(u'(')
+        output.render(SQL.wrap(self.operand))
+        output.write(u' {op})'.format(op=self.op))
 
 
 class InOperator(BinaryOperator):
@@ -302,13 +353,31 @@ class InOperator(BinaryOperator):
     Wrapper for IN operator
     """
 
+    __slots__ = ()
+
     def __init__(self, left, right, invert=False):
         super(InOperator, self).__init__(left, u'IN', right, invert=invert)
 
-    def right_to_sql(self, connection, context):
-        sql, args = SQLIterator(self.right)._as_sql(connection, context)
-        sql = u'({items})'.format(items=sql)
-        return sql, args
+    def right_to_sql(self, output):
+        output.write(u'(')
+        output.render(SQLIterator(self.right))
+        output.write(u')')
+
+
+class RowValue(Expression):
+    """
+    Row value constructor (e.g. `(a, b, c)`)
+    """
+
+    __slots__ = ('exprs',)
+
+    def __init__(self, *exprs):
+        self.exprs = exprs
+
+    def _render(self, output):
+        output.write(u'(')
+        output.render(SQLIterator(self.exprs))
+        output.write(u')')
 
 
 class CASE(Expression):
@@ -316,6 +385,8 @@ class CASE(Expression):
     CASE operator
     """
 
+    __slots__ = ('cases', 'else_')
+
     def __init__(self):
         self.cases = []
         self.else_ = None
@@ -328,32 +399,26 @@ class CASE(Expression):
         self.else_ = value
         return self
 
-    def case_to_sql(self, cond, value, connection, context):
+    def case_to_sql(self, cond, value, output):
         """
         Render a single case to SQL
         """
+        output.write(u'WHEN ')
+        output.render(SQL.wrap(cond))
+        output.write(u' THEN ')
+        output.render(SQL.wrap(value))
+
+    def _render(self, output):
         assert self.cases, 'CASE operator must have at least one WHEN clause'
-        cond_sql, cond_args = SQL.wrap(cond)._as_sql(connection, context)
-        value_sql, value_args = SQL.wrap(value)._as_sql(connection, context)
-        sql = u'WHEN {condition} THEN {value}'.format(
-            condition=cond_sql,
-            value=value_sql,
-        )
-        return sql, cond_args + value_args
-
-    def _as_sql(self, connection, context):
-        cases_sql, cases_args = SQL.merge(self.case_to_sql(cond, value, connection, context) for cond, value in self.cases)
+        output.write(u'CASE')
+        for cond, value in self.cases:
+            output.write(u' ')
+            self.case_to_sql(cond, value, output)
         if self.else_ is not None:
-            else_sql, else_args = SQL.wrap(self.else_)._as_sql(connection, context)
-            else_sql = u' ELSE {value}'.format(value=else_sql)
-        else:
-            else_sql = u''
-            else_args = ()
-        sql = u'CASE {cases}{else_} END'.format(
-            cases=cases_sql,
-            else_=else_sql,
-        )
-        return sql, cases_args + else_args
+            output.write(u' ELSE ')
+            output.render(SQL.wrap(self.else_))
+        output.write(u' END')
 
 
 from .window import Window
+from .name import intern_name
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+
+"""
+Query fingerprints
+"""
+
+from __future__ import absolute_import
+from hashlib import sha1
+import re
+from .buffer import Buffer
+from .template import slot_context
+from ..dummy import dummy_connection
+
+
+# parameter placeholders of all supported paramstyles
+PLACEHOLDER = re.compile(u'%\\(p\\d+\\)s|%s|\\?|\\$\\d+|:p?\\d+')
+
+# parameter lists of IN operators
+IN_LIST = re.compile(u' IN \\(\\?(?:, \\?)+\\)')
+
+# repeated rows of parameters in a VALUES list
+VALUES_ROWS = re.compile(u'(\\((?:\\?, )*\\?\\))(?:, \\1)+')
+
+
+def normalize(sql):
+    """
+    Return rendered SQL with parameter values and `IN` list lengths removed: placeholders of any paramstyle
+    are replaced with `?`, `IN` lists of parameters with a single `?` and repeated rows of parameters
+    in `VALUES` lists with a single row
+    """
+    sql = PLACEHOLDER.sub(u'?', sql)
+    sql = IN_LIST.sub(u' IN (?)', sql)
+    return VALUES_ROWS.sub(u'\\1', sql)
+
+
+def normalized_sql(expr, connection=dummy_connection):
+    """
+    Return the normalized SQL of `expr`, see `normalize`
+    Rendered without a dialect by default, so the result does not depend on the connection
+    """
+    output = Buffer(connection, slot_context)
+    output.use_paramstyle(u'qmark')
+    output.render(expr)
+    return normalize(u''.join(output.sql))
+
+
+def fingerprint(expr, connection=dummy_connection):
+    """
+    Return a stable identifier of the shape of `expr`, equal for trees that differ only
+    in their parameter values, `IN` list lengths and numbers of `VALUES` rows
+    """
+    return sql_fingerprint(normalized_sql(expr, connection))
+
+
+def sql_fingerprint(sql):
+    """
+    Return the fingerprint of SQL already normalized with `normalize`
+    """
+    return sha1(sql.encode('utf-8')).hexdigest()[:16]
@@ -8,17 +8,48 @@ from __future__ import absolute_import
 from .base import SQL
 
 
-def NameFactory(Class, prefix=None, as_sql=None, args=None, kwargs=None):
+# shared name instances, keyed by class, name and keyword arguments
+interned = {}
+
+# names kept before the intern table is reset
+MAX_INTERNED = 10000
+
+
+def intern_name(Class, name, **kwargs):
+    """
+    Return the shared instance of an immutable name class, creating it if necessary
+    """
+    key = (Class, name) + tuple(sorted(kwargs.items()))
+    try:
+        return interned[key]
+    except KeyError:
+        if len(interned) >= MAX_INTERNED:
+            interned.clear()
+        instance = interned[key] = Class(name, **kwargs)
+        return instance
+
+
+def NameFactory(Class, prefix=None, render=None, args=None, kwargs=None, intern=False):
     """
     Factory that returns a new class that converts attribute access to Class instances
+    With `intern`, attribute access returns shared instances of Class (which must be immutable)
     """
 
     prefix = prefix or ''
     args = args or ()
     kwargs = kwargs or {}
 
-    def __getattr__(self, name):
-        return Class(prefix+name, *args, **kwargs)
+    if intern:
+        assert not args, 'Interned names cannot have positional arguments'
+        key = tuple(sorted(kwargs.items()))
+        def __getattr__(self, name):
+            try:
+                return interned[(Class, prefix+name) + key]
+            except KeyError:
+                return intern_name(Class, prefix+name, **kwargs)
+    else:
+        def __getattr__(self, name):
+            return Class(prefix+name, *args, **kwargs)
     def __setattr__(self, name, value):
         raise AttributeError('Names are not assignable')
     def __call__(self, name):
@@ -32,9 +63,9 @@ def NameFactory(Class, prefix=None, as_sql=None, args=None, kwargs=None):
         __call__=__call__,
     )
 
-    if as_sql:
+    if render:
         # create factory that renders as SQL
-        attrs['_as_sql'] = as_sql
+        attrs['_render'] = render
         bases = (SQL,)
 
     return type(name, bases, attrs)()
@@ -44,7 +75,7 @@ from .expression import Variable, Identifier
 from .table import Table, Wildcard
 
 # prepare importable shorthand names for the various name factories
-T = TableFactory = NameFactory(Table)
-ONLY = NameFactory(Table, kwargs={ 'ONLY': True })
+T = TableFactory = NameFactory(Table, intern=True)
+ONLY = NameFactory(Table, kwargs={ 'ONLY': True }, intern=True)
 V = VariableFactory = NameFactory(Variable)
-C = F = IdentifierFactory = NameFactory(Identifier, as_sql=lambda self, connection, context: Wildcard()._as_sql(connection, context))
+C = F = IdentifierFactory = NameFactory(Identifier, render=lambda self, output: output.render(Wildcard()), intern=True)
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+"""
+Per-node render profiling
+"""
+
+from __future__ import absolute_import
+from .buffer import Buffer
+from ..instrument import clock
+
+
+class RenderProfile(object):
+    """
+    Render time and parameter counts per node class and per path of node classes from the root,
+    accumulated over any number of renders
+    Node times are self times, excluding the time spent rendering child nodes; `collapsed()` returns
+    the paths in the collapsed stack format read by flame graph tools
+    """
+
+    def __init__(self):
+        # path of node class names -> [self time, parameters]
+        self.stacks = {}
+        # node class name -> [nodes rendered, self time, parameters]
+        self.classes = {}
+
+    def render(self, expr, connection, context=None):
+        """
+        Render `expr` like `expr._as_sql(connection, context)`, recording its profile
+        """
+        output = ProfileBuffer(connection, {} if context is None else context)
+        output.render(expr)
+        for names, elapsed, params in output.records:
+            self.record(names, elapsed, params)
+        return output.result()
+
+    def record(self, names, elapsed, params):
+        path = u';'.join(names)
+        stack = self.stacks.get(path)
+        if stack is None:
+            stack = self.stacks[path] = [0.0, 0]
+        stack[0] += elapsed
+        stack[1] += params
+        node = self.classes.get(names[-1])
+        if node is None:
+            node = self.classes[names[-1]] = [0, 0.0, 0]
+        node[0] += 1
+        node[1] += elapsed
+        node[2] += params
+
+    def collapsed(self, params=False):
+        """
+        Return the collapsed stack lines, weighted by self time in microseconds or by the number of parameters
+        """
+        lines = []
+        for path, (elapsed, count) in sorted(self.stacks.items()):
+            weight = count if params else int(round(elapsed * 1e6))
+            if weight:
+                lines.append(u'{path} {weight}'.format(path=path, weight=weight))
+        return lines
+
+    def write(self, path, params=False):
+        """
+        Write the collapsed stacks to a file, see `collapsed`
+        """
+        with open(path, 'w') as f:
+            for line in self.collapsed(params):
+                f.write(line + u'\n')
+
+    def top(self, count=10):
+        """
+        Return `name, nodes, self time, parameters` of the `count` node classes with the highest self time
+        """
+        rows = [(name,) + tuple(node) for name, node in self.classes.items()]
+        return sorted(rows, key=lambda row: row[2], reverse=True)[:count]
+
+
+class ProfileBuffer(Buffer):
+    """
+    Output buffer that times the rendering of every node
+    Each frame is `[name, started, child time, parameters]`; the measurements are kept in `records`
+    until rendering is complete, as a render restarted from the explicit stack discards them
+    """
+
+    __slots__ = ('frames', 'records')
+
+    def __init__(self, connection, context):
+        super(ProfileBuffer, self).__init__(connection, context)
+        self.frames = []
+        self.records = []
+
+    def render(self, expr):
+        if self.recursive:
+            self.render_node(expr)
+        else:
+            super(ProfileBuffer, self).render(expr)
+
+    def render_node(self, expr):
+        if type(expr) is Resume:
+            # subtree queued by an iterative render, profile it under the path it was queued from
+            frames = self.frames
+            self.frames = [[name, None, 0.0, 0] for name in expr.names]
+            try:
+                self.render_node(expr.expr)
+            finally:
+                self.frames = frames
+            return
+        frame = [type(expr).__name__, clock(), 0.0, 0]
+        self.frames.append(frame)
+        try:
+            expr._render(self)
+        finally:
+            self.frames.pop()
+            elapsed = clock() - frame[1]
+            if self.frames:
+                self.frames[-1][2] += elapsed
+            self.records.append(([item[0] for item in self.frames] + [frame[0]], elapsed - frame[2], frame[3]))
+
+    def defer(self, expr):
+        super(ProfileBuffer, self).defer(Resume(expr, [frame[0] for frame in self.frames]))
+
+    def mark(self):
+        return super(ProfileBuffer, self).mark(), len(self.frames), len(self.records)
+
+    def rewind(self, mark):
+        mark, frames, records = mark
+        super(ProfileBuffer, self).rewind(mark)
+        del self.frames[frames:]
+        del self.records[records:]
+
+    def param(self, value):
+        if self.frames:
+            self.frames[-1][3] += 1
+        super(ProfileBuffer, self).param(value)
+
+    def extend(self, sql, args):
+        if self.frames and self.paramstyle == u'format':
+            self.frames[-1][3] += len(args)
+        super(ProfileBuffer, self).extend(sql, args)
+
+
+class Resume(object):
+    """
+    Subtree queued by an iterative render, with the path of node classes it was queued from
+    """
+
+    __slots__ = ('expr', 'names')
+
+    def __init__(self, expr, names):
+        self.expr = expr
+        self.names = names
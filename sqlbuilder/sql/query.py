@@ -6,6 +6,8 @@ SQL query base classes
 
 from __future__ import absolute_import
 from ..sql.base import SQL
+from ..sql.template import Template
+from ..instrument import instrumentation
 
 
 class Query(SQL):
@@ -13,23 +15,104 @@ class Query(SQL):
     Abstract base class for queries
     """
 
-    def execute(self, connection, *args, **context):
+    __slots__ = ()
+
+    # trees with more nodes than this are rendered in a worker thread by `execute_async`, None to never do so
+    ASYNC_RENDER_NODES = 2000
+
+    # executor for rendering in a worker thread, None for the default executor of the event loop
+    ASYNC_RENDER_EXECUTOR = None
+
+    def execute(self, connection, **context):
         """
         Allocate a cursor from the connection and execute the query
+        `connection` can also be a `ConnectionPool`, the cursor then holds a pooled connection until it is closed
+        """
+        return self._execute(connection, context)[0]
+
+    def _execute(self, connection, context):
         """
-        sql, args = self._as_sql(connection, context)
-        cursor = connection.cursor()
-        cursor.execute(sql, *args)
+        Execute the query, returning the cursor and the instrumentation trace of the execution
+        """
+        trace = instrumentation.trace(self)
+        try:
+            cursor = connection.cursor()
+        except Exception as error:
+            trace.failed(error)
+            raise
+        try:
+            # statements are executed as they are rendered, so batches are not held in memory all at once
+            trace.before_render()
+            for sql, args in self.statements(connection, context):
+                trace.after_render(sql, len(args))
+                trace.before_execute()
+                cursor.execute(sql, args)
+                trace.after_statement()
+        except Exception as error:
+            cursor.close()
+            trace.failed(error)
+            raise
+        trace.after_execute(cursor)
+        return cursor, trace
+
+    def execute_many(self, connection, contexts):
+        """
+        Render the query once and execute it for every context in `contexts` with a single `executemany` call
+        Only variables may differ between the contexts
+        """
+        trace = instrumentation.trace(self)
+        try:
+            trace.before_render()
+            template = self.compile(connection)
+            args = [template.bind(**context)[1] for context in contexts]
+            trace.after_render(template.sql, len(args) * len(template.args), len(args))
+            cursor = connection.cursor()
+        except Exception as error:
+            trace.failed(error)
+            raise
+        try:
+            trace.before_execute()
+            cursor.executemany(template.sql, args)
+            trace.after_statement()
+        except Exception as error:
+            cursor.close()
+            trace.failed(error)
+            raise
+        trace.after_execute(cursor)
         return cursor
 
+    def statements(self, connection, context):
+        """
+        Render the `sql, args` tuples of the statements that execute the query
+        """
+        yield self._as_sql(connection, context)
+
+    def execute_async(self, connection, **context):
+        """
+        Coroutine that allocates a cursor from an asyncio connection and executes the query
+        Large queries are rendered off the event loop, see `ASYNC_RENDER_NODES`
+        """
+        from .aio import execute_async
+        return execute_async(self, connection, context)
+
+    def compile(self, connection):
+        """
+        Render the query once into a `Template` whose variables are bound later
+        """
+        return Template.compile(self, connection)
+
 
 class DataManipulationQuery(Query):
     """
     Abstract base class for data manipulation queries
     """
 
+    __slots__ = ()
+
 
 class DataDefinitionQuery(Query):
     """
     Abstract base class for data definition queries
     """
+
+    __slots__ = ()
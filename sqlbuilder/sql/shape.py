@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+"""
+Structural query shapes
+"""
+
+from __future__ import absolute_import
+from .buffer import Buffer
+
+
+class Marker(object):
+    """
+    Named marker for non-literal pieces of a shape
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return '<{name}>'.format(name=self.name)
+
+PARAM = Marker('PARAM')
+IDENTIFIER = Marker('IDENTIFIER')
+FUNCTION_NAME = Marker('FUNCTION_NAME')
+
+
+class ShapeBuffer(Buffer):
+    """
+    Output buffer that records the structure of an expression tree instead of its SQL
+    Parameter values are collected separately and replaced by slots in the shape,
+    and identifiers are recorded unquoted; slots of numbered paramstyles record the parameter number,
+    so trees only share a shape if their repeated parameters are repeated alike
+    """
+
+    __slots__ = ()
+
+    def param(self, value):
+        self.sql.append(PARAM)
+        if self.placeholder is not None:
+            self.args.append(value)
+        else:
+            self.sql.append(self.number(value))
+
+    def identifier(self, name):
+        self.sql.append(IDENTIFIER)
+        self.sql.append(name)
+
+    def function_name(self, name):
+        self.sql.append(FUNCTION_NAME)
+        self.sql.append(name)
+
+    def result(self):
+        """
+        Return the `shape, args` tuple, args are the parameter values in binding order
+        """
+        return tuple(self.sql), tuple(self.parameters())
+
+
+def shape(expr, connection, context):
+    """
+    Return the `shape, args` tuple for `expr`
+    Trees that differ only in their parameter values have equal shapes
+    """
+    output = ShapeBuffer(connection, context)
+    output.render(expr)
+    return output.result()
@@ -15,6 +15,8 @@ class Sorting(SQL):
     Sorting orders are no longer expressions, as they are not allowed in operations, only in ORDER BY clauses
     """
 
+    __slots__ = ('expr', 'direction', 'nulls')
+
     DIR = Const('DIR', """Sort direction""",
         ASC=u' ASC',
         DESC=u' DESC',
@@ -32,14 +34,12 @@ class Sorting(SQL):
         assert self.direction is None or self.direction in self.DIR, 'Invalid sorting direction: {dir}'.format(dir=self.direction)
         assert self.nulls is None or self.nulls in self.NULLS, 'Invalid sorting of nulls: {nulls}'.format(nulls=self.nulls)
 
-    def _as_sql(self, connection, context):
-        sql, args = SQL.wrap(self.expr)._as_sql(connection, context)
-        sql = u'{expr}{dir}{nulls}'.format(
-            expr=sql,
-            dir='' if self.direction is None else self.direction,
-            nulls='' if self.nulls is None else self.nulls,
-        )
-        return sql, args
+    def _render(self, output):
+        output.render(SQL.wrap(self.expr))
+        if self.direction is not None:
+            output.write(self.direction)
+        if self.nulls is not None:
+            output.write(self.nulls)
 
     @property
     def NULLS_FIRST(self):
@@ -53,3 +53,52 @@ class Sorting(SQL):
 
 def ASC(expr): return Sorting(expr, direction=Sorting.DIR.ASC)
 def DESC(expr): return Sorting(expr, direction=Sorting.DIR.DESC)
+
+
+def seek_condition(order, values):
+    """
+    Condition that matches the rows sorted after `values` by the `order` sort keys
+    Uses a row value comparison when all keys sort the same way, and an expanded
+    OR-of-ANDs condition otherwise; keys with no explicit NULLS placement must not be NULL
+    """
+    keys = [item if isinstance(item, Sorting) else Sorting(item) for item in order]
+    values = tuple(values)
+    assert keys, 'Cannot seek without sort keys'
+    assert len(keys) == len(values), 'Expected {count} sort key values, got {values}'.format(count=len(keys), values=len(values))
+    for key, value in zip(keys, values):
+        if value is None and key.nulls is None:
+            raise ValueError('Sort key {key!r} has a NULL value but no NULLS_FIRST or NULLS_LAST placement'.format(key=key))
+    directions = set(key.direction or Sorting.DIR.ASC for key in keys)
+    if len(directions) == 1 and all(key.nulls is None for key in keys):
+        # uniform sort order over non-NULL keys
+        op = u'<' if directions.pop() == Sorting.DIR.DESC else u'>'
+        if len(keys) == 1:
+            return BinaryOperator(keys[0].expr, op, values[0])
+        return BinaryOperator(RowValue(*[key.expr for key in keys]), op, RowValue(*values))
+    terms = []
+    equal = []
+    for key, value in zip(keys, values):
+        after = key_after(key, value)
+        if after is not None:
+            terms.append(AND(*(equal + [after])) if equal else after)
+        equal.append(IS_NULL(key.expr) if value is None else BinaryOperator(key.expr, u'=', value))
+    if not terms:
+        return Value(False)
+    return OR(*terms) if len(terms) > 1 else terms[0]
+
+
+def key_after(key, value):
+    """
+    Condition that matches the rows sorted strictly after `value` by a single sort key,
+    or None if no rows can sort after it
+    """
+    if value is None:
+        return IS_NOT_NULL(key.expr) if key.nulls == Sorting.NULLS.FIRST else None
+    op = u'<' if key.direction == Sorting.DIR.DESC else u'>'
+    after = BinaryOperator(key.expr, op, value)
+    if key.nulls == Sorting.NULLS.LAST:
+        return OR(after, IS_NULL(key.expr))
+    return after
+
+
+from .expression import AND, OR, IS_NULL, IS_NOT_NULL, BinaryOperator, RowValue, Value
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+"""
+Operator rendering strategies for connections
+"""
+
+from __future__ import absolute_import
+from .base import SQL
+from ..utils import Const
+
+
+class InStrategy(object):
+    """
+    Rewrites large `IN` lists, for use from a connection's `operator_to_sql` hook
+    Lists longer than `threshold` are rendered as a single array parameter (`= ANY(%s)`, for drivers that adapt lists to arrays),
+    a VALUES list, or several `IN` lists of at most `chunk_size` items
+    The strategy is chosen per expression: lists that cannot be bound as one array, because they hold
+    expressions or rows, are chunked instead
+    """
+
+    STRATEGY = Const('STRATEGY', """IN list strategies""",
+        ARRAY=u'array',
+        VALUES=u'values',
+        CHUNKS=u'chunks',
+    )
+
+    OPS = (u'IN', u'NOT IN')
+
+    def __init__(self, strategy, threshold=1000, chunk_size=None):
+        self.strategy = strategy
+        self.threshold = threshold
+        self.chunk_size = chunk_size or threshold
+        assert self.strategy in self.STRATEGY, 'Invalid IN list strategy: {strategy}'.format(strategy=self.strategy)
+        assert self.chunk_size <= self.threshold, 'IN list chunks cannot be larger than the threshold'
+
+    def operator_to_sql(self, op, left, right=None, context=None):
+        """
+        Return an expression to render in place of a large `IN` list, or NotImplemented
+        """
+        if op not in self.OPS or isinstance(right, SQL) or not hasattr(right, '__len__'):
+            return NotImplemented
+        if len(right) <= self.threshold:
+            return NotImplemented
+        invert = op != u'IN'
+        strategy = self.choose(right)
+        if strategy == self.STRATEGY.ARRAY:
+            return BinaryOperator(left, u'<>' if invert else u'=', ArrayComparison(u'ALL' if invert else u'ANY', list(right)))
+        if strategy == self.STRATEGY.VALUES:
+            values = VALUES()
+            values.rows = [(value,) for value in right]
+            return InOperator(left, values, invert=invert)
+        right = list(right)
+        chunks = [
+            InOperator(left, right[start:start + self.chunk_size], invert=invert)
+            for start in range(0, len(right), self.chunk_size)
+        ]
+        return AND(*chunks) if invert else OR(*chunks)
+
+    def choose(self, values):
+        """
+        Return the strategy for an `IN` list of `values`
+        """
+        if self.strategy == self.STRATEGY.ARRAY and any(isinstance(value, (SQL, tuple, list)) for value in values):
+            return self.STRATEGY.CHUNKS
+        return self.strategy
+
+
+class ArrayComparison(SQL):
+    """
+    Right operand of an array comparison, e.g. `ANY(%s)`, with the array bound as a single parameter
+    Dialects declare whether they support array parameters with `ARRAYS`
+    """
+
+    __slots__ = ('quantifier', 'values')
+
+    def __init__(self, quantifier, values):
+        self.quantifier = quantifier
+        self.values = values
+
+    def _render(self, output):
+        if getattr(output.dialect, 'ARRAYS', None) is False:
+            raise TypeError('{dialect} does not support array parameters'.format(dialect=type(output.dialect).__name__))
+        output.write(self.quantifier)
+        output.write(u'(')
+        output.param(self.values)
+        output.write(u')')
+
+
+from .expression import AND, OR, BinaryOperator, InOperator
+from .table import VALUES
@@ -15,6 +15,8 @@ class Joinable(SQL):
     Base class for joinable classes (tables, subquery aliases)
     """
 
+    __slots__ = ()
+
     def CROSS_JOIN(self, other, *args, **kwargs):
         return CrossJoin(self, other, *args, **kwargs)
 
@@ -40,18 +42,20 @@ class Table(Joinable):
     Table reference
     """
 
+    __slots__ = ('_name', '_only', '_column_factory')
+
     def __init__(self, name, ONLY=None):
         object.__setattr__(self, '_name', name)
         object.__setattr__(self, '_only', False if ONLY is None else ONLY)
+        object.__setattr__(self, '_column_factory', None)
 
-    def _as_sql(self, connection, context):
-        sql, args = SQL.wrap(self._name, id=True)._as_sql(connection, context)
+    def _render(self, output):
         if self._only:
-            sql = u'ONLY ' + sql
-        return sql, args
+            output.write(u'ONLY ')
+        output.identifier(self._name)
 
     def __getattr__(self, name):
-        return Table(u'{name}.{subname}'.format(
+        return intern_name(Table, u'{name}.{subname}'.format(
             name=self._name,
             subname=name,
         ), ONLY=self._only)
@@ -63,7 +67,9 @@ class Table(Joinable):
         """
         Column identifier factory
         """
-        return NameFactory(Identifier, prefix=self._name + u'.', as_sql=lambda _, connection, context: Wildcard(self)._as_sql(connection, context))
+        if self._column_factory is None:
+            object.__setattr__(self, '_column_factory', NameFactory(Identifier, prefix=self._name + u'.', render=lambda _, output: output.render(Wildcard(self)), intern=True))
+        return self._column_factory
 
 
 class VALUES(Joinable, Query):
@@ -71,6 +77,8 @@ class VALUES(Joinable, Query):
     VALUES expression
     """
 
+    __slots__ = ('rows',)
+
     def __init__(self, *values):
         self.rows = [ values ]
 
@@ -81,18 +89,14 @@ class VALUES(Joinable, Query):
         self.rows.append(values)
         return self
 
-    def _as_sql(self, connection, context):
+    def _render(self, output):
         assert len(self.rows), 'No rows in VALUE expression'
-        rows = []
-        args = ()
+        sep = u'VALUES ('
         for row in self.rows:
-            row_sql, row_args = SQLIterator(row)._as_sql(connection, context)
-            rows.append(u'({row})'.format(row=row_sql))
-            args += row_args
-        sql = u'VALUES {rows}'.format(
-            rows=u', '.join(rows),
-        )
-        return sql, args
+            output.write(sep)
+            output.render(SQLIterator(row))
+            sep = u'), ('
+        output.write(u')')
 
 
 class Wildcard(SQL):
@@ -100,15 +104,17 @@ class Wildcard(SQL):
     `table.*` wildcard
     """
 
+    __slots__ = ('table',)
+
     def __init__(self, table=None):
         self.table = table
 
-    def _as_sql(self, connection, context):
+    def _render(self, output):
         if not self.table:
-            return u'*', ()
-        sql, args = self.table._as_sql(connection, context)
-        sql += u'.*'
-        return sql, args
+            output.write(u'*')
+            return
+        output.render(self.table)
+        output.write(u'.*')
 
 
 class Join(Joinable):
@@ -116,6 +122,8 @@ class Join(Joinable):
     Abstract base class for joins
     """
 
+    __slots__ = ('left', 'right', 'parens')
+
     TYPE = Const('TYPE', """Join types""",
         INNER=u'INNER',
         LEFT=u'LEFT OUTER',
@@ -135,6 +143,8 @@ class QualifiedJoin(Join):
     Abstract base class for qualified joins
     """
 
+    __slots__ = ('type',)
+
     def __init__(self, left, right, parens=None, type=None):
         super(QualifiedJoin, self).__init__(left, right, parens=parens)
         self.type = type
@@ -143,35 +153,36 @@ class QualifiedJoin(Join):
 
 class CrossJoin(Join):
 
-    def _as_sql(self, connection, context):
-        left_sql, left_args = self.left._as_sql(connection, context)
-        right_sql, right_args = self.right._as_sql(connection, context)
-        sql = u'{left} CROSS JOIN {right}'.format(
-            left=left_sql,
-            right=right_sql,
-        )
+    __slots__ = ()
+
+    def _render(self, output):
+        if self.parens:
+            output.write(u'(')
+        output.render(self.left)
+        output.write(u' CROSS JOIN ')
+        output.render(self.right)
         if self.parens:
-            sql = u'({sql})'.format(sql=sql)
-        return sql, left_args + right_args
+            output.write(u')')
 
 
 class NaturalJoin(QualifiedJoin):
 
-    def _as_sql(self, connection, context):
-        left_sql, left_args = self.left._as_sql(connection, context)
-        right_sql, right_args = self.right._as_sql(connection, context)
-        sql = u'{left} NATURAL {type} JOIN {right}'.format(
-            left=left_sql,
-            right=right_sql,
-            type=self.type,
-        )
+    __slots__ = ()
+
+    def _render(self, output):
         if self.parens:
-            sql = u'({sql})'.format(sql=sql)
-        return sql, left_args + right_args
+            output.write(u'(')
+        output.render(self.left)
+        output.write(u' NATURAL {type} JOIN '.format(type=self.type))
+        output.render(self.right)
+        if self.parens:
+            output.write(u')')
 
 
 class ConditionalJoin(QualifiedJoin):
 
+    __slots__ = ('on', 'using')
+
     def __init__(self, left, right, parens=None, type=None, ON=None, USING=None):
         super(ConditionalJoin, self).__init__(left, right, parens=parens, type=type)
         self.on = ON
@@ -181,25 +192,22 @@ class ConditionalJoin(QualifiedJoin):
         assert (self.on is None or self.using is None), 'Cannot have both ON and USING clauses on a join'
         assert not (self.on is None and self.using is None), 'Either ON or USING clause is required for conditional join'
 
-    def _as_sql(self, connection, context):
+    def _render(self, output):
+        if self.parens:
+            output.write(u'(')
+        output.render(self.left)
+        output.write(u' {type} JOIN '.format(type=self.type))
+        output.render(self.right)
         if self.on:
-            expr_sql, condition_args = SQL.wrap(self.on)._as_sql(connection, context)
-            condition_sql = u'ON {expression}'.format(expression=expr_sql)
+            output.write(u' ON ')
+            output.render(SQL.wrap(self.on))
         else:
-            columns_sql, condition_args = SQLIterator(self.using)._as_sql(connection, context)
-            condition_sql = u'USING ({columns})'.format(columns=columns_sql)
-        left_sql, left_args = self.left._as_sql(connection, context)
-        right_sql, right_args = self.right._as_sql(connection, context)
-        sql = u'{left} {type} JOIN {right} {condition}'.format(
-            left=left_sql,
-            right=right_sql,
-            type=self.type,
-            condition=condition_sql,
-        )
+            output.write(u' USING (')
+            output.render(SQLIterator(self.using))
+            output.write(u')')
         if self.parens:
-            sql = u'({sql})'.format(sql=sql)
-        return sql, left_args + right_args + condition_args
+            output.write(u')')
 
 
-from .name import NameFactory
+from .name import NameFactory, intern_name
 from .expression import Identifier
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compiled query templates
+"""
+
+from __future__ import absolute_import
+from .buffer import Buffer, pack_args
+
+
+class Template(object):
+    """
+    Frozen rendering of a query: SQL string plus an ordered list of parameter slots
+    Each slot is either a constant value or the name of a variable that is bound at execution time
+    """
+
+    __slots__ = ('sql', 'args', 'variables', 'paramstyle')
+
+    def __init__(self, sql, args, paramstyle=u'format'):
+        object.__setattr__(self, 'sql', sql)
+        object.__setattr__(self, 'args', tuple(args))
+        object.__setattr__(self, 'paramstyle', paramstyle)
+        object.__setattr__(self, 'variables', tuple(
+            (index, arg.name)
+            for index, arg in enumerate(self.args)
+            if isinstance(arg, Slot)
+        ))
+
+    @classmethod
+    def compile(cls, expr, connection):
+        """
+        Render `expr` once, leaving its variables as unbound slots
+        """
+        output = Buffer(connection, slot_context)
+        output.render(expr)
+        return cls(u''.join(output.sql), output.parameters(), output.paramstyle)
+
+    def bind(self, **context):
+        """
+        Return a `sql, args` tuple with variable slots bound to values from `context`
+        """
+        if not self.variables:
+            return self.sql, pack_args(self.paramstyle, self.args)
+        args = list(self.args)
+        for index, name in self.variables:
+            args[index] = context[name]
+        return self.sql, pack_args(self.paramstyle, args)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Templates are not assignable')
+
+    def __repr__(self):
+        return u'<{name} {sql!r}, {args!r}>'.format(
+            name=self.__class__.__name__,
+            sql=self.sql,
+            args=self.args,
+        )
+
+
+class SlotContext(object):
+    """
+    Context that resolves every variable to an unbound slot
+    """
+
+    def __getitem__(self, name):
+        return Slot(name)
+
+slot_context = SlotContext()
+
+
+class Slot(object):
+    """
+    Unbound variable slot, renders its representation as '$name'
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __eq__(self, other):
+        return isinstance(other, Slot) and other.name == self.name
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.name)
+
+    def __repr__(self):
+        return '${name}'.format(name=self.name)
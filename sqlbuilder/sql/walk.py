@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+"""
+Expression tree traversal
+"""
+
+from __future__ import absolute_import
+from .base import SQL
+
+
+def attribute(node, name):
+    """
+    Return an attribute without triggering the attribute proxies of names and aliases
+    """
+    try:
+        return object.__getattribute__(node, name)
+    except AttributeError:
+        return None
+
+
+def slot_names(cls):
+    """
+    Return the names of the slots of a class and its bases
+    """
+    try:
+        return class_slots[cls]
+    except KeyError:
+        names = class_slots[cls] = tuple(
+            name
+            for base in cls.__mro__
+            for name in base.__dict__.get('__slots__', ())
+            if name != '__weakref__'
+        )
+        return names
+
+class_slots = {}
+
+
+def children(node):
+    """
+    Return the values held by a node: the contents of its slots and its attribute dict
+    """
+    values = [attribute(node, name) for name in slot_names(type(node))]
+    attrs = attribute(node, '__dict__')
+    if attrs:
+        values.extend(attrs.values())
+    return values
+
+
+def walk(expr, values=False):
+    """
+    Yield every SQL node of an expression tree, parents before their children
+    Nodes are found in node attributes and in lists, tuples and dicts held by them;
+    other iterables are not consumed. With `values`, plain values held in lists and tuples
+    (which are usually rendered as parameters) are yielded as well
+    """
+    seen = set()
+    pending = [expr]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, (list, tuple)):
+            if values:
+                for item in value:
+                    if not isinstance(item, (SQL, list, tuple, dict)):
+                        yield item
+            pending.extend(reversed(value))
+            continue
+        if isinstance(value, dict):
+            pending.extend(value.values())
+            continue
+        if not isinstance(value, SQL) or id(value) in seen:
+            continue
+        seen.add(id(value))
+        yield value
+        pending.extend(reversed(children(value)))
+
+
+def count_nodes(expr, limit=None):
+    """
+    Return the number of nodes and plain values in an expression tree, counting no further than `limit`
+    """
+    count = 0
+    for node in walk(expr, values=True):
+        count += 1
+        if limit is not None and count >= limit:
+            break
+    return count
@@ -14,6 +14,8 @@ class Window(SQL):
     Window definition
     """
 
+    __slots__ = ('window', 'partition', 'order', 'range', 'rows')
+
     FRAME = Const('FRAME', """Frame types""",
         RANGE=u'RANGE',
         ROWS=u'ROWS',
@@ -32,34 +34,32 @@ class Window(SQL):
         self.rows = ROWS
         assert (self.range is None) or (self.rows is None), 'Cannot specify both RANGE and ROWS frames'
 
-    def reference(self, offset, endpoint=None):
+    def reference(self, offset, endpoint, output):
         if offset is None:
-            return endpoint, ()
-        if offset < 0:
-            return u'%s PRECEDING', (abs(offset),)
-        if offset > 0:
-            return u'%s FOLLOWING', (offset,)
-        return u'CURRENT ROW', ()
+            output.write(endpoint)
+        elif offset < 0:
+            output.param(abs(offset))
+            output.write(u' PRECEDING')
+        elif offset > 0:
+            output.param(offset)
+            output.write(u' FOLLOWING')
+        else:
+            output.write(u'CURRENT ROW')
 
-    def _as_sql(self, connection, context):
-        clauses = []
-        args = ()
+    def _render(self, output):
+        output.write(u'(')
+        sep = u''
         if self.window:
-            window_sql, window_args = SQL.wrap(self.window, id=True)._as_sql(connection, context)
-            clauses.append(window_sql)
-            args += args
+            output.render(SQL.wrap(self.window, id=True))
+            sep = u' '
         if self.partition:
-            partition_sql, partition_args = SQLIterator(self.partition)._as_sql(connection, context)
-            clauses.append(u'PARTITION BY {expr}'.format(
-                expr=partition_sql,
-            ))
-            args += partition_args
+            output.write(sep + u'PARTITION BY ')
+            output.render(SQLIterator(self.partition))
+            sep = u' '
         if self.order:
-            order_sql, order_args = SQLIterator(self.order)._as_sql(connection, context)
-            clauses.append(u'ORDER BY {expr}'.format(
-                expr=order_sql,
-            ))
-            args += order_args
+            output.write(sep + u'ORDER BY ')
+            output.render(SQLIterator(self.order))
+            sep = u' '
         if (self.range is not None) or (self.rows is not None):
             if self.range is not None:
                 frame_type = self.FRAME.RANGE
@@ -71,23 +71,12 @@ class Window(SQL):
                 start, end = frame
             except TypeError:
                 # single value
-                start_sql, start_args = self.reference(frame, self.ENDPOINT.START)
-                clauses.append(u'{type} {start}'.format(
-                    type=frame_type,
-                    start=start_sql,
-                ))
-                args += start_args
+                output.write(u'{sep}{type} '.format(sep=sep, type=frame_type))
+                self.reference(frame, self.ENDPOINT.START, output)
             else:
                 # range
-                start_sql, start_args = self.reference(start, self.ENDPOINT.START)
-                end_sql, end_args = self.reference(end, self.ENDPOINT.END)
-                clauses.append(u'{type} BETWEEN {start} AND {end}'.format(
-                    type=frame_type,
-                    start=start_sql,
-                    end=end_sql,
-                ))
-                args += start_args + end_args
-        sql = u'({clauses})'.format(
-            clauses=' '.join(clauses),
-        )
-        return sql, args
+                output.write(u'{sep}{type} BETWEEN '.format(sep=sep, type=frame_type))
+                self.reference(start, self.ENDPOINT.START, output)
+                output.write(u' AND ')
+                self.reference(end, self.ENDPOINT.END, output)
+        output.write(u')')
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+"""
+Query statistics per fingerprint
+"""
+
+from __future__ import absolute_import
+import json
+from threading import Lock
+from .instrument import EVENT, QueryStats, HistogramCollector, instrumentation
+from .sql.fingerprint import normalize, sql_fingerprint
+
+
+class FingerprintStats(object):
+    """
+    Instrumentation listener that aggregates executions per query fingerprint
+    Queries that differ only in their parameter values, `IN` list lengths and numbers of `VALUES` rows share
+    a fingerprint, see `sqlbuilder.sql.fingerprint`; fingerprints are computed from the SQL rendered for
+    the connection, equal to `fingerprint(query, connection)`; at most `maxsize` fingerprints are tracked
+    """
+
+    # number of rendered statements whose fingerprint is memoized before the memo is reset
+    MAX_MEMO = 10000
+
+    # percentiles included in the exported statistics
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, maxsize=10000, bounds=None):
+        self.maxsize = maxsize
+        self.bounds = tuple(bounds or HistogramCollector.BOUNDS)
+        self.stats = {}
+        self.dropped = 0
+        self.memo = {}
+        self.lock = Lock()
+
+    def enable(self):
+        """
+        Start collecting statistics of executed queries
+        """
+        self.disable()
+        instrumentation.add(self)
+
+    def disable(self):
+        instrumentation.remove(self)
+
+    def __call__(self, event, trace):
+        if event not in (EVENT.AFTER_EXECUTE, EVENT.AFTER_FETCH, EVENT.ERROR):
+            return
+        stats = self.get(trace)
+        if stats is None:
+            return
+        with self.lock:
+            if event == EVENT.AFTER_EXECUTE:
+                stats.render.add(trace.render_time)
+                stats.execute.add(trace.execute_time)
+                if trace.rowcount is not None and trace.rowcount >= 0:
+                    stats.rowcount += trace.rowcount
+            elif event == EVENT.AFTER_FETCH:
+                stats.rows += trace.rows
+            else:
+                stats.errors += 1
+
+    def get(self, trace):
+        """
+        Return the statistics of the fingerprint of a traced query, or None if it cannot be tracked
+        The fingerprint is taken from the SQL rendered for the execution, as the query itself may not render again
+        (e.g. an INSERT of rows from an iterator); queries that failed before rendering are not tracked
+        """
+        if trace.sql is None:
+            return None
+        key = trace.query_class, trace.sql
+        memo = self.memo.get(key)
+        if memo is None:
+            sql = normalize(trace.sql)
+            memo = sql_fingerprint(sql), sql
+            with self.lock:
+                if len(self.memo) >= self.MAX_MEMO:
+                    self.memo.clear()
+                self.memo[key] = memo
+        query_fingerprint, sql = memo
+        with self.lock:
+            stats = self.stats.get(query_fingerprint)
+            if stats is None:
+                if len(self.stats) >= self.maxsize:
+                    self.dropped += 1
+                    return None
+                stats = self.stats[query_fingerprint] = QueryStats(trace.query_class, sql, self.bounds)
+            return stats
+
+    def as_dict(self):
+        """
+        Return the statistics as a JSON-serializable dict keyed by fingerprint
+        """
+        with self.lock:
+            return dict(
+                (query_fingerprint, {
+                    'query_class': stats.query_class.__name__,
+                    'sql': stats.sql,
+                    'count': stats.execute.count,
+                    'errors': stats.errors,
+                    'rows': stats.rows,
+                    'rowcount': stats.rowcount,
+                    'render': self.histogram_dict(stats.render),
+                    'execute': self.histogram_dict(stats.execute),
+                })
+                for query_fingerprint, stats in self.stats.items()
+            )
+
+    def histogram_dict(self, histogram):
+        result = {
+            'total': histogram.total,
+            'mean': histogram.mean,
+            'max': histogram.max,
+        }
+        for percent in self.PERCENTILES:
+            result['p{percent}'.format(percent=percent)] = histogram.percentile(percent)
+        return result
+
+    def to_json(self, **kwargs):
+        """
+        Return the statistics as a JSON document, keyword arguments are passed to `json.dumps`
+        """
+        return json.dumps(self.as_dict(), **kwargs)
+
+    def clear(self):
+        with self.lock:
+            self.stats.clear()
+            self.memo.clear()
+            self.dropped = 0
+
+registry = FingerprintStats()
@@ -5,6 +5,13 @@ from __future__ import absolute_import
 Various utilities
 """
 
+try:
+    string_types = basestring
+except NameError:
+    # Python 3
+    string_types = str
+
+
 class Const(object):
     """
     Wrapper for a set of constants
@@ -15,7 +22,7 @@ class Const(object):
         if docstring:
             attr['__doc__'] = docstring
         Class = type(name or cls.__name__, (cls,), attr)
-        return object.__new__(Class, name=name, docstring=docstring, **const)
+        return object.__new__(Class)
 
     def __init__(self, name=None, docstring=None, **const):
         self.__dict__.update(const)
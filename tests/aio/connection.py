@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+asyncio wrapper over sqlite3 for testing (Python 3.6+)
+"""
+
+import asyncio
+from ..base import SQLiteConnection
+
+
+class AsyncSQLiteConnection(SQLiteConnection):
+    """
+    sqlite3 connection with coroutine cursor methods, keeps track of allocated cursors
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(AsyncSQLiteConnection, self).__init__(*args, **kwargs)
+        self.cursors = []
+
+    async def cursor(self):
+        cursor = AsyncSQLiteCursor(super(AsyncSQLiteConnection, self).cursor())
+        self.cursors.append(cursor)
+        return cursor
+
+
+class AsyncSQLiteCursor(object):
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.closed = False
+
+    async def execute(self, sql, args=()):
+        self.cursor.execute(sql, args)
+
+    async def fetchmany(self, size):
+        return self.cursor.fetchmany(size)
+
+    async def fetchall(self):
+        return self.cursor.fetchall()
+
+    async def close(self):
+        self.closed = True
+        self.cursor.close()
+
+    @property
+    def description(self):
+        return self.cursor.description
+
+
+async def collect(rows):
+    return [row async for row in rows]
+
+
+async def gather(*coroutines):
+    return await asyncio.gather(*coroutines)
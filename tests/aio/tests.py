@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+import sys
+import unittest
+from ..base import TestCase, SQLiteConnection
+from sqlbuilder.query import *
+from sqlbuilder.instrument import EVENT, instrumentation
+
+if sys.version_info >= (3, 6):
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    from .connection import AsyncSQLiteConnection, collect, gather
+
+    class CountingExecutor(ThreadPoolExecutor):
+
+        def __init__(self):
+            super(CountingExecutor, self).__init__(max_workers=1)
+            self.submitted = 0
+
+        def submit(self, *args, **kwargs):
+            self.submitted += 1
+            return super(CountingExecutor, self).submit(*args, **kwargs)
+
+
+@unittest.skipIf(sys.version_info < (3, 6), 'asyncio execution requires Python 3.6')
+class AsyncTestCase(TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.connection = AsyncSQLiteConnection()
+        self.connection.connection.execute(u'CREATE TABLE items (id INTEGER, name TEXT)')
+        self.wait(INSERT(T.items, (C.id, C.name)).ROWS((i, str(i)) for i in range(25)).execute_async(self.connection))
+
+    def tearDown(self):
+        self.loop.close()
+
+    def wait(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+
+class ExecuteAsyncTest(AsyncTestCase):
+
+    def test_execute(self):
+        cursor = self.wait(SELECT(C.name).FROM(T.items).WHERE(C.id == V.id).execute_async(self.connection, id=3))
+        self.assertEqual(self.wait(cursor.fetchall()), [('3',)])
+
+    def test_concurrent(self):
+        queries = [SELECT(C.name).FROM(T.items).WHERE(C.id == i).execute_async(self.connection) for i in range(10)]
+        cursors = self.wait(gather(*queries))
+        self.assertEqual([self.wait(cursor.fetchall()) for cursor in cursors], [[(str(i),)] for i in range(10)])
+
+    def test_failed(self):
+        with self.assertRaises(Exception):
+            self.wait(SELECT().FROM(T.missing).execute_async(self.connection))
+        self.assertTrue(self.connection.cursors[-1].closed)
+
+    def test_batches(self):
+        query = INSERT(T.items, (C.id, C.name), max_params=10).ROWS((i, str(i)) for i in range(25, 50))
+        self.wait(query.execute_async(self.connection))
+        self.assertEqual(self.connection.connection.execute(u'SELECT count(*) FROM items').fetchone(), (50,))
+
+
+class RenderAsyncTest(AsyncTestCase):
+
+    def setUp(self):
+        super(RenderAsyncTest, self).setUp()
+        self.executor = CountingExecutor()
+
+    def tearDown(self):
+        self.executor.shutdown()
+        super(RenderAsyncTest, self).tearDown()
+
+    def execute(self, query, nodes):
+        class Select(SELECT):
+            ASYNC_RENDER_NODES = nodes
+            ASYNC_RENDER_EXECUTOR = self.executor
+        select = Select(*query.columns)
+        select.source = query.source
+        return self.wait(collect(select.iter_rows_async(self.connection)))
+
+    def test_small(self):
+        rows = self.execute(SELECT(C.id).FROM(T.items).WHERE(IN(C.id, list(range(10)))), nodes=100)
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(self.executor.submitted, 0)
+
+    def test_large(self):
+        rows = self.execute(SELECT(C.id).FROM(T.items).WHERE(IN(C.id, list(range(200)))), nodes=100)
+        self.assertEqual(len(rows), 25)
+        self.assertEqual(self.executor.submitted, 1)
+
+    def test_disabled(self):
+        self.execute(SELECT(C.id).FROM(T.items).WHERE(IN(C.id, list(range(200)))), nodes=None)
+        self.assertEqual(self.executor.submitted, 0)
+
+
+class IterRowsAsyncTest(AsyncTestCase):
+
+    def test_rows(self):
+        query = SELECT(C.id, C.name).FROM(T.items).ORDER_BY(C.id)
+        self.assertEqual(self.wait(collect(query.iter_rows_async(self.connection, batch_size=10))),
+                    [(i, str(i)) for i in range(25)])
+
+    def test_dicts(self):
+        query = SELECT(C.id, C.name).FROM(T.items).WHERE(C.id < V.id).ORDER_BY(C.id)
+        rows = query.iter_rows_async(self.connection, row_type=SELECT.ROW.DICT, id=2)
+        self.assertEqual(self.wait(collect(rows)), [{ 'id': 0, 'name': '0' }, { 'id': 1, 'name': '1' }])
+
+    def test_blocking_cursor(self):
+        connection = SQLiteConnection()
+        connection.connection.execute(u'CREATE TABLE items (id INTEGER)')
+        self.wait(INSERT(T.items, (C.id,)).ROWS((i,) for i in range(5)).execute_async(connection))
+        rows = SELECT(C.id).FROM(T.items).ORDER_BY(C.id).iter_rows_async(connection, batch_size=2)
+        self.assertEqual(self.wait(collect(rows)), [(i,) for i in range(5)])
+
+    def test_instrumentation(self):
+        events = []
+        listener = instrumentation.add(lambda event, trace: events.append((event, trace.rows)))
+        try:
+            self.wait(collect(SELECT(C.id).FROM(T.items).iter_rows_async(self.connection, batch_size=10)))
+        finally:
+            instrumentation.remove(listener)
+        self.assertEqual(events[-2:], [(EVENT.AFTER_EXECUTE, None), (EVENT.AFTER_FETCH, 25)])
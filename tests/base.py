@@ -1,7 +1,25 @@
 # -*- coding: utf-8 -*-
 from __future__ import absolute_import
+import sqlite3
 import unittest
-from sqlbuilder.dummy import dummy_connection, dummy_context
+from sqlbuilder.dummy import DummyConnection, dummy_connection, dummy_context
+
+
+class SQLiteConnection(DummyConnection):
+    """
+    In-memory sqlite3 connection, queries are rendered with the native `qmark` placeholders of sqlite3
+    """
+
+    PARAMSTYLE = u'qmark'
+
+    def __init__(self, database=':memory:', **kwargs):
+        self.connection = sqlite3.connect(database, **kwargs)
+
+    def cursor(self):
+        return self.connection.cursor()
+
+    def close(self):
+        self.connection.close()
 
 
 class TestCase(unittest.TestCase):
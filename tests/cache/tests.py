@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from decimal import Decimal
+from ..base import TestCase, SQLiteConnection
+from sqlbuilder.query import *
+from sqlbuilder.cache import MemoryBackend, ResultCache, SQLiteBackend
+
+
+class Text(type(u'')):
+    pass
+
+
+class CountingConnection(SQLiteConnection):
+
+    def __init__(self, dsn=None):
+        super(CountingConnection, self).__init__()
+        self.dsn = dsn
+        self.executed = 0
+
+    def cursor(self):
+        self.executed += 1
+        return super(CountingConnection, self).cursor()
+
+
+class CacheTestCase(TestCase):
+
+    def setUp(self):
+        self.connection = CountingConnection(u'dbname=test')
+        self.connection.connection.execute(u'CREATE TABLE items (id INTEGER, name TEXT)')
+        self.connection.connection.execute(u'CREATE TABLE tags (item_id INTEGER, tag TEXT)')
+        self.connection.connection.execute(u"INSERT INTO items VALUES (1, 'foo'), (2, 'bar')")
+        self.connection.connection.execute(u"INSERT INTO tags VALUES (1, 'x')")
+        self.connection.executed = 0
+        self.cache = self.make_cache()
+
+    def make_cache(self):
+        return ResultCache()
+
+    def query(self, item_id=1):
+        return SELECT(C.name).FROM(T.items).WHERE(C.id == item_id).cached(cache=self.cache)
+
+
+class ResultCacheTest(CacheTestCase):
+
+    def test_hit(self):
+        self.assertEqual(self.query().fetch(self.connection), [(u'foo',)])
+        self.assertEqual(self.query().fetch(self.connection), [(u'foo',)])
+        self.assertEqual(self.connection.executed, 1)
+        self.assertEqual(self.cache.metrics, {'hits': 1, 'misses': 1, 'stale': 0, 'evictions': 0})
+
+    def test_parameters(self):
+        self.assertEqual(self.query(1).fetch(self.connection), [(u'foo',)])
+        self.assertEqual(self.query(2).fetch(self.connection), [(u'bar',)])
+        self.assertEqual(self.connection.executed, 2)
+
+    def test_row_types(self):
+        self.assertEqual(self.query().fetch(self.connection, row_type=SELECT.ROW.DICT), [{'name': u'foo'}])
+        self.assertEqual(self.query().fetch(self.connection, row_type=SELECT.ROW.NAMEDTUPLE)[0].name, u'foo')
+        self.assertEqual(self.connection.executed, 1)
+
+    def test_ttl(self):
+        query = SELECT(C.name).FROM(T.items).WHERE(C.id == 1).cached(ttl=-1, cache=self.cache)
+        query.fetch(self.connection)
+        query.fetch(self.connection)
+        self.assertEqual(self.connection.executed, 2)
+        self.query().fetch(self.connection)
+        self.assertEqual(self.connection.executed, 3)
+
+    def test_key(self):
+        query = SELECT(C.name).FROM(T.items).WHERE(C.id == V.id).cached(key=u'item name', cache=self.cache)
+        self.assertEqual(query.fetch(self.connection, id=1), [(u'foo',)])
+        self.assertEqual(query.fetch(self.connection, id=2), [(u'foo',)])
+        self.assertEqual(self.connection.executed, 1)
+
+    def test_namespace(self):
+        other = CountingConnection()
+        other.connection.execute(u'CREATE TABLE items (id INTEGER, name TEXT)')
+        other.connection.execute(u"INSERT INTO items VALUES (1, 'baz')")
+        query = SELECT(C.name).FROM(T.items).WHERE(C.id == 1)
+        self.assertEqual(query.cached(cache=self.cache, namespace=u'a').fetch(self.connection), [(u'foo',)])
+        self.assertEqual(query.cached(cache=self.cache, namespace=u'b').fetch(other), [(u'baz',)])
+        self.assertEqual(query.cached(cache=self.cache, namespace=u'a').fetch(other), [(u'foo',)])
+        other.dsn = u'dbname=other'
+        self.assertEqual(query.cached(cache=self.cache).fetch(self.connection), [(u'foo',)])
+        self.assertEqual(query.cached(cache=self.cache).fetch(other), [(u'baz',)])
+        self.assertEqual((self.connection.executed, other.executed), (2, 2))
+
+    def test_no_namespace(self):
+        query = SELECT(C.name).FROM(T.items).WHERE(C.id == 1)
+        self.assertRaises(ValueError, query.cached(cache=self.cache).fetch, CountingConnection())
+        self.assertEqual(self.connection.executed, 0)
+
+    def test_typed_parameters(self):
+        self.assertNotEqual(ResultCache.key(u'a', u'SELECT ?', (1,)), ResultCache.key(u'a', u'SELECT ?', (True,)))
+        self.assertNotEqual(ResultCache.key(u'a', u'SELECT ?', (u'x',)), ResultCache.key(u'a', u'SELECT ?', (Text(u'x'),)))
+        self.assertNotEqual(ResultCache.key(u'a', u'SELECT ?', (Decimal('1.0'),)), ResultCache.key(u'a', u'SELECT ?', (Decimal('1.00'),)))
+        self.assertEqual(ResultCache.key(u'a', u'SELECT :p1', {'p1': 1}), ResultCache.key(u'a', u'SELECT :p1', {'p1': 1}))
+
+    def test_driver_rows(self):
+        self.connection.connection.row_factory = sqlite3.Row
+        self.assertEqual(self.query().fetch(self.connection), [(u'foo',)])
+        self.assertEqual(self.query().fetch(self.connection), [(u'foo',)])
+        self.assertEqual(self.connection.executed, 1)
+
+    def test_unpicklable(self):
+        self.connection.connection.row_factory = lambda cursor, row: (lambda: row,)
+        self.assertEqual(self.query().fetch(self.connection)[0][0](), (u'foo',))
+        self.assertEqual(self.query().fetch(self.connection)[0][0](), (u'foo',))
+        self.assertEqual(self.connection.executed, 2)
+
+    def test_invalidate(self):
+        joined = SELECT(C.tag).FROM(T.items.INNER_JOIN(T.tags, ON=C('items.id') == C('tags.item_id'))).cached(cache=self.cache)
+        self.query().fetch(self.connection)
+        joined.fetch(self.connection)
+        self.cache.invalidate(u'tags')
+        self.query().fetch(self.connection)
+        self.assertEqual(self.connection.executed, 2)
+        joined.fetch(self.connection)
+        self.assertEqual(self.connection.executed, 3)
+        self.assertEqual(self.cache.stale, 1)
+
+    def test_uncached(self):
+        query = SELECT(C.name).FROM(T.items).WHERE(C.id == 1)
+        query.fetch(self.connection)
+        query.fetch(self.connection)
+        self.assertEqual(self.connection.executed, 2)
+
+    def test_frozen(self):
+        base = SELECT(C.name).FROM(T.items).freeze()
+        base.cached(cache=self.cache)
+        self.assertTrue(base.caching is None)
+
+
+class SQLiteBackendTest(ResultCacheTest):
+
+    def make_cache(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.backend = SQLiteBackend(os.path.join(self.directory, 'cache.sqlite'))
+        self.addCleanup(self.backend.close)
+        return ResultCache(self.backend)
+
+    def test_shared(self):
+        self.query().fetch(self.connection)
+        other = ResultCache(SQLiteBackend(self.backend.path))
+        try:
+            self.assertEqual(self.query().cached(cache=other).fetch(self.connection), [(u'foo',)])
+            self.assertEqual(self.connection.executed, 1)
+            other.invalidate(u'items')
+            self.query().fetch(self.connection)
+            self.assertEqual(self.connection.executed, 2)
+        finally:
+            other.backend.close()
+
+
+class MemoryBackendTest(TestCase):
+
+    def test_byte_bound(self):
+        backend = MemoryBackend(max_bytes=10)
+        backend.set(u'a', b'1234', None)
+        backend.set(u'b', b'1234', None)
+        backend.get(u'a')
+        backend.set(u'c', b'1234', None)
+        self.assertEqual((backend.get(u'a'), backend.get(u'b'), backend.get(u'c')), (b'1234', None, b'1234'))
+        self.assertEqual((backend.size, backend.evictions), (8, 1))
+        backend.set(u'd', b'12345678901', None)
+        self.assertEqual(backend.get(u'd'), None)
+
+    def test_expiry(self):
+        backend = MemoryBackend()
+        backend.set(u'a', b'1', time.time() - 1)
+        self.assertEqual((backend.get(u'a'), backend.size), (None, 0))
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from ..base import TestCase
+from sqlbuilder.query import *
+from sqlbuilder.query.dependencies import tables
+
+
+class TablesTest(TestCase):
+
+    def assertTables(self, query, names):
+        self.assertEqual(tables(query), frozenset(names))
+
+    def test_from(self):
+        self.assertTables(SELECT(C.id).FROM(T.users), [u'users'])
+        self.assertTables(SELECT(C.id).FROM(T('public.users')), [u'public.users'])
+        self.assertTables(SELECT(F.now()), [])
+
+    def test_joins(self):
+        query = SELECT(T.users.id).FROM(T.users.LEFT_JOIN(T.orders, ON=T.users.id == T.orders.user_id).CROSS_JOIN(T.regions))
+        self.assertTables(query, [u'users', u'orders', u'regions'])
+        query = SELECT(C.id).FROM(T.users).INNER_JOIN(T.orders, USING=(C.user_id,))
+        self.assertTables(query, [u'users', u'orders'])
+
+    def test_aliases(self):
+        self.assertTables(SELECT(C.id).FROM(A.u(T.users)), [u'users'])
+        self.assertTables(SELECT(C.id).FROM(A.recent(SELECT(C.id).FROM(T.orders))), [u'orders'])
+
+    def test_subqueries(self):
+        query = SELECT(C.id, A.total(SELECT(F.count(C)).FROM(T.orders))).FROM(T.users).WHERE(
+            IN(C.id, SELECT(C.user_id).FROM(T.admins))
+        )
+        self.assertTables(query, [u'users', u'orders', u'admins'])
+
+    def test_set_operations(self):
+        query = (SELECT(C.id).FROM(T.a) | SELECT(C.id).FROM(T.b)) - SELECT(C.id).FROM(T.c)
+        self.assertTables(query, [u'a', u'b', u'c'])
+
+    def test_cte(self):
+        query = SELECT(C.id).FROM(T.recent).WITH(C.recent, SELECT(C.id).FROM(T.orders).WHERE(C.created > 0))
+        self.assertTables(query, [u'orders'])
+
+    def test_cte_shadowing(self):
+        query = SELECT(C.id).FROM(T.users).WITH(u'users', SELECT(C.id).FROM(T.users).WHERE(C.active == True))
+        self.assertTables(query, [u'users'])
+        query = SELECT(C.id).FROM(T.a).WITH(C.a, SELECT(C.id).FROM(T.b)).WITH(C.b, SELECT(C.id).FROM(T.c))
+        self.assertTables(query, [u'b', u'c'])
+
+    def test_cte_scope(self):
+        inner = SELECT(C.id).FROM(T.recent).WITH(C.recent, SELECT(C.id).FROM(T.orders))
+        query = SELECT(C.id).FROM(T.recent).WHERE(IN(C.id, inner))
+        self.assertTables(query, [u'recent', u'orders'])
+        query = SELECT(C.id).FROM(T.recent) | inner
+        self.assertTables(query, [u'recent', u'orders'])
+
+    def test_recursive_cte(self):
+        body = SELECT(C.id).FROM(T.nodes) | SELECT(C.id).FROM(T.tree)
+        query = SELECT(C.id).FROM(T.tree).WITH(C.tree, body, RECURSIVE=True)
+        self.assertTables(query, [u'nodes'])
+
+
+class MemoTest(TestCase):
+
+    def test_memoized(self):
+        query = SELECT(C.id).FROM(T.users)
+        self.assertTrue(query.tables() is query.tables())
+
+    def test_clause_methods(self):
+        query = SELECT(C.id).FROM(T.users)
+        self.assertEqual(query.tables(), frozenset([u'users']))
+        query.INNER_JOIN(T.orders, USING=(C.user_id,))
+        self.assertEqual(query.tables(), frozenset([u'users', u'orders']))
+
+    def test_frozen(self):
+        base = SELECT(C.id).FROM(T.users).freeze()
+        self.assertEqual(base.tables(), frozenset([u'users']))
+        joined = base.INNER_JOIN(T.orders, USING=(C.user_id,))
+        self.assertEqual(joined.tables(), frozenset([u'users', u'orders']))
+        self.assertEqual(base.tables(), frozenset([u'users']))
+        self.assertEqual(base.copy().FROM(T.other).tables(), frozenset([u'other']))
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from ..base import TestCase, SQLiteConnection
+from sqlbuilder.query import *
+from sqlbuilder.dialect import Dialect, PostgreSQLDialect, SQLiteDialect, MySQLDialect
+from sqlbuilder.dummy import DummyConnection
+from sqlbuilder.sql.strategy import InStrategy, ArrayComparison
+from sqlbuilder.sql.expression import Value
+
+
+class CountingDialect(Dialect):
+
+    OPERATORS = {
+        u'LIKE': 'like',
+    }
+
+    def __init__(self):
+        super(CountingDialect, self).__init__()
+        self.calls = []
+
+    def like(self, op, left, right=None, context=None):
+        self.calls.append(op)
+        return NotImplemented
+
+
+class DialectTestCase(TestCase):
+
+    def assertDialectSQL(self, dialect, expr, sql):
+        self.assertEqual(expr._as_sql(dialect, {}), sql)
+
+
+class QuotingTest(DialectTestCase):
+
+    def test_postgresql(self):
+        self.assertDialectSQL(PostgreSQLDialect(), SELECT(C.id, F.count(C)).FROM(T.users),
+                    (u'SELECT "id", count(*) FROM "users"', ()))
+
+    def test_mysql(self):
+        self.assertDialectSQL(MySQLDialect(), SELECT(C.id).FROM(T.users),
+                    (u'SELECT `id` FROM `users`', ()))
+
+    def test_qualified(self):
+        self.assertDialectSQL(SQLiteDialect(), SELECT(T.users.id, C('users.*')).FROM(T.users),
+                    (u'SELECT "users"."id", "users".* FROM "users"', ()))
+
+    def test_escaped(self):
+        self.assertDialectSQL(PostgreSQLDialect(), C('say "hi"'),
+                    (u'"say ""hi"""', ()))
+
+    def test_unquoted(self):
+        self.assertDialectSQL(Dialect(), SELECT(C.id).FROM(T.users),
+                    (u'SELECT id FROM users', ()))
+
+    def test_connection(self):
+        connection = SQLiteConnection()
+        connection.dialect = MySQLDialect()
+        self.assertDialectSQL(connection, SELECT(C.id),
+                    (u'SELECT `id`', ()))
+
+    def test_paramstyle(self):
+        self.assertEqual(PostgreSQLDialect.PARAMSTYLE, u'format')
+        self.assertEqual(SQLiteDialect.PARAMSTYLE, u'qmark')
+        self.assertEqual(MySQLDialect.PARAMSTYLE, u'format')
+
+
+class OperatorTest(DialectTestCase):
+
+    def test_renamed(self):
+        self.assertDialectSQL(PostgreSQLDialect(), AND(RLIKE(C.a, u'^x'), NOT_RLIKE(C.b, u'y$'), C.c ^ 1),
+                    (u'(("a" ~ %s) AND ("b" !~ %s) AND ("c" # %s))', (u'^x', u'y$', 1)))
+        self.assertDialectSQL(MySQLDialect(), ILIKE(C.a, u'x%'),
+                    (u'(`a` LIKE %s)', (u'x%',)))
+
+    def test_sqlite_xor(self):
+        self.assertDialectSQL(SQLiteDialect(), C.a ^ 3,
+                    (u'(("a" | ?) - ("a" & ?))', (3, 3)))
+        connection = SQLiteConnection()
+        connection.dialect = SQLiteDialect()
+        self.assertEqual(SELECT(Value(6) ^ 3).execute(connection).fetchall(), [(5,)])
+
+    def test_dispatch(self):
+        dialect = CountingDialect()
+        self.assertDialectSQL(dialect, AND(C.a == 1, LIKE(C.b, u'x'), C.c > 2),
+                    (u'((a = %s) AND (b LIKE %s) AND (c > %s))', (1, u'x', 2)))
+        self.assertEqual(dialect.calls, [u'LIKE'])
+
+    def test_legacy(self):
+        calls = []
+        class Connection(DummyConnection):
+            def operator_to_sql(self, op, left, right=None, context=None):
+                calls.append(op)
+                return NotImplemented
+        self.assertDialectSQL(Connection(), AND(C.a == 1, C.b > 2),
+                    (u'((a = %s) AND (b > %s))', (1, 2)))
+        self.assertEqual(calls, [u'=', u'>'])
+
+    def test_in_strategy(self):
+        dialect = PostgreSQLDialect(in_strategy=InStrategy(InStrategy.STRATEGY.ARRAY, threshold=2))
+        self.assertDialectSQL(dialect, IN(C.a, [1, 2, 3]),
+                    (u'("a" = ANY(%s))', ([1, 2, 3],)))
+
+    def test_in_strategy_default(self):
+        self.assertDialectSQL(PostgreSQLDialect(), IN(C.a, range(1001)),
+                    (u'("a" = ANY(%s))', (list(range(1001)),)))
+        self.assertDialectSQL(PostgreSQLDialect(), IN(C.a, [1, 2, 3]),
+                    (u'("a" IN (%s, %s, %s))', (1, 2, 3)))
+
+    def test_in_strategy_arrays(self):
+        with self.assertRaises(AssertionError):
+            SQLiteDialect(in_strategy=InStrategy(InStrategy.STRATEGY.ARRAY))
+        with self.assertRaises(TypeError):
+            ArrayComparison(u'ANY', [1, 2])._as_sql(MySQLDialect(), {})
+        self.assertDialectSQL(SQLiteDialect(in_strategy=InStrategy(InStrategy.STRATEGY.CHUNKS, threshold=2)), IN(C.a, [1, 2, 3]),
+                    (u'(("a" IN (?, ?)) OR ("a" IN (?)))', (1, 2, 3)))
+
+    def test_in_strategy_paramstyle(self):
+        class Connection(PostgreSQLDialect):
+            PARAMSTYLE = u'dollar'
+        dialect = Connection(in_strategy=InStrategy(InStrategy.STRATEGY.ARRAY, threshold=2))
+        self.assertDialectSQL(dialect, AND(IN(C.a, [1, 2, 3]), C.b == 1),
+                    (u'(("a" = ANY($1)) AND ("b" = $2))', ([1, 2, 3], 1)))
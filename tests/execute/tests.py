@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from ..base import TestCase, SQLiteConnection
+from sqlbuilder.query import *
+
+
+class ExecuteTestCase(TestCase):
+
+    def setUp(self):
+        self.connection = SQLiteConnection()
+        self.connection.cursor().execute(u'CREATE TABLE items (id INTEGER, name TEXT)')
+
+    def fetchall(self, sql):
+        return self.connection.cursor().execute(sql).fetchall()
+
+
+class ExecuteTest(ExecuteTestCase):
+
+    def test_execute(self):
+        INSERT(T.items, (C.id, C.name)).VALUES(1, 'foo').execute(self.connection)
+        cursor = SELECT(C.name).FROM(T.items).WHERE(C.id == V.id).execute(self.connection, id=1)
+        self.assertEqual(cursor.fetchall(), [('foo',)])
+
+
+class ExecuteManyTest(ExecuteTestCase):
+
+    def test_execute_many(self):
+        query = INSERT(T.items, (C.id, C.name)).VALUES(V.id, V.name)
+        query.execute_many(self.connection, ({ 'id': i, 'name': str(i) } for i in range(1000)))
+        self.assertEqual(self.fetchall(u'SELECT count(*), sum(id) FROM items'), [(1000, sum(range(1000)))])
+
+    def test_constants(self):
+        query = INSERT(T.items, (C.id, C.name)).VALUES(V.id, 'constant')
+        query.execute_many(self.connection, [{ 'id': 1 }, { 'id': 2 }])
+        self.assertEqual(self.fetchall(u'SELECT id, name FROM items ORDER BY id'), [(1, 'constant'), (2, 'constant')])
+
+    def test_single_render(self):
+        renders = []
+        class CountingInsert(INSERT):
+            def _render(self, output):
+                renders.append(output)
+                super(CountingInsert, self)._render(output)
+        query = CountingInsert(T.items, (C.id, C.name)).VALUES(V.id, V.name)
+        query.execute_many(self.connection, [{ 'id': i, 'name': None } for i in range(10)])
+        self.assertEqual(len(renders), 1)
+
+
+class IterRowsTest(ExecuteTestCase):
+
+    def setUp(self):
+        super(IterRowsTest, self).setUp()
+        INSERT(T.items, (C.id, C.name)).ROWS((i, str(i)) for i in range(25)).execute(self.connection)
+        self.query = SELECT(C.id, C.name).FROM(T.items).ORDER_BY(C.id)
+
+    def test_tuples(self):
+        self.assertEqual(list(self.query.iter_rows(self.connection, batch_size=10)),
+                    [(i, str(i)) for i in range(25)])
+
+    def test_dicts(self):
+        rows = self.query.iter_rows(self.connection, row_type=SELECT.ROW.DICT)
+        self.assertEqual(next(rows), { 'id': 0, 'name': '0' })
+
+    def test_namedtuples(self):
+        rows = list(SELECT(C.id, F.count(C)).FROM(T.items).GROUP_BY(C.id).iter_rows(self.connection, row_type=SELECT.ROW.NAMEDTUPLE))
+        self.assertEqual(len(rows), 25)
+        self.assertEqual(rows[3].id, 3)
+        self.assertEqual(rows[3][1], 1)
+        self.assertIs(type(rows[0]), type(rows[1]))
+
+    def test_context(self):
+        rows = SELECT(C.name).FROM(T.items).WHERE(C.id == V.id).iter_rows(self.connection, id=7)
+        self.assertEqual(list(rows), [('7',)])
+
+    def test_batches(self):
+        fetches = []
+        connection = self.connection
+        class Cursor(object):
+            def __init__(self, cursor):
+                self.cursor = cursor
+            def fetchmany(self, size):
+                fetches.append(size)
+                return self.cursor.fetchmany(size)
+            def __getattr__(self, name):
+                return getattr(self.cursor, name)
+        class Connection(type(connection)):
+            def __init__(self):
+                pass
+            def cursor(self):
+                return Cursor(connection.cursor())
+        rows = self.query.iter_rows(Connection(), batch_size=10)
+        next(rows)
+        self.assertEqual(fetches, [10])
+        list(rows)
+        self.assertEqual(fetches, [10, 10, 10, 10])
+
+
+class PaginateTest(ExecuteTestCase):
+
+    def setUp(self):
+        super(PaginateTest, self).setUp()
+        rows = [(i % 4 or None, str(i % 7)) for i in range(50)]
+        INSERT(T.items, (C.id, C.name)).ROWS(rows).execute(self.connection)
+
+    def assertPages(self, query, page_size=6):
+        pages = list(query.paginate(self.connection, page_size))
+        self.assertTrue(all(len(page) == page_size for page in pages[:-1]))
+        self.assertEqual(sum(pages, []), query.execute(self.connection).fetchall())
+
+    def test_uniform(self):
+        self.assertPages(SELECT(C.rowid, C.id).FROM(T.items).WHERE(IS_NOT_NULL(C.id)).ORDER_BY(C.id, C.rowid))
+
+    def test_mixed(self):
+        self.assertPages(SELECT(C.name, C.rowid).FROM(T.items).ORDER_BY(DESC(C.name), ASC(C.rowid)))
+
+    def test_nulls(self):
+        self.assertPages(SELECT(C.id, C.rowid).FROM(T.items).ORDER_BY(ASC(C.id).NULLS_LAST, DESC(C.rowid)))
+        self.assertPages(SELECT(C.id, C.rowid).FROM(T.items).ORDER_BY(DESC(C.id).NULLS_FIRST, ASC(C.rowid)))
+        self.assertPages(SELECT(C.id, C.rowid).FROM(T.items).ORDER_BY(ASC(C.id).NULLS_FIRST, ASC(C.rowid)))
+
+    def test_alias(self):
+        self.assertPages(SELECT(A.key(C.rowid * 2)).FROM(T.items).ORDER_BY(C.key), page_size=7)
+
+    def test_row_type(self):
+        pages = list(SELECT(C.rowid).FROM(T.items).ORDER_BY(C.rowid).paginate(self.connection, 20, row_type=SELECT.ROW.DICT))
+        self.assertEqual([len(page) for page in pages], [20, 20, 10])
+        self.assertEqual(pages[1][0], { 'rowid': 21 })
+
+    def test_missing_key(self):
+        with self.assertRaises(ValueError):
+            list(SELECT(C.name).FROM(T.items).ORDER_BY(C.rowid).paginate(self.connection, 10))
+
+
+class CountTest(ExecuteTestCase):
+
+    def setUp(self):
+        super(CountTest, self).setUp()
+        INSERT(T.items, (C.id, C.name)).ROWS((i, str(i % 5)) for i in range(25)).execute(self.connection)
+        self.query = SELECT(C.id, C.name).FROM(T.items).WHERE(C.id >= 5).ORDER_BY(C.id)
+
+    def test_count(self):
+        self.assertEqual(self.query.count(self.connection), 20)
+        self.assertEqual(self.query.LIMIT(10, 15).count(self.connection), 5)
+
+    def test_total_count(self):
+        self.assertEqual(self.query.LIMIT(10, 15).total_count(self.connection), 20)
+
+    def test_paginated(self):
+        query = self.query.PAGINATE_AFTER((9,)).LIMIT(5)
+        self.assertEqual(query.count(self.connection), 5)
+        self.assertEqual(query.total_count(self.connection), 15)
+        self.assertEqual(query.after, (9,))
+        query = SELECT(C.name).DISTINCT().FROM(T.items).ORDER_BY(C.name).PAGINATE_AFTER(('1',)).LIMIT(2)
+        self.assertEqual(query.fetch_with_total(self.connection), ([('2',), ('3',)], 3))
+
+    def test_set(self):
+        query = SELECT(C.id).FROM(T.items) | SELECT(C.id).FROM(T.items)
+        self.assertEqual(query.ORDER_BY(C.id).LIMIT(10).total_count(self.connection), 25)
+
+    def test_context(self):
+        query = SELECT(C.id).FROM(T.items).WHERE(C.id < V.id)
+        self.assertEqual(query.total_count(self.connection, id=3), 3)
+
+    def test_unchanged(self):
+        self.query.LIMIT(10).total_count(self.connection)
+        self.assertEqual(self.query.limit, 10)
+        self.assertIsNotNone(self.query.order)
+
+    def test_fetch(self):
+        self.assertEqual(self.query.LIMIT(2).fetch(self.connection, row_type=SELECT.ROW.DICT),
+                    [{ 'id': 5, 'name': '0' }, { 'id': 6, 'name': '1' }])
+
+    def test_fetch_with_total(self):
+        rows, total = self.query.LIMIT(3, 2).fetch_with_total(self.connection)
+        self.assertEqual(rows, [(7, '2'), (8, '3'), (9, '4')])
+        self.assertEqual(total, 20)
+
+    def test_fetch_with_total_wildcard(self):
+        rows, total = SELECT().FROM(T.items).WHERE(C.id < 3).fetch_with_total(self.connection, row_type=SELECT.ROW.DICT)
+        self.assertEqual(rows, [{ 'id': i, 'name': str(i) } for i in range(3)])
+        self.assertEqual(total, 3)
+
+    def test_fetch_with_total_distinct(self):
+        rows, total = SELECT(C.name).DISTINCT().FROM(T.items).ORDER_BY(C.name).LIMIT(2).fetch_with_total(self.connection)
+        self.assertEqual(rows, [('0',), ('1',)])
+        self.assertEqual(total, 5)
+
+    def test_fetch_with_total_past_end(self):
+        self.assertEqual(self.query.LIMIT(10, 100).fetch_with_total(self.connection), ([], 20))
+        self.assertEqual(self.query.WHERE(C.id > 100).fetch_with_total(self.connection), ([], 0))
+
+    def test_single_query(self):
+        queries = []
+        class Connection(type(self.connection)):
+            def cursor(self):
+                cursor = super(Connection, self).cursor()
+                queries.append(cursor)
+                return cursor
+        connection = self.connection
+        connection.__class__ = Connection
+        self.query.LIMIT(5).fetch_with_total(connection)
+        self.assertEqual(len(queries), 1)
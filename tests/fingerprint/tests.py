@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+import json
+from ..base import TestCase, SQLiteConnection
+from sqlbuilder.query import *
+from sqlbuilder.sql.fingerprint import fingerprint, normalize, normalized_sql
+from sqlbuilder.stats import FingerprintStats, registry
+
+
+class FingerprintTest(TestCase):
+
+    def test_values(self):
+        self.assertEqual(fingerprint(SELECT(C.id).FROM(T.users).WHERE(C.name == u'alice')),
+                         fingerprint(SELECT(C.id).FROM(T.users).WHERE(C.name == u'bob')))
+        self.assertEqual(fingerprint(SELECT(C.id).FROM(T.users).WHERE(C.name == u'alice')),
+                         fingerprint(SELECT(C.id).FROM(T.users).WHERE(C.name == V.name)))
+
+    def test_in_lists(self):
+        self.assertEqual(normalized_sql(SELECT(C.id).FROM(T.users).WHERE(IN(C.id, [1, 2, 3]))),
+                         u'SELECT id FROM users WHERE (id IN (?))')
+        self.assertEqual(fingerprint(SELECT(C.id).FROM(T.users).WHERE(NOT_IN(C.id, (1, 2)))),
+                         fingerprint(SELECT(C.id).FROM(T.users).WHERE(NOT_IN(C.id, (1,)))))
+
+    def test_values_rows(self):
+        self.assertEqual(normalized_sql(INSERT(T.users, (C.id, C.name)).VALUES(1, u'a').VALUES(2, u'b')),
+                         u'INSERT INTO users (id, name) VALUES (?, ?)')
+        self.assertEqual(fingerprint(SELECT(C).FROM(A.data(VALUES(1, 2)(3, 4)(5, 6), columns=(C.a, C.b)))),
+                         fingerprint(SELECT(C).FROM(A.data(VALUES(1, 2), columns=(C.a, C.b)))))
+
+    def test_normalize(self):
+        for sql in (u'a IN ($1, $2) AND b = $1', u'a IN (:p1, :p2) AND b = :p1', u'a IN (%s, %s) AND b = %s'):
+            self.assertEqual(normalize(sql), u'a IN (?) AND b = ?')
+
+    def test_structure(self):
+        base = fingerprint(SELECT(C.id).FROM(T.users).WHERE(C.name == 1))
+        self.assertNotEqual(fingerprint(SELECT(C.id).FROM(T.users).WHERE(C.email == 1)), base)
+        self.assertNotEqual(fingerprint(SELECT(C.id).FROM(T.users).WHERE(C.name > 1)), base)
+        self.assertNotEqual(fingerprint(SELECT(C.id).FROM(T.users).WHERE(C.name == C.other)), base)
+
+    def test_stable(self):
+        query = SELECT(C.id).FROM(T.users).WHERE(C.name == 1)
+        self.assertEqual(fingerprint(query), fingerprint(SELECT(C.id).FROM(T.users).WHERE(C.name == 1)))
+        self.assertEqual(len(fingerprint(query)), 16)
+        self.assertEqual(normalized_sql(query), u'SELECT id FROM users WHERE (name = ?)')
+
+
+class FingerprintStatsTest(TestCase):
+
+    def setUp(self):
+        self.connection = SQLiteConnection()
+        self.connection.cursor().execute(u'CREATE TABLE items (id INTEGER, name TEXT)')
+        self.stats = FingerprintStats()
+        self.stats.enable()
+
+    def tearDown(self):
+        self.stats.disable()
+
+    def test_aggregate(self):
+        for i in range(3):
+            INSERT(T.items, (C.id, C.name)).VALUES(i, str(i)).execute(self.connection)
+        SELECT(C.name).FROM(T.items).WHERE(IN(C.id, [0, 1])).fetch(self.connection)
+        SELECT(C.name).FROM(T.items).WHERE(IN(C.id, [0, 1, 2])).fetch(self.connection)
+        self.assertEqual(len(self.stats.stats), 2)
+        query = SELECT(C.name).FROM(T.items).WHERE(IN(C.id, [5]))
+        stats = self.stats.stats[fingerprint(query)]
+        self.assertEqual((stats.query_class, stats.sql), (SELECT, u'SELECT name FROM items WHERE (id IN (?))'))
+        self.assertEqual((stats.execute.count, stats.rows), (2, 5))
+        insert = self.stats.stats[fingerprint(INSERT(T.items, (C.id, C.name)).VALUES(0, u''))]
+        self.assertEqual((insert.execute.count, insert.rowcount), (3, 3))
+
+    def test_iterator_rows(self):
+        INSERT(T.items, (C.id, C.name)).ROWS((i, str(i)) for i in range(3)).execute(self.connection)
+        INSERT(T.items, (C.id, C.name)).ROWS((i, str(i)) for i in range(5)).execute(self.connection)
+        stats = self.stats.stats[fingerprint(INSERT(T.items, (C.id, C.name)).VALUES(0, u''))]
+        self.assertEqual((stats.sql, stats.execute.count, stats.rowcount),
+                         (u'INSERT INTO items (id, name) VALUES (?, ?)', 2, 8))
+
+    def test_errors(self):
+        self.assertRaises(Exception, SELECT(C.id).FROM(T.missing).execute, self.connection)
+        self.assertEqual(self.stats.stats[fingerprint(SELECT(C.id).FROM(T.missing))].errors, 1)
+
+    def test_json(self):
+        SELECT(C.name).FROM(T.items).WHERE(C.id == 1).fetch(self.connection)
+        exported = json.loads(self.stats.to_json())
+        entry = exported[fingerprint(SELECT(C.name).FROM(T.items).WHERE(C.id == 2))]
+        self.assertEqual(entry['query_class'], u'SELECT')
+        self.assertEqual(entry['sql'], u'SELECT name FROM items WHERE (id = ?)')
+        self.assertEqual((entry['count'], entry['rows'], entry['errors']), (1, 0, 0))
+        self.assertEqual(sorted(entry['execute']), [u'max', u'mean', u'p50', u'p95', u'p99', u'total'])
+
+    def test_enable(self):
+        self.stats.enable()
+        SELECT(C.name).FROM(T.items).execute(self.connection)
+        self.assertEqual(list(self.stats.stats.values())[0].execute.count, 1)
+        self.stats.disable()
+        SELECT(C.name).FROM(T.items).execute(self.connection)
+        self.assertEqual(list(self.stats.stats.values())[0].execute.count, 1)
+
+    def test_registry(self):
+        self.assertTrue(isinstance(registry, FingerprintStats))
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from ..base import TestCase
+from sqlbuilder.query import *
+
+
+def base_query():
+    return SELECT(C.id, C.name).FROM(T.users).WHERE(C.active == True).ORDER_BY(C.name)
+
+
+class FreezeTest(TestCase):
+
+    def test_unchanged(self):
+        base = base_query().freeze()
+        base.WHERE(C.id == 1).LIMIT(10).LEFT_JOIN(T.groups, USING=C.group_id)
+        base.WINDOW(C.w, PARTITION_BY=C.group_id).WITH(C.foo, SELECT())
+        base.DISTINCT().ORDER_BY(C.id)
+        self.assertSQL(base,
+                    (u'SELECT id, name FROM users WHERE (active = %s) ORDER BY name', (True,)))
+
+    def test_derived(self):
+        base = base_query().freeze()
+        self.assertSQL(base.WHERE(C.id == 1).LIMIT(10),
+                    (u'SELECT id, name FROM users WHERE (id = %s) ORDER BY name LIMIT %s', (1, 10)))
+        self.assertSQL(base.LEFT_JOIN(T.groups, USING=C.group_id),
+                    (u'SELECT id, name FROM users LEFT OUTER JOIN groups USING (group_id) WHERE (active = %s) ORDER BY name', (True,)))
+
+    def test_derived_frozen(self):
+        base = base_query().freeze()
+        derived = base.LIMIT(10)
+        self.assertTrue(derived.frozen)
+        derived.OFFSET(20)
+        self.assertSQL(derived,
+                    (u'SELECT id, name FROM users WHERE (active = %s) ORDER BY name LIMIT %s', (True, 10)))
+
+    def test_shared(self):
+        base = base_query().freeze()
+        derived = base.LIMIT(10)
+        self.assertIs(derived.columns, base.columns)
+        self.assertIs(derived.source, base.source)
+        derived = base.WHERE(C.id == 1)
+        self.assertIsNot(derived.source, base.source)
+        self.assertIs(derived.source.source, base.source.source)
+
+    def test_mutable(self):
+        query = base_query()
+        self.assertIs(query.LIMIT(10), query)
+        self.assertIs(query.WHERE(C.id == 1), query)
+
+    def test_select_set(self):
+        base = (SELECT(C.id).FROM(T.a) | SELECT(C.id).FROM(T.b)).freeze()
+        self.assertSQL(base.ALL.ORDER_BY(C.id),
+                    (u'SELECT id FROM a UNION ALL SELECT id FROM b ORDER BY id', ()))
+        self.assertSQL(base,
+                    (u'SELECT id FROM a UNION SELECT id FROM b', ()))
+
+
+class CopyTest(TestCase):
+
+    def test_copy(self):
+        query = base_query()
+        copy = query.copy()
+        copy.WHERE(C.id == 1).LIMIT(10).WINDOW(C.w)
+        self.assertSQL(query,
+                    (u'SELECT id, name FROM users WHERE (active = %s) ORDER BY name', (True,)))
+        self.assertSQL(copy,
+                    (u'SELECT id, name FROM users WHERE (id = %s) WINDOW w AS () ORDER BY name LIMIT %s', (1, 10)))
+
+    def test_copy_frozen(self):
+        base = base_query().freeze()
+        copy = base.copy()
+        self.assertFalse(copy.frozen)
+        self.assertIs(copy.LIMIT(10), copy)
+        self.assertSQL(base,
+                    (u'SELECT id, name FROM users WHERE (active = %s) ORDER BY name', (True,)))
+
+    def test_copy_no_source(self):
+        self.assertSQL(SELECT(C.id).copy(),
+                    (u'SELECT id', ()))
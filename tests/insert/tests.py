@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from ..base import TestCase, SQLiteConnection
+from sqlbuilder.query import *
+from sqlbuilder.dummy import dummy_connection
+
+
+class InsertTest(TestCase):
+
+    def statements(self, query):
+        return list(query.statements(dummy_connection, {}))
+
+    def test_values(self):
+        self.assertSQL(INSERT(T.table, (C.foo, C.bar)).VALUES(1, 2).VALUES(3, F.now()),
+                    (u'INSERT INTO table (foo, bar) VALUES (%s, %s), (%s, now())', (1, 2, 3)))
+
+    def test_no_columns(self):
+        self.assertSQL(INSERT(T.table).VALUES(1, 2),
+                    (u'INSERT INTO table VALUES (%s, %s)', (1, 2)))
+
+    def test_rows(self):
+        self.assertSQL(INSERT(T.table, (C.foo, C.bar)).ROWS([(1, 2), (3, 4)]),
+                    (u'INSERT INTO table (foo, bar) VALUES (%s, %s), (%s, %s)', (1, 2, 3, 4)))
+
+    def test_dict_rows(self):
+        self.assertSQL(INSERT(T.table, (C.foo, 'bar')).ROWS([{ 'bar': 2, 'foo': 1 }, { 'foo': 3, 'bar': 4 }]),
+                    (u'INSERT INTO table (foo, bar) VALUES (%s, %s), (%s, %s)', (1, 2, 3, 4)))
+
+    def test_dict_rows_columns(self):
+        self.assertSQL(INSERT(T.table).ROWS([{ 'foo': 1, 'bar': 2 }]),
+                    (u'INSERT INTO table (bar, foo) VALUES (%s, %s)', (2, 1)))
+
+    def test_no_rows(self):
+        with self.assertRaises(AssertionError):
+            self.as_sql(INSERT(T.table, (C.foo,)))
+
+    def test_batches(self):
+        query = INSERT(T.table, (C.foo, C.bar), max_params=5).ROWS((i, i) for i in range(5))
+        self.assertEqual(self.statements(query), [
+            (u'INSERT INTO table (foo, bar) VALUES (%s, %s), (%s, %s)', (0, 0, 1, 1)),
+            (u'INSERT INTO table (foo, bar) VALUES (%s, %s), (%s, %s)', (2, 2, 3, 3)),
+            (u'INSERT INTO table (foo, bar) VALUES (%s, %s)', (4, 4)),
+        ])
+
+    def test_batches_unbounded(self):
+        query = INSERT(T.table, (C.foo,)).ROWS((i,) for i in range(3))
+        self.assertEqual(self.statements(query), [
+            (u'INSERT INTO table (foo) VALUES (%s), (%s), (%s)', (0, 1, 2)),
+        ])
+
+    def test_batches_wide_rows(self):
+        query = INSERT(T.table, max_params=2).ROWS([(1, 2, 3), (4, 5, 6)])
+        with self.assertRaises(ValueError):
+            self.statements(query)
+        query = INSERT(T.table, (C.foo, C.bar), max_params=1).VALUES(1, 2)
+        with self.assertRaises(ValueError):
+            self.statements(query)
+
+    def test_execute(self):
+        connection = SQLiteConnection()
+        connection.cursor().execute(u'CREATE TABLE items (id INTEGER, name TEXT)')
+        INSERT(T.items, (C.id, C.name), max_params=999).ROWS((i, str(i)) for i in range(2500)).execute(connection)
+        cursor = connection.cursor().execute(u'SELECT count(*), sum(id) FROM items')
+        self.assertEqual(cursor.fetchone(), (2500, sum(range(2500))))
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from ..base import TestCase, SQLiteConnection
+from sqlbuilder.query import *
+from sqlbuilder.instrument import EVENT, Histogram, HistogramCollector, instrumentation, null_trace
+
+
+class InstrumentTestCase(TestCase):
+
+    def setUp(self):
+        self.connection = SQLiteConnection()
+        self.connection.cursor().execute(u'CREATE TABLE items (id INTEGER, name TEXT)')
+        self.events = []
+        self.collector = HistogramCollector()
+        instrumentation.add(self.record)
+        instrumentation.add(self.collector)
+
+    def tearDown(self):
+        instrumentation.remove(self.record)
+        instrumentation.remove(self.collector)
+
+    def record(self, event, trace):
+        self.events.append((event, trace.query_class, trace.sql, trace.params))
+
+
+class EventTest(InstrumentTestCase):
+
+    def test_events(self):
+        INSERT(T.items, (C.id, C.name)).VALUES(1, 'foo').execute(self.connection)
+        sql = u'INSERT INTO items (id, name) VALUES (?, ?)'
+        self.assertEqual(self.events, [
+            (EVENT.BEFORE_RENDER, INSERT, None, 0),
+            (EVENT.AFTER_RENDER, INSERT, sql, 2),
+            (EVENT.BEFORE_EXECUTE, INSERT, sql, 2),
+            (EVENT.AFTER_EXECUTE, INSERT, sql, 2),
+        ])
+
+    def test_fetch(self):
+        INSERT(T.items, (C.id, C.name)).VALUES(1, 'foo').VALUES(2, 'bar').execute(self.connection)
+        query = SELECT(C.name).FROM(T.items)
+        self.assertEqual(len(query.fetch(self.connection)), 2)
+        self.assertEqual(len(list(query.iter_rows(self.connection, batch_size=1))), 2)
+        stats = self.collector.stats[SELECT, u'SELECT name FROM items']
+        self.assertEqual((stats.execute.count, stats.rows), (2, 4))
+        self.assertEqual(self.events[-1][0], EVENT.AFTER_FETCH)
+
+    def test_error(self):
+        query = SELECT(C.name).FROM(T.missing)
+        self.assertRaises(Exception, query.execute, self.connection)
+        self.assertEqual(self.events[-1][0], EVENT.ERROR)
+        stats = self.collector.stats[SELECT, u'SELECT name FROM missing']
+        self.assertEqual((stats.errors, stats.execute.count), (1, 0))
+
+    def test_batches(self):
+        rows = iter([(1, 'foo'), (2, 'bar')])
+        INSERT(T.items, (C.id, C.name), max_params=2).ROWS(rows).execute(self.connection)
+        sql = u'INSERT INTO items (id, name) VALUES (?, ?)'
+        self.assertEqual(self.events, [
+            (EVENT.BEFORE_RENDER, INSERT, None, 0),
+            (EVENT.AFTER_RENDER, INSERT, sql, 2),
+            (EVENT.BEFORE_EXECUTE, INSERT, sql, 2),
+            (EVENT.AFTER_RENDER, INSERT, sql, 4),
+            (EVENT.BEFORE_EXECUTE, INSERT, sql, 4),
+            (EVENT.AFTER_EXECUTE, INSERT, sql, 4),
+        ])
+        stats = self.collector.stats[INSERT, sql]
+        self.assertEqual((stats.execute.count, stats.rowcount), (1, 1))
+
+    def test_execute_many(self):
+        query = INSERT(T.items, (C.id, C.name)).VALUES(V.id, V.name)
+        query.execute_many(self.connection, [{'id': i, 'name': str(i)} for i in range(3)])
+        self.assertEqual(self.events[-1], (EVENT.AFTER_EXECUTE, INSERT, u'INSERT INTO items (id, name) VALUES (?, ?)', 6))
+
+    def test_no_listeners(self):
+        instrumentation.remove(self.record)
+        instrumentation.remove(self.collector)
+        self.assertTrue(instrumentation.trace(SELECT(C.id)) is null_trace)
+        SELECT(C.name).FROM(T.items).fetch(self.connection)
+        self.assertEqual(self.events, [])
+
+
+class CollectorTest(InstrumentTestCase):
+
+    def test_shapes(self):
+        for i in range(3):
+            SELECT(C.name).FROM(T.items).WHERE(C.id == i).execute(self.connection)
+        SELECT(C.id).FROM(T.items).execute(self.connection)
+        self.assertEqual(len(self.collector.stats), 2)
+        slowest = self.collector.slowest(1)
+        self.assertEqual(len(slowest), 1)
+        stats = self.collector.stats[SELECT, u'SELECT name FROM items WHERE (id = ?)']
+        self.assertEqual((stats.render.count, stats.execute.count), (3, 3))
+
+    def test_maxsize(self):
+        self.collector.maxsize = 1
+        SELECT(C.name).FROM(T.items).execute(self.connection)
+        SELECT(C.id).FROM(T.items).execute(self.connection)
+        self.assertEqual((len(self.collector.stats), self.collector.dropped), (1, 1))
+
+
+class HistogramTest(TestCase):
+
+    def test_histogram(self):
+        histogram = Histogram((0.001, 0.01, 0.1))
+        for value in (0.0005, 0.002, 0.003, 0.05, 0.5):
+            histogram.add(value)
+        self.assertEqual(histogram.counts, [1, 2, 1, 1])
+        self.assertEqual(histogram.max, 0.5)
+        self.assertAlmostEqual(histogram.mean, 0.1111)
+        self.assertEqual(histogram.percentile(50), 0.01)
+        self.assertEqual(histogram.percentile(100), 0.5)
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from ..base import TestCase
+from sqlbuilder.query import *
+from sqlbuilder.dummy import DummyConnection
+from sqlbuilder.sql import name
+
+
+class InternTest(TestCase):
+
+    def test_identifier(self):
+        self.assertIs(C.foo, C.foo)
+        self.assertIs(C('foo'), F.foo)
+        self.assertIs(C.foo.bar, C.foo.bar)
+
+    def test_table(self):
+        self.assertIs(T.foo, T.foo)
+        self.assertIs(T.foo.bar, T.foo.bar)
+        self.assertIsNot(T.foo, ONLY.foo)
+        self.assertIs(ONLY.foo, ONLY.foo)
+
+    def test_table_columns(self):
+        self.assertIs(T.foo(), T.foo())
+        self.assertIs(T.foo().bar, T.foo().bar)
+        self.assertIs(T.foo().bar, C.foo.bar)
+
+    def test_immutable(self):
+        with self.assertRaises(AttributeError):
+            C.foo._name = 'bar'
+        with self.assertRaises(AttributeError):
+            T.foo._only = True
+
+    def test_variables(self):
+        self.assertIsNot(V.foo, V.foo)
+
+    def test_bounded(self):
+        for index in range(name.MAX_INTERNED + 1):
+            C('name_{index}'.format(index=index))
+        self.assertLessEqual(len(name.interned), name.MAX_INTERNED)
+        self.assertIs(C.foo, C.foo)
+
+
+class CountingConnection(DummyConnection):
+
+    def __init__(self):
+        self.quoted = []
+
+    def quote_identifier(self, identifier):
+        self.quoted.append(identifier)
+        return u'"{identifier}"'.format(identifier=identifier)
+
+    def quote_function_name(self, name):
+        self.quoted.append(name)
+        return name.upper()
+
+
+class QuoteCacheTest(TestCase):
+
+    def test_memoized(self):
+        connection = CountingConnection()
+        query = SELECT(C.foo, F.count(C.bar)).FROM(T.table).WHERE(C.foo > 1)
+        self.assertEqual(query._as_sql(connection, {}),
+                    (u'SELECT "foo", COUNT("bar") FROM "table" WHERE ("foo" > %s)', (1,)))
+        self.assertEqual(query._as_sql(connection, {}),
+                    (u'SELECT "foo", COUNT("bar") FROM "table" WHERE ("foo" > %s)', (1,)))
+        self.assertEqual(sorted(connection.quoted), ['bar', 'count', 'foo', 'table'])
+
+    def test_per_connection(self):
+        query = SELECT(C.foo)
+        self.assertEqual(self.as_sql(query), (u'SELECT foo', ()))
+        self.assertEqual(query._as_sql(CountingConnection(), {}), (u'SELECT "foo"', ()))
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from ..base import TestCase
+from sqlbuilder.query import *
+from sqlbuilder.sql.expression import Value
+
+
+class FlattenTest(TestCase):
+
+    def test_nested_and(self):
+        self.assertSQL(AND(AND(C.a, C.b), AND(C.c, C.d)),
+                    (u'(a AND b AND c AND d)', ()))
+
+    def test_nested_or(self):
+        self.assertSQL(OR(C.a, OR(C.b, OR(C.c, C.d))),
+                    (u'(a OR b OR c OR d)', ()))
+
+    def test_mixed(self):
+        self.assertSQL(AND(C.a, OR(C.b, C.c), AND(C.d)),
+                    (u'(a AND (b OR c) AND d)', ()))
+
+    def test_incremental(self):
+        where = C.a == 1
+        for i in range(2, 5):
+            where = AND(where, C.a == i)
+        self.assertSQL(where,
+                    (u'((a = %s) AND (a = %s) AND (a = %s) AND (a = %s))', (1, 2, 3, 4)))
+
+
+class NormalizeTest(TestCase):
+
+    def test_identity(self):
+        self.assertSQL(AND(C.a, True, AND(), Value(True), C.b).normalize(),
+                    (u'(a AND b)', ()))
+        self.assertSQL(OR(C.a, False, C.b).normalize(),
+                    (u'(a OR b)', ()))
+
+    def test_absorbing(self):
+        self.assertSQL(AND(C.a, False, C.b).normalize(),
+                    (u'%s', (False,)))
+        self.assertSQL(OR(C.a, True, C.b).normalize(),
+                    (u'%s', (True,)))
+
+    def test_empty(self):
+        self.assertSQL(AND(True).normalize(),
+                    (u'%s', (True,)))
+        self.assertSQL(OR().normalize(),
+                    (u'%s', (False,)))
+
+    def test_single(self):
+        self.assertSQL(AND(C.a == 1, True).normalize(),
+                    (u'(a = %s)', (1,)))
+
+    def test_duplicates(self):
+        self.assertSQL(AND(C.a == 1, C.b == 2, AND(C.a == 1, C.b == 3)).normalize(),
+                    (u'((a = %s) AND (b = %s) AND (b = %s))', (1, 2, 3)))
+
+    def test_value_types(self):
+        self.assertSQL(OR(C.a == 1, C.a == True, C.a == 1.0, C.a == 1).normalize(),
+                    (u'((a = %s) OR (a = %s) OR (a = %s))', (1, True, 1.0)))
+
+    def test_variables(self):
+        self.assertSQL(OR(C.a == V.foo, C.a == V.foo, C.a == V.bar).normalize(),
+                    (u'((a = %s) OR (a = %s))', (1, 2)), context={ 'foo': 1, 'bar': 2 })
+
+    def test_nested(self):
+        self.assertSQL(AND(C.a, OR(C.b, C.b, False)).normalize(),
+                    (u'(a AND b)', ()))
+
+    def test_unhashable(self):
+        self.assertSQL(AND(C.a == [1], C.a == [1]).normalize(),
+                    (u'((a = %s) AND (a = %s))', ([1], [1])))
+
+    def test_xor(self):
+        self.assertSQL(XOR(C.a, XOR(C.a, True)).normalize(),
+                    (u'(a XOR a XOR %s)', (True,)))
+
+    def test_other(self):
+        self.assertSQL((C.a + 1).normalize(),
+                    (u'(a + %s)', (1,)))
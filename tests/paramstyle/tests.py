@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+import re
+import sqlite3
+from ..base import TestCase, SQLiteConnection
+from sqlbuilder.query import *
+from sqlbuilder.dialect import Dialect, PostgreSQLDialect, SQLiteDialect
+from sqlbuilder.sql.base import SQL
+from sqlbuilder.sql.expression import Value
+from sqlbuilder.sql.shape import shape
+
+
+def dialect(paramstyle):
+    return type('Dialect', (Dialect,), {'PARAMSTYLE': paramstyle})()
+
+
+class Legacy(SQL):
+
+    def _as_sql(self, connection, context):
+        return u'(mod(a, %s) = %s) AND (b LIKE %s || \'%%\')', (2, 0, u'x')
+
+
+class Literal(SQL):
+
+    def _as_sql(self, connection, context):
+        return u'(%s || \'%%s\')', (u'a',)
+
+
+class ParamstyleTest(TestCase):
+
+    query = SELECT(C.id).FROM(T.users).WHERE(AND(C.a == 1, C.b == 2, C.c == 1))
+
+    def assertParamstyle(self, paramstyle, expr, sql, context=None):
+        self.assertEqual(expr._as_sql(dialect(paramstyle), context or {}), sql)
+
+    def test_format(self):
+        self.assertParamstyle(u'format', self.query,
+                    (u'SELECT id FROM users WHERE ((a = %s) AND (b = %s) AND (c = %s))', (1, 2, 1)))
+
+    def test_qmark(self):
+        self.assertParamstyle(u'qmark', self.query,
+                    (u'SELECT id FROM users WHERE ((a = ?) AND (b = ?) AND (c = ?))', (1, 2, 1)))
+
+    def test_numeric(self):
+        self.assertParamstyle(u'numeric', self.query,
+                    (u'SELECT id FROM users WHERE ((a = :1) AND (b = :2) AND (c = :1))', (1, 2)))
+
+    def test_dollar(self):
+        self.assertParamstyle(u'dollar', self.query,
+                    (u'SELECT id FROM users WHERE ((a = $1) AND (b = $2) AND (c = $1))', (1, 2)))
+
+    def test_named(self):
+        self.assertParamstyle(u'named', self.query,
+                    (u'SELECT id FROM users WHERE ((a = :p1) AND (b = :p2) AND (c = :p1))', {u'p1': 1, u'p2': 2}))
+
+    def test_pyformat(self):
+        self.assertParamstyle(u'pyformat', self.query,
+                    (u'SELECT id FROM users WHERE ((a = %(p1)s) AND (b = %(p2)s) AND (c = %(p1)s))', {u'p1': 1, u'p2': 2}))
+
+    def test_types_not_merged(self):
+        self.assertParamstyle(u'dollar', OR(C.a == 1, C.b == True, C.c == 1.0),
+                    (u'((a = $1) OR (b = $2) OR (c = $3))', (1, True, 1.0)))
+
+    def test_unhashable(self):
+        self.assertParamstyle(u'dollar', OR(C.a == [1], C.b == [1]),
+                    (u'((a = $1) OR (b = $2))', ([1], [1])))
+
+    def test_variables(self):
+        self.assertParamstyle(u'dollar', OR(C.a == V.value, C.b == V.value, C.c == 5),
+                    (u'((a = $1) OR (b = $1) OR (c = $1))', (5,)), context={'value': 5})
+
+    def test_legacy_fragment(self):
+        self.assertParamstyle(u'dollar', AND(C.a == 2, Legacy()),
+                    (u'((a = $1) AND (mod(a, $1) = $2) AND (b LIKE $3 || \'%\'))', (2, 0, u'x')))
+        self.assertParamstyle(u'format', AND(C.a == 2, Legacy()),
+                    (u'((a = %s) AND (mod(a, %s) = %s) AND (b LIKE %s || \'%%\'))', (2, 2, 0, u'x')))
+
+    def test_deep(self):
+        # deeply nested subtrees are rendered out of order, their parameters must still be numbered correctly
+        expr = C.a == 1
+        for i in range(300):
+            expr = expr & (C.b == i % 3)
+        sql, args = expr._as_sql(dialect(u'format'), {})
+        numbered_sql, values = expr._as_sql(dialect(u'dollar'), {})
+        self.assertEqual(sorted(values), [0, 1, 2])
+        self.assertEqual(
+            re.sub(r'\$(\d+)', lambda match: str(values[int(match.group(1)) - 1]), numbered_sql),
+            sql % args,
+        )
+
+
+class CompileTest(TestCase):
+
+    def test_bind(self):
+        template = SELECT(C.id).FROM(T.users).WHERE(OR(C.a == V.value, C.b == V.value, C.c == 7)).compile(dialect(u'numeric'))
+        self.assertEqual(template.bind(value=1),
+                    (u'SELECT id FROM users WHERE ((a = :1) OR (b = :1) OR (c = :2))', (1, 7)))
+
+    def test_bind_named(self):
+        template = SELECT(C.id).FROM(T.users).WHERE(C.a == V.value).compile(dialect(u'named'))
+        self.assertEqual(template.bind(value=1),
+                    (u'SELECT id FROM users WHERE (a = :p1)', {u'p1': 1}))
+
+
+class ShapeTest(TestCase):
+
+    def test_numbering_in_shape(self):
+        connection = dialect(u'dollar')
+        self.assertEqual(shape(OR(C.a == 1, C.b == 2), connection, {})[0], shape(OR(C.a == 4, C.b == 5), connection, {})[0])
+        self.assertNotEqual(shape(OR(C.a == 1, C.b == 2), connection, {})[0], shape(OR(C.a == 3, C.b == 3), connection, {})[0])
+
+
+class Connection(object):
+    """
+    Plain sqlite3 connection declaring its dialect, without any placeholder conversion
+    """
+
+    dialect = SQLiteDialect()
+
+    def __init__(self):
+        self.connection = sqlite3.connect(':memory:')
+
+    def cursor(self):
+        return self.connection.cursor()
+
+
+class ExecuteTest(TestCase):
+
+    def test_native_placeholders(self):
+        connection = Connection()
+        self.assertEqual(SELECT(Value(2) + 3, Value(u'x')).execute(connection).fetchall(), [(5, u'x')])
+
+    def test_literal_placeholder(self):
+        self.assertEqual(SELECT(Literal()).execute(SQLiteConnection()).fetchall(), [(u'a%s',)])
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+import os
+import shutil
+import tempfile
+import threading
+import time
+from ..base import TestCase, SQLiteConnection
+from sqlbuilder.query import *
+from sqlbuilder.pool import ConnectionPool, PoolTimeout
+from sqlbuilder.dialect import MySQLDialect
+
+
+class QuotingConnection(SQLiteConnection):
+
+    def quote_identifier(self, identifier):
+        return u'"{identifier}"'.format(identifier=identifier)
+
+    def commit(self):
+        self.connection.commit()
+
+    def rollback(self):
+        self.connection.rollback()
+
+
+class PoolTestCase(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.database = os.path.join(self.directory, 'test.db')
+        self.connections = []
+        connection = self.connect()
+        connection.cursor().execute(u'CREATE TABLE items (id INTEGER, name TEXT)')
+        connection.close()
+
+    def tearDown(self):
+        for connection in self.connections:
+            connection.close()
+        shutil.rmtree(self.directory)
+
+    def connect(self):
+        connection = QuotingConnection(self.database, isolation_level=None, check_same_thread=False)
+        self.connections.append(connection)
+        return connection
+
+
+class ExecuteTest(PoolTestCase):
+
+    def test_execute(self):
+        pool = ConnectionPool(self.connect, max_size=2)
+        INSERT(T.items, (C.id, C.name)).VALUES(1, 'foo').execute(pool).close()
+        cursor = SELECT(C.name).FROM(T.items).WHERE(C.id == V.id).execute(pool, id=1)
+        self.assertEqual(pool.metrics['in_use'], 1)
+        self.assertEqual(cursor.fetchall(), [('foo',)])
+        cursor.close()
+        self.assertEqual(pool.metrics['in_use'], 0)
+        self.assertEqual(pool.metrics['created'], 1)
+        self.assertEqual(pool.metrics['checkouts'], 2)
+
+    def test_quoting(self):
+        pool = ConnectionPool(self.connect)
+        self.assertEqual(SELECT(C.id).FROM(T.items)._as_sql(pool, {}), (u'SELECT "id" FROM "items"', ()))
+
+    def test_dialect(self):
+        pool = ConnectionPool(self.connect, dialect=MySQLDialect())
+        self.assertEqual(SELECT(C.id).FROM(T.items)._as_sql(pool, {}), (u'SELECT `id` FROM `items`', ()))
+        self.assertEqual(pool.metrics['created'], 0)
+
+    def test_helpers(self):
+        pool = ConnectionPool(self.connect, max_size=1)
+        INSERT(T.items, (C.id, C.name)).ROWS((i, str(i)) for i in range(10)).execute(pool).close()
+        query = SELECT(C.id).FROM(T.items).ORDER_BY(C.id)
+        self.assertEqual(list(query.iter_rows(pool, batch_size=3)), [(i,) for i in range(10)])
+        self.assertEqual(query.LIMIT(3).fetch_with_total(pool), ([(0,), (1,), (2,)], 10))
+        self.assertEqual(query.total_count(pool), 10)
+        self.assertEqual(pool.metrics['in_use'], 0)
+
+    def test_failed_execute(self):
+        pool = ConnectionPool(self.connect, max_size=1, timeout=0)
+        with self.assertRaises(Exception):
+            SELECT().FROM(T.missing).execute(pool)
+        self.assertEqual(pool.metrics['in_use'], 0)
+
+    def test_unclosed_cursor(self):
+        pool = ConnectionPool(self.connect, max_size=1)
+        SELECT().FROM(T.items).execute(pool)
+        self.assertEqual(pool.metrics['in_use'], 0)
+
+
+class PoolTest(PoolTestCase):
+
+    def test_reuse(self):
+        pool = ConnectionPool(self.connect)
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            self.assertIs(second, first)
+        self.assertEqual(pool.metrics['created'], 1)
+
+    def test_bounded(self):
+        pool = ConnectionPool(self.connect, max_size=2, timeout=0.01)
+        with pool.connection():
+            with pool.connection():
+                self.assertEqual(pool.metrics['in_use'], 2)
+                with self.assertRaises(PoolTimeout):
+                    pool.acquire()
+        self.assertEqual(pool.metrics['idle'], 2)
+
+    def test_wait(self):
+        pool = ConnectionPool(self.connect, max_size=1)
+        connection = pool.acquire()
+        thread = threading.Timer(0.05, pool.release, (connection,))
+        thread.start()
+        self.assertIs(pool.acquire(timeout=5), connection)
+        thread.join()
+        self.assertGreater(pool.metrics['max_wait_time'], 0)
+
+    def test_threads(self):
+        pool = ConnectionPool(self.connect, max_size=3)
+        errors = []
+        def work():
+            try:
+                for i in range(20):
+                    with pool.connection() as connection:
+                        self.assertLessEqual(pool.metrics['in_use'], 3)
+                        SELECT(C.id).FROM(T.items).execute(connection).close()
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=work) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertLessEqual(pool.metrics['created'], 3)
+        self.assertEqual(pool.metrics['checkouts'], 160)
+
+    def test_health_check(self):
+        broken = []
+        pool = ConnectionPool(self.connect, health_check=lambda connection: connection not in broken)
+        with pool.connection() as connection:
+            broken.append(connection)
+        with pool.connection() as replacement:
+            self.assertIsNot(replacement, connection)
+        metrics = pool.metrics
+        self.assertEqual((metrics['created'], metrics['discarded'], metrics['size']), (2, 1, 1))
+
+    def test_failed_health_check(self):
+        def health_check(connection):
+            raise RuntimeError()
+        pool = ConnectionPool(self.connect, health_check=health_check)
+        with pool.connection() as connection:
+            pass
+        with pool.connection() as replacement:
+            self.assertIsNot(replacement, connection)
+
+    def test_idle_eviction(self):
+        pool = ConnectionPool(self.connect, max_idle=0.01)
+        with pool.connection():
+            with pool.connection():
+                pass
+        self.assertEqual(pool.metrics['idle'], 2)
+        time.sleep(0.02)
+        self.assertEqual(pool.evict_idle(), 2)
+        self.assertEqual(pool.metrics['size'], 0)
+
+    def test_rollback(self):
+        pool = ConnectionPool(lambda: QuotingConnection(self.database, check_same_thread=False), max_size=1)
+        with pool.connection() as connection:
+            self.connections.append(connection)
+            INSERT(T.items, (C.id, C.name)).VALUES(1, 'foo').execute(connection).close()
+        with pool.connection() as connection:
+            self.assertEqual(SELECT(F.count(C)).FROM(T.items).execute(connection).fetchone(), (0,))
+        self.assertEqual(pool.metrics['created'], 1)
+
+    def test_commit(self):
+        pool = ConnectionPool(lambda: QuotingConnection(self.database, check_same_thread=False), max_size=1)
+        with pool.connection(commit=True) as connection:
+            self.connections.append(connection)
+            INSERT(T.items, (C.id, C.name)).VALUES(1, 'foo').execute(connection).close()
+        with self.assertRaises(RuntimeError):
+            with pool.connection(commit=True) as connection:
+                INSERT(T.items, (C.id, C.name)).VALUES(2, 'bar').execute(connection).close()
+                raise RuntimeError()
+        with pool.connection() as connection:
+            self.assertEqual(SELECT(C.id).FROM(T.items).execute(connection).fetchall(), [(1,)])
+
+    def test_failed_reset(self):
+        def reset(connection):
+            raise RuntimeError()
+        pool = ConnectionPool(self.connect, reset=reset)
+        with pool.connection():
+            pass
+        metrics = pool.metrics
+        self.assertEqual((metrics['size'], metrics['idle'], metrics['discarded']), (0, 0, 1))
+
+    def test_failed_connect(self):
+        def connect():
+            raise RuntimeError()
+        pool = ConnectionPool(connect, max_size=1, timeout=0)
+        for i in range(2):
+            with self.assertRaises(RuntimeError):
+                pool.acquire()
+        self.assertEqual(pool.metrics['size'], 0)
+
+    def test_close(self):
+        pool = ConnectionPool(self.connect)
+        connection = pool.acquire()
+        with pool.connection():
+            pass
+        pool.close()
+        self.assertEqual(pool.metrics['size'], 1)
+        pool.release(connection)
+        self.assertEqual(pool.metrics['size'], 0)
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+import gc
+import weakref
+from ..base import TestCase
+from sqlbuilder.query import *
+from sqlbuilder.dialect import PostgreSQLDialect
+from sqlbuilder.prepared import PreparedStatements
+
+
+class RecordingConnection(object):
+    """
+    Stand-in connection that records the statements executed on it
+    """
+
+    dialect = PostgreSQLDialect()
+
+    def __init__(self):
+        self.statements = []
+        self.fail = False
+
+    def cursor(self):
+        return RecordingCursor(self)
+
+
+class RecordingCursor(object):
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.closed = False
+
+    def execute(self, sql, args=()):
+        if self.connection.fail:
+            raise ValueError(sql)
+        self.connection.statements.append((sql, args))
+        return self
+
+    def close(self):
+        self.closed = True
+
+
+class PreparedStatementsTest(TestCase):
+
+    def setUp(self):
+        self.statements = PreparedStatements(maxsize=2)
+        self.connection = RecordingConnection()
+
+    def query(self, user_id):
+        return SELECT(C.name).FROM(T.users).WHERE(OR(C.id == user_id, C.parent_id == user_id))
+
+    def name(self, query):
+        return self.statements.statement(query, self.connection, {})[0]
+
+    def test_prepare_once(self):
+        self.statements.execute(self.query(1), self.connection)
+        self.statements.execute(self.query(2), self.connection)
+        name = self.name(self.query(1))
+        self.assertEqual(self.connection.statements, [
+            (u'PREPARE {name} AS SELECT "name" FROM "users" WHERE (("id" = $1) OR ("parent_id" = $2))'.format(name=name), ()),
+            (u'EXECUTE {name}(%s, %s)'.format(name=name), (1, 1)),
+            (u'EXECUTE {name}(%s, %s)'.format(name=name), (2, 2)),
+        ])
+
+    def test_equal_values(self):
+        query = SELECT(C.name).FROM(T.users).WHERE(OR(C.id == 1, C.parent_id == 2))
+        name, sql, args = self.statements.statement(query, self.connection, {})
+        self.assertEqual(name, self.name(self.query(1)))
+        self.assertEqual(args, (1, 2))
+        self.assertEqual(len(self.statements.statements), 1)
+
+    def test_dialect_not_retained(self):
+        connection = RecordingConnection()
+        connection.dialect = PostgreSQLDialect()
+        dialect = weakref.ref(connection.dialect)
+        self.statements.statement(self.query(1), connection, {})
+        del connection
+        gc.collect()
+        self.assertIsNone(dialect())
+
+    def test_stable_names(self):
+        name = self.name(self.query(1))
+        self.assertEqual(PreparedStatements().name(u'SELECT 1'), PreparedStatements().name(u'SELECT 1'))
+        self.assertEqual(PreparedStatements(cache_size=0).statement(self.query(5), self.connection, {})[0], name)
+        self.assertNotEqual(self.name(SELECT(C.name).FROM(T.users).WHERE(C.id == 1)), name)
+
+    def test_per_connection(self):
+        other = RecordingConnection()
+        self.statements.execute(self.query(1), self.connection)
+        self.statements.execute(self.query(1), other)
+        self.assertTrue(other.statements[0][0].startswith(u'PREPARE'))
+
+    def test_no_parameters(self):
+        query = SELECT(C.name).FROM(T.users)
+        self.statements.execute(query, self.connection)
+        self.assertEqual(self.connection.statements[-1], (u'EXECUTE {name}'.format(name=self.name(query)), ()))
+
+    def test_deallocate(self):
+        queries = [SELECT(C('column_{i}'.format(i=i))).FROM(T.users) for i in range(3)]
+        names = [self.name(query) for query in queries]
+        self.statements.execute(queries[0], self.connection)
+        self.statements.execute(queries[1], self.connection)
+        self.statements.execute(queries[0], self.connection)
+        self.statements.execute(queries[2], self.connection)
+        self.assertEqual([sql.split(u' AS ')[0] for sql, _ in self.connection.statements if not sql.startswith(u'EXECUTE')], [
+            u'PREPARE {name}'.format(name=names[0]),
+            u'PREPARE {name}'.format(name=names[1]),
+            u'PREPARE {name}'.format(name=names[2]),
+            u'DEALLOCATE {name}'.format(name=names[1]),
+        ])
+        del self.connection.statements[:]
+        self.statements.execute(queries[1], self.connection)
+        self.assertTrue(self.connection.statements[0][0].startswith(u'PREPARE'))
+
+    def test_failed_prepare(self):
+        self.connection.fail = True
+        self.assertRaises(ValueError, self.statements.execute, self.query(1), self.connection)
+        self.connection.fail = False
+        self.statements.execute(self.query(1), self.connection)
+        self.assertTrue(self.connection.statements[0][0].startswith(u'PREPARE'))
+
+    def test_forget(self):
+        self.statements.execute(self.query(1), self.connection)
+        self.statements.forget(self.connection)
+        self.statements.execute(self.query(1), self.connection)
+        self.assertEqual(len([sql for sql, _ in self.connection.statements if sql.startswith(u'PREPARE')]), 2)
+
+    def test_variables(self):
+        query = SELECT(C.name).FROM(T.users).WHERE(C.id == V.user_id)
+        self.statements.execute(query, self.connection, user_id=3)
+        self.statements.execute(query, self.connection, user_id=4)
+        self.assertEqual([args for _, args in self.connection.statements], [(), (3,), (4,)])
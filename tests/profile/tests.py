@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+import os
+import shutil
+import tempfile
+from ..base import TestCase
+from sqlbuilder.query import *
+from sqlbuilder.dummy import dummy_connection
+from sqlbuilder.sql.profile import RenderProfile
+
+
+class ProfileTest(TestCase):
+
+    def setUp(self):
+        self.profile = RenderProfile()
+
+    def test_render(self):
+        query = SELECT(C.id, C.name).FROM(T.users).WHERE(AND(C.a == 1, C.b == 2)).LIMIT(10)
+        self.assertEqual(self.profile.render(query, dummy_connection), self.as_sql(query))
+
+    def test_stacks(self):
+        self.profile.render(SELECT(C.id).FROM(T.users).WHERE(AND(C.a == 1, C.b == 2)), dummy_connection)
+        root = self.profile.stacks[u'SELECT']
+        self.assertEqual(root[1], 0)
+        params = dict((path, count) for path, (_, count) in self.profile.stacks.items() if count)
+        self.assertEqual(sum(params.values()), 2)
+        for path in params:
+            self.assertTrue(path.startswith(u'SELECT;'))
+            self.assertTrue(u';ChainOperator;' in path)
+
+    def test_classes(self):
+        for i in range(3):
+            self.profile.render(SELECT(C.id).FROM(T.users).WHERE(C.a == i), dummy_connection)
+        top = dict((name, (nodes, params)) for name, nodes, _, params in self.profile.top(100))
+        self.assertEqual(top[u'SELECT'], (3, 0))
+        self.assertEqual(top[u'Value'], (3, 3))
+
+    def test_collapsed(self):
+        self.profile.render(SELECT(C.id).FROM(T.users).WHERE(C.a == 1), dummy_connection)
+        for line in self.profile.collapsed():
+            path, weight = line.rsplit(u' ', 1)
+            self.assertTrue(int(weight) > 0)
+        lines = self.profile.collapsed(params=True)
+        self.assertEqual(len(lines), 1)
+        self.assertTrue(lines[0].endswith(u';Value 1'))
+
+    def test_deep(self):
+        expr = C.a == 0
+        for i in range(1, 500):
+            expr = expr + i
+        self.assertEqual(self.profile.render(expr, dummy_connection), self.as_sql(expr))
+        deepest = max(self.profile.stacks, key=lambda path: path.count(u';'))
+        self.assertEqual(deepest.count(u';'), 500)
+        self.assertEqual(self.profile.classes['Value'][0], 500)
+
+    def test_write(self):
+        self.profile.render(SELECT(C.id).FROM(T.users).WHERE(C.a == 1), dummy_connection)
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, 'render.folded')
+            self.profile.write(path, params=True)
+            with open(path) as f:
+                self.assertEqual(f.read().splitlines(), self.profile.collapsed(params=True))
+        finally:
+            shutil.rmtree(directory)
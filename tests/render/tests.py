@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+import operator
+from functools import reduce
+from ..base import TestCase
+from sqlbuilder.query import *
+from sqlbuilder.sql.buffer import Buffer
+from sqlbuilder.sql.shape import shape
+from sqlbuilder.sql.template import Template
+from sqlbuilder.dialect import PostgreSQLDialect
+from sqlbuilder.dummy import dummy_connection
+
+
+def chain(size):
+    return reduce(operator.or_, [C.x == i for i in range(size)])
+
+
+class DeepRenderTest(TestCase):
+
+    def test_deep_chain(self):
+        sql, args = self.as_sql(chain(5000))
+        self.assertEqual(args, tuple(range(5000)))
+        self.assertTrue(sql.startswith(u'(' * 4999 + u'(x = %s) | (x = %s))'))
+        self.assertTrue(sql.endswith(u' | (x = %s))'))
+
+    def test_deep_shape(self):
+        expr_shape, args = shape(chain(5000), dummy_connection, {})
+        self.assertEqual(args, tuple(range(5000)))
+
+    def test_deep_template(self):
+        template = Template.compile(chain(5000) & V.foo, dummy_connection)
+        sql, args = template.bind(foo=u'bar')
+        self.assertEqual(args, tuple(range(5000)) + (u'bar',))
+
+
+class IterativeRenderTest(TestCase):
+
+    def render(self, expr):
+        output = Buffer(dummy_connection, {})
+        output.render_iterative(expr)
+        return output.result()
+
+    def test_identical(self):
+        for expr in (
+            chain(10),
+            SELECT(C.foo, F.count(C.bar).OVER(PARTITION_BY=C.baz))
+                .FROM(T.foo.LEFT_JOIN(T.bar, ON=C.foo == C.bar))
+                .WHERE(AND(C.a == 1, OR(C.b == 2, IN(C.c, (3, 4, 5))), NOT(C.d == 6)))
+                .ORDER_BY(ASC(C.foo)).LIMIT(10, 20),
+            SELECT(C.id).FROM(T.a).WHERE(C.x == 1) | SELECT(C.id).FROM(T.b).WHERE(C.x == 2),
+            SELECT().WITH(C.foo, SELECT(C.bar).FROM(T.bar).WHERE(C.bar > 1)).FROM(T.foo),
+        ):
+            self.assertEqual(self.render(expr), self.as_sql(expr))
+
+    def test_numbering(self):
+        connection = PostgreSQLDialect()
+        connection.PARAMSTYLE = u'dollar'
+        expr = OR(C.a == 1, C.b == 2, AND(C.c == 1, C.d == 3))
+        output = Buffer(connection, {})
+        output.render_iterative(expr)
+        self.assertEqual(output.result(), expr._as_sql(connection, {}))
+
+    def test_restart(self):
+        connection = PostgreSQLDialect()
+        connection.PARAMSTYLE = u'dollar'
+        output = Buffer(connection, {})
+        output.render(C.a == 1)
+        output.write(u' AND ')
+        output.render(chain(3000))
+        sql, args = output.result()
+        self.assertTrue(sql.startswith(u'("a" = $1) AND ((((('))
+        self.assertEqual(args, (1, 0) + tuple(range(2, 3000)))
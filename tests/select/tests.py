@@ -228,6 +228,17 @@ class ExpressionTest(TestCase):
         self.assertSQL(SELECT(IS_NOT_NULL(C.foo)),
                     (u'SELECT (foo IS NOT NULL)', ()))
 
+    def test_case(self):
+        self.assertSQL(SELECT(CASE().WHEN(C.foo > 1, 'bar').WHEN(C.foo > 2, 'baz').ELSE(C.xyzzy)),
+                    (u'SELECT CASE WHEN (foo > %s) THEN %s WHEN (foo > %s) THEN %s ELSE xyzzy END', (1, 'bar', 2, 'baz')))
+
+    def test_legacy_node(self):
+        class Legacy(SQL):
+            def _as_sql(self, connection, context):
+                return u'legacy(%s)', (42,)
+        self.assertSQL(SELECT(C.foo + Legacy()),
+                    (u'SELECT (foo + legacy(%s))', (42,)))
+
     def test_precedence(self):
         self.assertSQL(SELECT(C.foo + C.bar * C.baz),
                     (u'SELECT (foo + (bar * baz))', ()))
@@ -553,3 +564,50 @@ class WindowTest(TestCase):
     def test_complex(self):
         self.assertSQL(SELECT().WINDOW(C.name, C.window_ref, PARTITION_BY=(C.foo, C.bar), ORDER_BY=(ASC(C.foo), DESC(C.bar)), RANGE=(-1, 1)),
                     (u'SELECT * WINDOW name AS (window_ref PARTITION BY foo, bar ORDER BY foo ASC, bar DESC RANGE BETWEEN %s PRECEDING AND %s FOLLOWING)', (1, 1)))
+
+
+class PaginateTest(TestCase):
+
+    def test_no_from(self):
+        with self.assertRaises(TypeError):
+            SELECT().PAGINATE_AFTER((1,))
+
+    def test_single(self):
+        self.assertSQL(SELECT().FROM(T.table).ORDER_BY(C.foo).PAGINATE_AFTER((1,)).LIMIT(10),
+                    (u'SELECT * FROM table WHERE (foo > %s) ORDER BY foo LIMIT %s', (1, 10)))
+
+    def test_row_value(self):
+        self.assertSQL(SELECT().FROM(T.table).ORDER_BY(C.foo, ASC(C.bar)).PAGINATE_AFTER((1, 2)),
+                    (u'SELECT * FROM table WHERE ((foo, bar) > (%s, %s)) ORDER BY foo, bar ASC', (1, 2)))
+
+    def test_desc(self):
+        self.assertSQL(SELECT().FROM(T.table).ORDER_BY(DESC(C.foo), DESC(C.bar)).PAGINATE_AFTER((1, 2)),
+                    (u'SELECT * FROM table WHERE ((foo, bar) < (%s, %s)) ORDER BY foo DESC, bar DESC', (1, 2)))
+
+    def test_mixed(self):
+        self.assertSQL(SELECT().FROM(T.table).ORDER_BY(ASC(C.foo), DESC(C.bar)).PAGINATE_AFTER((1, 2)),
+                    (u'SELECT * FROM table WHERE ((foo > %s) OR ((foo = %s) AND (bar < %s))) ORDER BY foo ASC, bar DESC', (1, 1, 2)))
+
+    def test_where(self):
+        self.assertSQL(SELECT().FROM(T.table).WHERE(C.baz == 3).ORDER_BY(C.foo).PAGINATE_AFTER((1,)),
+                    (u'SELECT * FROM table WHERE ((baz = %s) AND (foo > %s)) ORDER BY foo', (3, 1)))
+
+    def test_nulls_last(self):
+        self.assertSQL(SELECT().FROM(T.table).ORDER_BY(ASC(C.foo).NULLS_LAST, C.bar).PAGINATE_AFTER((1, 2)),
+                    (u'SELECT * FROM table WHERE ((foo > %s) OR (foo IS NULL) OR ((foo = %s) AND (bar > %s))) ORDER BY foo ASC NULLS LAST, bar', (1, 1, 2)))
+
+    def test_nulls_last_null(self):
+        self.assertSQL(SELECT().FROM(T.table).ORDER_BY(ASC(C.foo).NULLS_LAST, C.bar).PAGINATE_AFTER((None, 2)),
+                    (u'SELECT * FROM table WHERE ((foo IS NULL) AND (bar > %s)) ORDER BY foo ASC NULLS LAST, bar', (2,)))
+
+    def test_nulls_first_null(self):
+        self.assertSQL(SELECT().FROM(T.table).ORDER_BY(DESC(C.foo).NULLS_FIRST, C.bar).PAGINATE_AFTER((None, 2)),
+                    (u'SELECT * FROM table WHERE ((foo IS NOT NULL) OR ((foo IS NULL) AND (bar > %s))) ORDER BY foo DESC NULLS FIRST, bar', (2,)))
+
+    def test_null_without_placement(self):
+        with self.assertRaises(ValueError):
+            self.as_sql(SELECT().FROM(T.table).ORDER_BY(C.foo).PAGINATE_AFTER((None,)))
+
+    def test_alias(self):
+        self.assertSQL(SELECT(A.total(C.foo + C.bar)).FROM(T.table).ORDER_BY(DESC(C.total)).PAGINATE_AFTER((1,)),
+                    (u'SELECT (foo + bar) AS total FROM table WHERE ((foo + bar) < %s) ORDER BY total DESC', (1,)))
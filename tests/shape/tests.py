@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from ..base import TestCase
+from sqlbuilder.query import *
+from sqlbuilder.sql.shape import shape
+from sqlbuilder.dummy import dummy_connection
+
+
+def query(user_id, name):
+    return SELECT(C.id).FROM(T.users).WHERE(AND(C.id == user_id, C.name == name))
+
+
+class ShapeTest(TestCase):
+
+    def test_values_ignored(self):
+        self.assertEqual(shape(query(1, 'foo'), dummy_connection, {})[0], shape(query(2, 'bar'), dummy_connection, {})[0])
+
+    def test_args(self):
+        self.assertEqual(shape(query(1, 'foo'), dummy_connection, {})[1], (1, 'foo'))
+
+    def test_structure(self):
+        self.assertNotEqual(shape(query(1, 'foo'), dummy_connection, {})[0], shape(query(C.other, 'foo'), dummy_connection, {})[0])
+
+    def test_identifiers(self):
+        self.assertNotEqual(shape(SELECT(C.foo), dummy_connection, {})[0], shape(SELECT(C.bar), dummy_connection, {})[0])
+
+    def test_list_length(self):
+        self.assertNotEqual(shape(IN(C.foo, (1, 2)), dummy_connection, {})[0], shape(IN(C.foo, (1, 2, 3)), dummy_connection, {})[0])
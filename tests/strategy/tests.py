@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from ..base import TestCase, SQLiteConnection
+from sqlbuilder.query import *
+from sqlbuilder.dummy import DummyConnection
+from sqlbuilder.sql.strategy import InStrategy
+
+
+class StrategyConnection(DummyConnection):
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+
+    def operator_to_sql(self, op, left, right=None, context=None):
+        return self.strategy.operator_to_sql(op, left, right, context=context)
+
+
+class InStrategyTest(TestCase):
+
+    def assertStrategySQL(self, strategy, expr, sql):
+        self.assertEqual(expr._as_sql(StrategyConnection(strategy), {}), sql)
+
+    def test_below_threshold(self):
+        self.assertStrategySQL(InStrategy(InStrategy.STRATEGY.ARRAY, threshold=3), IN(C.foo, (1, 2, 3)),
+                    (u'(foo IN (%s, %s, %s))', (1, 2, 3)))
+
+    def test_array(self):
+        self.assertStrategySQL(InStrategy(InStrategy.STRATEGY.ARRAY, threshold=2), IN(C.foo, (1, 2, 3)),
+                    (u'(foo = ANY(%s))', ([1, 2, 3],)))
+
+    def test_array_not_in(self):
+        self.assertStrategySQL(InStrategy(InStrategy.STRATEGY.ARRAY, threshold=2), NOT_IN(C.foo, (1, 2, 3)),
+                    (u'(foo <> ALL(%s))', ([1, 2, 3],)))
+
+    def test_array_expressions(self):
+        self.assertStrategySQL(InStrategy(InStrategy.STRATEGY.ARRAY, threshold=2), IN(C.foo, (1, C.bar, 3)),
+                    (u'((foo IN (%s, bar)) OR (foo IN (%s)))', (1, 3)))
+        self.assertStrategySQL(InStrategy(InStrategy.STRATEGY.ARRAY, threshold=2), IN(C.foo, ((1, 2), (3, 4), (5, 6))),
+                    (u'((foo IN (%s, %s)) OR (foo IN (%s)))', ((1, 2), (3, 4), (5, 6))))
+
+    def test_values(self):
+        self.assertStrategySQL(InStrategy(InStrategy.STRATEGY.VALUES, threshold=2), IN(C.foo, (1, 2, 3)),
+                    (u'(foo IN (VALUES (%s), (%s), (%s)))', (1, 2, 3)))
+
+    def test_chunks(self):
+        self.assertStrategySQL(InStrategy(InStrategy.STRATEGY.CHUNKS, threshold=2), IN(C.foo, (1, 2, 3)),
+                    (u'((foo IN (%s, %s)) OR (foo IN (%s)))', (1, 2, 3)))
+
+    def test_chunks_not_in(self):
+        self.assertStrategySQL(InStrategy(InStrategy.STRATEGY.CHUNKS, threshold=3, chunk_size=2), NOT_IN(C.foo, (1, 2, 3, 4)),
+                    (u'((foo NOT IN (%s, %s)) AND (foo NOT IN (%s, %s)))', (1, 2, 3, 4)))
+
+    def test_subquery(self):
+        self.assertStrategySQL(InStrategy(InStrategy.STRATEGY.ARRAY, threshold=0), IN(C.foo, SELECT(C.bar)),
+                    (u'(foo IN (SELECT bar))', ()))
+
+    def test_invalid_chunk_size(self):
+        with self.assertRaises(AssertionError):
+            InStrategy(InStrategy.STRATEGY.CHUNKS, threshold=10, chunk_size=20)
+
+    def test_execute(self):
+        strategies = (
+            (InStrategy.STRATEGY.VALUES, u'(id IN (VALUES (?), (?), '),
+            (InStrategy.STRATEGY.CHUNKS, u'((id IN (?, ?, '),
+        )
+        for strategy, sql in strategies:
+            connection = SQLiteConnection()
+            connection.operator_to_sql = InStrategy(strategy, threshold=100).operator_to_sql
+            connection.cursor().execute(u'CREATE TABLE items (id INTEGER)')
+            INSERT(T.items, (C.id,)).ROWS((i,) for i in range(1000)).execute(connection)
+            condition = IN(C.id, range(0, 2000, 2))
+            self.assertTrue(condition._as_sql(connection, {})[0].startswith(sql))
+            cursor = SELECT(F.count(C)).FROM(T.items).WHERE(condition).execute(connection)
+            self.assertEqual(cursor.fetchone(), (500,))
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from ..base import TestCase
+from sqlbuilder.query import *
+from sqlbuilder.dummy import dummy_connection
+
+
+class CompileTest(TestCase):
+
+    def compile(self, query):
+        return query.compile(dummy_connection)
+
+    def test_constants(self):
+        template = self.compile(SELECT(C.foo).FROM(T.table).WHERE(C.bar > 100))
+        self.assertEqual(template.bind(),
+                    (u'SELECT foo FROM table WHERE (bar > %s)', (100,)))
+
+    def test_variables(self):
+        template = self.compile(SELECT(C.foo).FROM(T.table).WHERE(AND(C.bar > V.bar, C.baz == 'baz')).LIMIT(V.limit))
+        self.assertEqual(template.sql, u'SELECT foo FROM table WHERE ((bar > %s) AND (baz = %s)) LIMIT %s')
+        self.assertEqual(template.bind(bar=1, limit=10),
+                    (u'SELECT foo FROM table WHERE ((bar > %s) AND (baz = %s)) LIMIT %s', (1, 'baz', 10)))
+        self.assertEqual(template.bind(bar=2, limit=20),
+                    (u'SELECT foo FROM table WHERE ((bar > %s) AND (baz = %s)) LIMIT %s', (2, 'baz', 20)))
+
+    def test_repeated_variable(self):
+        template = self.compile(SELECT(C.foo).FROM(T.table).WHERE(OR(C.bar == V.value, C.baz == V.value)))
+        self.assertEqual(template.bind(value=5)[1], (5, 5))
+
+    def test_matches_render(self):
+        query = SELECT(C.foo, F.count(C.bar).OVER(PARTITION_BY=C.baz, ROWS=(-1, 1))).FROM(T.table).WHERE(IN(C.foo, (1, V.foo, 3)))
+        self.assertEqual(self.compile(query).bind(foo=2), self.as_sql(query, context={ 'foo': 2 }))
+
+    def test_missing_variable(self):
+        template = self.compile(SELECT(V.foo))
+        with self.assertRaises(KeyError):
+            template.bind()
+
+    def test_frozen(self):
+        template = self.compile(SELECT(V.foo))
+        with self.assertRaises(AttributeError):
+            template.sql = u'SELECT 1'
+
+    def test_repr(self):
+        self.assertEqual(repr(self.compile(SELECT(C.foo, V.foo, 1))),
+                    "<Template {sql!r}, ($foo, 1)>".format(sql=u'SELECT foo, %s, %s'))